@@ -12,7 +12,10 @@ import android.net.wifi.WifiInfo;
 import android.os.Build;
 import android.os.HandlerThread;
 import android.os.Handler;
+import android.os.Looper;
+import android.os.SystemClock;
 import android.text.format.Formatter;
+import android.view.Choreographer;
 import android.view.KeyEvent;
 import android.view.MotionEvent;
 import android.view.View;
@@ -40,6 +43,7 @@ import java.lang.reflect.Method;
 
 
 import java.lang.reflect.Proxy;
+import java.util.ArrayDeque;
 import java.util.ArrayList;
 import java.util.Arrays;
 import java.util.HashMap;
@@ -73,6 +77,15 @@ public class Bridge implements PythonInterpreter.EventListener {
     public static final String DELETE = "d";
     public static final String RESULT = "r";
     public static final String ERROR = "e";
+    public static final String BATCH_START = "bs";
+    public static final String BATCH_END = "be";
+    public static final String EVENT_MODE = "em";
+
+    // Event delivery modes
+    public static final int DELIVER_ALL = 0;
+    public static final int DELIVER_SAMPLE = 1;
+    public static final int DELIVER_LATEST = 2;
+    public static final int DELIVER_NONE = 3;
 
     final EnamlActivity mActivity;
 
@@ -106,6 +119,15 @@ public class Bridge implements PythonInterpreter.EventListener {
     final HashMap<Class, Packer> mTypePackers = new HashMap<Class, Packer>();
     final ArrayList<BridgeGenericPacker> mGenericPackers = new ArrayList<BridgeGenericPacker>();
 
+    // Results of returning calls made within a batch (id, result pairs).
+    // Only accessed from the UI thread.
+    final ArrayDeque<ArrayList<Object[]>> mBatches = new ArrayDeque<>();
+
+    // Delivery modes of callbacks that are not sent as is, by python object id then method.
+    // Callbacks can be invoked from any thread (okhttp, sensor, and location listeners).
+    final ConcurrentHashMap<Integer, ConcurrentHashMap<String, EventMode>> mEventModes =
+            new ConcurrentHashMap<>();
+
     // For generating IDs
     private int mResultCount = 0;
 
@@ -114,6 +136,7 @@ public class Bridge implements PythonInterpreter.EventListener {
     final ConcurrentLinkedQueue<MessageBufferPacker> mEventList = new ConcurrentLinkedQueue<>();
     final HandlerThread mBridgeHandlerThread = new HandlerThread("bridge");
     final Handler mBridgeHandler;
+    final Handler mUiHandler = new Handler(Looper.getMainLooper());
     final AtomicInteger mEventCount = new AtomicInteger();
     final int mEventDelay = 1;
     //final MessageBufferPacker mEventPacker = MessagePack.newDefaultBufferPacker();
@@ -241,6 +264,15 @@ public class Bridge implements PythonInterpreter.EventListener {
             packer.addPayload(bytes);
         });
 
+        addPacker(new Class[]{byte[][].class}, (packer, id, object)->{
+            byte[][] argList = (byte[][]) object;
+            packer.packArrayHeader(argList.length);
+            for (byte[] bytes:argList) {
+                packer.packBinaryHeader(bytes.length);
+                packer.addPayload(bytes);
+            }
+        });
+
         addPacker(KeyEvent.class, (packer, id, object)->{
             KeyEvent event = (KeyEvent) object;
             packer.packString(KeyEvent.keyCodeToString(event.getKeyCode()));
@@ -737,6 +769,9 @@ public class Bridge implements PythonInterpreter.EventListener {
                     } else if (spec==Typeface.class) {
                         // Hack for fonts
                         arg = Typeface.create(v.asStringValue().asString(), Typeface.NORMAL);
+                    } else if (spec==byte[].class) {
+                        // Python 2 packs bytes as str, keep the raw bytes
+                        arg = v.asStringValue().asByteArray();
                     } else {
                         arg = v.asStringValue().asString();
                     }
@@ -1057,6 +1092,7 @@ public class Bridge implements PythonInterpreter.EventListener {
             mObjectCache.remove(objId);
             //obj = null; Will GC handle this??
         }
+        mEventModes.remove(objId);
     }
 
     /**
@@ -1115,16 +1151,210 @@ public class Bridge implements PythonInterpreter.EventListener {
 
         @Override
         public Object invoke(Object proxy, Method method, Object[] args) throws Throwable {
+            ConcurrentHashMap<String, EventMode> modes = mEventModes.get(mPythonObjectPtr);
+            if (modes != null) {
+                // Send any coalesced events of other callbacks first so the order is kept
+                EventMode eventMode = modes.get(method.getName());
+                for (EventMode m: modes.values()) {
+                    if (m != eventMode) {
+                        m.flush();
+                    }
+                }
+                if (eventMode != null) {
+                    return eventMode.dispatch(method, args);
+                }
+            }
             int resultId = IGNORE_RESULT;
             if (!method.getReturnType().equals(Void.TYPE)) {
-                mResultCount += 1;
-                mResultCache.put(mResultCount, (new BridgeFuture<Object>()));
-                resultId = mResultCount;
+                resultId = createResult();
             }
             return onEvent(resultId, mPythonObjectPtr, method.getName(), args);
         }
     }
 
+    /**
+     * Controls how a high frequency callback (touch moves, scrolling, progress changes, etc..)
+     * is sent to python.
+     *
+     * DELIVER_SAMPLE sends at most one event every interval ms. The last event dropped in an
+     * interval is sent when it ends so the final value (ex. where a drag stops) is delivered.
+     * DELIVER_LATEST sends only the latest event every interval ms (or every frame if 0).
+     * DELIVER_NONE never sends the event.
+     *
+     * Events that are not a continuous part of a gesture (ex. a touch down or up) are always
+     * sent. If not blocking or when the event is not sent, the callback returns the given result
+     * without waiting for python. Callbacks can be dispatched from any thread so the pending
+     * state is guarded by the mode.
+     */
+    class EventMode implements Runnable, Choreographer.FrameCallback {
+        final int mPythonObjectPtr;
+        final int mMode;
+        final int mInterval;
+        final boolean mBlocking;
+        final Object mResult;
+        long mLastSent = 0;
+        MessageBufferPacker mPending;
+
+        public EventMode(int ptr, int mode, int interval, boolean blocking, Object result) {
+            mPythonObjectPtr = ptr;
+            mMode = mode;
+            mInterval = interval;
+            mBlocking = blocking;
+            mResult = result;
+        }
+
+        public Object dispatch(Method method, Object[] args) {
+            Class returnType = method.getReturnType();
+            if (mMode == DELIVER_NONE) {
+                return getResult(returnType);
+            } else if (mMode != DELIVER_ALL && isContinuous(args)) {
+                if (mMode == DELIVER_LATEST) {
+                    MessageBufferPacker packer = packEvent(
+                            IGNORE_RESULT, mPythonObjectPtr, method.getName(), args);
+                    boolean scheduled;
+                    synchronized (this) {
+                        scheduled = mPending != null;
+                        mPending = packer;
+                    }
+                    if (!scheduled) {
+                        if (mInterval > 0) {
+                            mUiHandler.postDelayed(this, mInterval);
+                        } else if (Looper.myLooper() == Looper.getMainLooper()) {
+                            Choreographer.getInstance().postFrameCallback(this);
+                        } else {
+                            // Choreographer needs a looper, send it on the next loop instead
+                            mUiHandler.post(this);
+                        }
+                    }
+                    return getResult(returnType);
+                }
+                synchronized (this) {
+                    long now = SystemClock.uptimeMillis();
+                    long wait = mInterval - (now - mLastSent);
+                    if (wait > 0) {
+                        // Keep the last event dropped and send it when the interval ends
+                        boolean scheduled = mPending != null;
+                        mPending = packEvent(
+                                IGNORE_RESULT, mPythonObjectPtr, method.getName(), args);
+                        if (!scheduled) {
+                            mUiHandler.postDelayed(this, wait);
+                        }
+                        return getResult(returnType);
+                    }
+                    mLastSent = now;
+                    mPending = null;
+                }
+            } else {
+                flush();
+            }
+
+            if (mBlocking && !returnType.equals(Void.TYPE)) {
+                return onEvent(createResult(), mPythonObjectPtr, method.getName(), args);
+            }
+            onEvent(IGNORE_RESULT, mPythonObjectPtr, method.getName(), args);
+            return getResult(returnType);
+        }
+
+        /**
+         * Send the latest event if one is pending
+         */
+        public void flush() {
+            MessageBufferPacker packer;
+            synchronized (this) {
+                packer = mPending;
+                mPending = null;
+                if (packer != null) {
+                    mLastSent = SystemClock.uptimeMillis();
+                }
+            }
+            if (packer != null) {
+                sendEvent(packer);
+            }
+        }
+
+        @Override
+        public void run() {
+            flush();
+        }
+
+        @Override
+        public void doFrame(long frameTimeNanos) {
+            flush();
+        }
+
+        /**
+         * Check if the event is a continuous part of a gesture that can be dropped
+         */
+        boolean isContinuous(Object[] args) {
+            if (args != null) {
+                for (Object arg : args) {
+                    if (arg instanceof MotionEvent) {
+                        return ((MotionEvent) arg).getActionMasked() == MotionEvent.ACTION_MOVE;
+                    }
+                }
+            }
+            return true;
+        }
+
+        /**
+         * Get the result to return when not waiting for python.
+         */
+        Object getResult(Class returnType) {
+            if (mResult != null) {
+                return mResult;
+            } else if (returnType == boolean.class) {
+                return false;
+            } else if (returnType == int.class) {
+                return 0;
+            }
+            return null;
+        }
+    }
+
+    /**
+     * Set how events of the given callback of a python object are sent.
+     * @param objId: ptr to the object in python object cache
+     * @param method: name of the callback
+     * @param mode: One of the DELIVER_* modes
+     * @param interval: Interval in ms used by the mode
+     * @param blocking: Wait for the result of the callback if it has one
+     * @param result: Result to return when not waiting for python
+     */
+    public void setEventMode(int objId, String method, int mode, int interval, boolean blocking, Value result) {
+        ConcurrentHashMap<String, EventMode> modes = mEventModes.get(objId);
+        EventMode previous = modes != null ? modes.remove(method) : null;
+        if (previous != null) {
+            previous.flush();
+        }
+        if (mode == DELIVER_ALL && blocking) {
+            if (modes != null && modes.isEmpty()) {
+                mEventModes.remove(objId);
+            }
+            return;
+        }
+        if (modes == null) {
+            modes = new ConcurrentHashMap<>();
+            mEventModes.put(objId, modes);
+        }
+        Object value = null;
+        if (result.isBooleanValue()) {
+            value = result.asBooleanValue().getBoolean();
+        } else if (result.isIntegerValue()) {
+            value = result.asIntegerValue().toInt();
+        }
+        modes.put(method, new EventMode(objId, mode, interval, blocking, value));
+    }
+
+    /**
+     * Create a future for a result returned from python
+     * @return id of the result
+     */
+    public int createResult() {
+        mResultCount += 1;
+        mResultCache.put(mResultCount, (new BridgeFuture<Object>()));
+        return mResultCount;
+    }
+
     /**
      * Set the result of a future.
      * @param objId
@@ -1171,10 +1401,57 @@ public class Bridge implements PythonInterpreter.EventListener {
             // guarantees that the ID is unique and will not overwrite an existing object
             mObjectCache.put(pythonObjectId, result);
         }
+
+        // If in a batch, the result is sent when the batch ends
+        ArrayList<Object[]> batch = mBatches.peek();
+        if (batch!=null) {
+            batch.add(new Object[]{pythonObjectId, result});
+            return;
+        }
         onEvent(IGNORE_RESULT, pythonObjectId, "set_result", new Object[]{result});
         //});
     }
 
+    /**
+     * Start collecting the results of returning calls so they can be sent in a single event.
+     */
+    public void startBatch() {
+        mBatches.push(new ArrayList<Object[]>());
+    }
+
+    /**
+     * Send all of the results collected since the batch started to python in a single event.
+     * The args are a flat list of (id, result) pairs.
+     *
+     * @param batchId: ptr to the batch object in python
+     */
+    public void endBatch(int batchId) {
+        ArrayList<Object[]> batch = mBatches.poll();
+        if (batch==null) {
+            mActivity.showErrorMessage("Attempt to end a batch that was never started");
+            return;
+        }
+        MessageBufferPacker packer = MessagePack.newDefaultBufferPacker();
+        try {
+            packer.packArrayHeader(2);
+            packer.packString("event");
+            packer.packArrayHeader(4);
+            packer.packInt(IGNORE_RESULT);
+            packer.packInt(batchId);
+            packer.packString("set_results");
+            packer.packArrayHeader(2*batch.size());
+            for (Object[] r: batch) {
+                int id = (int) r[0];
+                packArg(packer, id, id);
+                packArg(packer, id, r[1]);
+            }
+            packer.close();
+        } catch (IOException e) {
+            mActivity.showErrorMessage(e);
+        }
+        sendEvent(packer);
+    }
+
     /**
      * A very crude way of determining if the result is of a primitive type or if a reference
      * needs created.  Results that can be sent via msgpack do not need to have a reference created.
@@ -1214,6 +1491,32 @@ public class Bridge implements PythonInterpreter.EventListener {
      * @return
      */
     public Object onEvent(int resultId, int pythonObjectId, String method, Object[] args) {
+        // Send events to python
+        sendEvent(packEvent(resultId, pythonObjectId, method, args));
+
+        // If a result is requested, poll async until ready.
+        if (resultId != IGNORE_RESULT) {
+            try {
+                Future<Object> future = mResultCache.get(resultId);
+                runUntilDone(future);
+                Object result = future.get();
+                mResultCache.remove(resultId);
+                return result;
+            } catch (InterruptedException e) {
+                mActivity.showErrorMessage(e);
+            } catch (ExecutionException e) {
+                mActivity.showErrorMessage(e);
+            }
+        }
+
+        return null;
+    }
+
+    /**
+     * Pack an event in the format used by `onEvent` without sending it.
+     * @return packer containing the event
+     */
+    public MessageBufferPacker packEvent(int resultId, int pythonObjectId, String method, Object[] args) {
         MessageBufferPacker packer = MessagePack.newDefaultBufferPacker();
         try {
             packer.packArrayHeader(2);
@@ -1227,42 +1530,12 @@ public class Bridge implements PythonInterpreter.EventListener {
             } else {
                 packer.packArrayHeader(args.length);
                 for (Object arg : args) {
-                    packer.packArrayHeader(2);
                     if (arg == null) {
                         // Discard this event??
                         Log.w(TAG, "Warning: Trying to send event '" + method + "' with a null argument!");
                         //return null;
-                        packer.packString("void");
-                        packer.packNil();
-                        continue;
-                    }
-
-                    // Otherwise pack the type name and packed value
-                    Class argClass = arg.getClass();
-                    String argName = argClass.getCanonicalName(); // How is this null
-                    packer.packString((argName==null)?"unkown":argName);
-
-                    // Check based on type
-                    Packer typePacker = mTypePackers.get(argClass);
-                    if (typePacker != null) {
-                        typePacker.pack(packer, pythonObjectId, arg);
-                        continue;
-                    }
-
-                    // Check generics
-                    boolean packed = false;
-                    for (BridgeGenericPacker genericPacker : mGenericPackers) {
-                        if (genericPacker.canPack(pythonObjectId, arg)) {
-                            genericPacker.pack(packer, pythonObjectId, arg);
-                            packed = true;
-                            break;
-                        }
-                    }
-
-                    // Fallback if all else fails
-                    if (!packed) {
-                        packer.packString(arg.toString());
                     }
+                    packArg(packer, pythonObjectId, arg);
                 }
             }
 
@@ -1270,26 +1543,47 @@ public class Bridge implements PythonInterpreter.EventListener {
         } catch (IOException e) {
             mActivity.showErrorMessage(e);
         }
+        return packer;
+    }
 
-        // Send events to python
-        sendEvent(packer);
+    /**
+     * Pack an argument as a (type name, value) pair.
+     *
+     * @param packer: Packer to pack the arg into
+     * @param pythonObjectId: ptr used to store the arg if it must be passed by reference
+     * @param arg: Argument to pack
+     * @throws IOException
+     */
+    public void packArg(MessageBufferPacker packer, int pythonObjectId, Object arg) throws IOException {
+        packer.packArrayHeader(2);
+        if (arg == null) {
+            packer.packString("void");
+            packer.packNil();
+            return;
+        }
 
-        // If a result is requested, poll async until ready.
-        if (resultId != IGNORE_RESULT) {
-            try {
-                Future<Object> future = mResultCache.get(resultId);
-                runUntilDone(future);
-                Object result = future.get();
-                mResultCache.remove(resultId);
-                return result;
-            } catch (InterruptedException e) {
-                mActivity.showErrorMessage(e);
-            } catch (ExecutionException e) {
-                mActivity.showErrorMessage(e);
+        // Otherwise pack the type name and packed value
+        Class argClass = arg.getClass();
+        String argName = argClass.getCanonicalName(); // How is this null
+        packer.packString((argName==null)?"unkown":argName);
+
+        // Check based on type
+        Packer typePacker = mTypePackers.get(argClass);
+        if (typePacker != null) {
+            typePacker.pack(packer, pythonObjectId, arg);
+            return;
+        }
+
+        // Check generics
+        for (BridgeGenericPacker genericPacker : mGenericPackers) {
+            if (genericPacker.canPack(pythonObjectId, arg)) {
+                genericPacker.pack(packer, pythonObjectId, arg);
+                return;
             }
         }
 
-        return null;
+        // Fallback if all else fails
+        packer.packString(arg.toString());
     }
 
     /**
@@ -1507,6 +1801,26 @@ public class Bridge implements PythonInterpreter.EventListener {
                             mTaskQueue.add(()->{setResult(objId, arg);});
                             break;
 
+                        case BATCH_START:
+                            objId = unpacker.unpackInt();
+                            mTaskQueue.add(()->{startBatch();});
+                            break;
+
+                        case BATCH_END:
+                            objId = unpacker.unpackInt();
+                            mTaskQueue.add(()->{endBatch(objId);});
+                            break;
+
+                        case EVENT_MODE:
+                            objId = unpacker.unpackInt();
+                            objMethod = unpacker.unpackString();
+                            int mode = unpacker.unpackInt();
+                            int interval = unpacker.unpackInt();
+                            boolean blocking = unpacker.unpackBoolean();
+                            Value result = unpacker.unpackValue();
+                            mTaskQueue.add(()->{setEventMode(objId, objMethod, mode, interval, blocking, result);});
+                            break;
+
                         case ERROR:
                             String errorMessage = unpacker.unpackString();
                             mTaskQueue.add(()->{mActivity.showErrorMessage(errorMessage);});
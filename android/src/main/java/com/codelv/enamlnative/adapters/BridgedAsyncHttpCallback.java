@@ -1,7 +1,9 @@
 package com.codelv.enamlnative.adapters;
 
+import java.io.File;
 import java.io.IOException;
 import java.util.Map;
+import java.util.concurrent.Semaphore;
 
 import okhttp3.Call;
 import okhttp3.Callback;
@@ -12,6 +14,7 @@ import okhttp3.Request;
 import okhttp3.Response;
 import okhttp3.ResponseBody;
 import okio.Buffer;
+import okio.BufferedSink;
 import okio.BufferedSource;
 import okio.ForwardingSource;
 import okio.Okio;
@@ -27,6 +30,15 @@ public class BridgedAsyncHttpCallback implements Callback, Interceptor{
     protected boolean mStream = false;
     protected long mBytesSent = 0;
 
+    // When set the response body is written to this file instead of being sent
+    protected String mOutputFile;
+
+    // Size of each chunk sent when streaming
+    protected int mChunkSize = 64*1024;
+
+    // Limits the number of chunks sent that python has not handled yet
+    protected Semaphore mWindow = new Semaphore(4);
+
     /**
      * Creates a new BridgedAsyncHttpCallback
      */
@@ -43,6 +55,32 @@ public class BridgedAsyncHttpCallback implements Callback, Interceptor{
         mStream = stream;
     }
 
+    /**
+     * Write the response body to the given file instead of sending it to python.
+     * @param path
+     */
+    public void setOutputFile(String path) {
+        mOutputFile = path;
+    }
+
+    /**
+     * Set the size of each streamed chunk and the number of chunks that can be sent before
+     * python acknowledges them (see `ack`). Reading the response stops until then.
+     * @param chunkSize
+     * @param window
+     */
+    public void setStreamOptions(int chunkSize, int window) {
+        mChunkSize = chunkSize;
+        mWindow = new Semaphore(window);
+    }
+
+    /**
+     * Called by python when a streamed chunk was handled
+     */
+    public void ack() {
+        mWindow.release();
+    }
+
     /**
      * Wraps the response body to retain the loopj api so we can stream callback data
      * to python and also show progress.
@@ -94,14 +132,7 @@ public class BridgedAsyncHttpCallback implements Callback, Interceptor{
 
                 @Override
                 public long read(Buffer sink, long byteCount) throws IOException {
-                    long bytesRead;
-                    if (mStream) {
-                        byte[] responseData = sink.readByteArray(byteCount);
-                        onProgressData(responseData);
-                        bytesRead = responseData.length;
-                    } else {
-                        bytesRead = super.read(sink, byteCount);
-                    }
+                    long bytesRead = super.read(sink, byteCount);
 
                     // read() returns the number of bytes read, or -1 if this source is exhausted.
                     totalBytesRead += bytesRead != -1 ? bytesRead : 0;
@@ -177,14 +208,56 @@ public class BridgedAsyncHttpCallback implements Callback, Interceptor{
 
     @Override
     public void onResponse(Call call, Response response) throws IOException {
-        if (mListener!=null) {
-            String headerData = "";
+        try {
+            if (mListener==null) {
+                return;
+            }
             Headers headers = response.headers();
-            mListener.onSuccess(response.code(), headers.toMultimap(),
-                    (mStream)?null:response.body().bytes());
+            byte[] body = null;
+            try {
+                if (mOutputFile != null) {
+                    BufferedSink sink = Okio.buffer(Okio.sink(new File(mOutputFile)));
+                    try {
+                        sink.writeAll(response.body().source());
+                    } finally {
+                        sink.close();
+                    }
+                } else if (mStream) {
+                    stream(response.body().source());
+                } else {
+                    body = response.body().bytes();
+                }
+            } catch (IOException e) {
+                // Reading the body or writing the output file failed
+                mListener.onFailure(response.code(), headers.toMultimap(), null, e.getMessage());
+                mListener.onFinish();
+                return;
+            }
+            mListener.onSuccess(response.code(), headers.toMultimap(), body);
             mListener.onFinish();
+        } finally {
+            response.close();
         }
+    }
 
+    /**
+     * Send the body in chunks, waiting whenever python has not handled the chunks already sent.
+     * @param source
+     * @throws IOException
+     */
+    protected void stream(BufferedSource source) throws IOException {
+        try {
+            while (!source.exhausted()) {
+                source.request(mChunkSize);
+                long n = Math.min(mChunkSize, source.buffer().size());
+                mWindow.acquire();
+                onProgressData(source.readByteArray(n));
+            }
+        } catch (InterruptedException e) {
+            throw new IOException(e);
+        } finally {
+            source.close();
+        }
     }
 
 
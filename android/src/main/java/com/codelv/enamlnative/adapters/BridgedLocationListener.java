@@ -0,0 +1,156 @@
+package com.codelv.enamlnative.adapters;
+
+import android.location.Location;
+import android.location.LocationListener;
+import android.os.Bundle;
+import android.os.Handler;
+import android.os.Looper;
+
+import java.nio.ByteBuffer;
+import java.nio.ByteOrder;
+import java.util.List;
+
+/**
+ * A LocationListener that collects fixes and sends them to python in batches instead of
+ * sending an event for every fix. The times are sent as little endian int64 and the
+ * latitude, longitude, altitude, accuracy, speed, and bearing of each fix as float64.
+ */
+public class BridgedLocationListener implements LocationListener {
+
+    private static final String TAG = "BridgedLocationListener";
+    public static final int FIELDS = 6;
+    protected LocationBatchListener mListener;
+
+    // Time in ms to collect fixes before sending them
+    protected int mInterval = 10000;
+
+    // Send the batch early when it has this many fixes
+    protected int mMaxFixes = 100;
+
+    // Fixes in the current batch
+    protected ByteBuffer mTimes;
+    protected ByteBuffer mValues;
+    protected int mCount = 0;
+
+    protected final Handler mHandler = new Handler(Looper.getMainLooper());
+    protected boolean mFlushScheduled = false;
+    protected final Runnable mFlush = new Runnable() {
+        @Override
+        public void run() {
+            flush();
+        }
+    };
+
+    /**
+     * Creates a new BridgedLocationListener
+     */
+    public BridgedLocationListener() {}
+
+    /**
+     * Set a listener that will be notified of the batches
+     * @param listener
+     * @param interval
+     * @param maxFixes
+     */
+    public synchronized void setLocationBatchListener(LocationBatchListener listener, int interval,
+                                                      int maxFixes) {
+        flush();
+        mListener = listener;
+        mInterval = interval;
+        mMaxFixes = Math.max(1, maxFixes);
+        mTimes = ByteBuffer.allocate(8 * mMaxFixes).order(ByteOrder.LITTLE_ENDIAN);
+        mValues = ByteBuffer.allocate(8 * FIELDS * mMaxFixes).order(ByteOrder.LITTLE_ENDIAN);
+    }
+
+    @Override
+    public synchronized void onLocationChanged(Location location) {
+        add(location);
+        if (mCount >= mMaxFixes || mInterval <= 0) {
+            flush();
+        } else if (!mFlushScheduled) {
+            mFlushScheduled = true;
+            mHandler.postDelayed(mFlush, mInterval);
+        }
+    }
+
+    /**
+     * Fixes batched by the platform (API 31+)
+     * @param locations
+     */
+    public synchronized void onLocationChanged(List<Location> locations) {
+        for (Location location: locations) {
+            add(location);
+            if (mCount >= mMaxFixes) {
+                flush();
+            }
+        }
+        flush();
+    }
+
+    @Override
+    public void onStatusChanged(String provider, int status, Bundle extras) {}
+
+    @Override
+    public void onProviderEnabled(String provider) {
+        if (mListener != null) {
+            mListener.onProviderEnabled(provider);
+        }
+    }
+
+    @Override
+    public void onProviderDisabled(String provider) {
+        if (mListener != null) {
+            mListener.onProviderDisabled(provider);
+        }
+    }
+
+    protected void add(Location location) {
+        if (mTimes == null) {
+            setLocationBatchListener(mListener, mInterval, mMaxFixes);
+        }
+        mTimes.putLong(location.getTime());
+        mValues.putDouble(location.getLatitude());
+        mValues.putDouble(location.getLongitude());
+        mValues.putDouble(location.getAltitude());
+        mValues.putDouble(location.getAccuracy());
+        mValues.putDouble(location.getSpeed());
+        mValues.putDouble(location.getBearing());
+        mCount += 1;
+    }
+
+    /**
+     * Send the fixes collected to python
+     */
+    public synchronized void flush() {
+        if (mFlushScheduled) {
+            mHandler.removeCallbacks(mFlush);
+            mFlushScheduled = false;
+        }
+        if (mCount == 0) {
+            return;
+        }
+        byte[] times = new byte[mTimes.position()];
+        byte[] values = new byte[mValues.position()];
+        mTimes.flip();
+        mTimes.get(times);
+        mTimes.clear();
+        mValues.flip();
+        mValues.get(values);
+        mValues.clear();
+        int count = mCount;
+        mCount = 0;
+        if (mListener != null) {
+            mListener.onLocationData(count, times, values);
+        }
+    }
+
+    /**
+     * Interface for listening from Python
+     */
+    interface LocationBatchListener {
+        void onLocationData(int count, byte[] times, byte[] values);
+        void onProviderEnabled(String provider);
+        void onProviderDisabled(String provider);
+    }
+
+}
@@ -0,0 +1,125 @@
+package com.codelv.enamlnative.adapters;
+
+import android.hardware.Sensor;
+import android.hardware.SensorEvent;
+import android.hardware.SensorEventListener;
+import android.os.Handler;
+import android.os.Looper;
+
+import java.nio.ByteBuffer;
+import java.nio.ByteOrder;
+
+/**
+ * A SensorEventListener that collects samples and sends them to python in batches
+ * instead of sending an event for every sample. The timestamps and values are sent as
+ * little endian int64 and float32 arrays so python can use them without unpacking each
+ * value.
+ */
+public class BridgedSensorListener implements SensorEventListener {
+
+    private static final String TAG = "BridgedSensorListener";
+    protected SensorBatchListener mListener;
+
+    // Time in ms to collect samples before sending them
+    protected int mInterval = 100;
+
+    // Send the batch early when it has this many samples
+    protected int mMaxSamples = 256;
+
+    // Samples in the current batch
+    protected ByteBuffer mTimes;
+    protected ByteBuffer mValues;
+    protected int mCount = 0;
+    protected int mDimensions = 0;
+
+    protected final Handler mHandler = new Handler(Looper.getMainLooper());
+    protected boolean mFlushScheduled = false;
+    protected final Runnable mFlush = new Runnable() {
+        @Override
+        public void run() {
+            flush();
+        }
+    };
+
+    /**
+     * Creates a new BridgedSensorListener
+     */
+    public BridgedSensorListener() {}
+
+    /**
+     * Set a listener that will be notified of the batches
+     * @param listener
+     * @param interval
+     * @param maxSamples
+     */
+    public void setSensorBatchListener(SensorBatchListener listener, int interval, int maxSamples) {
+        mListener = listener;
+        mInterval = interval;
+        mMaxSamples = Math.max(1, maxSamples);
+    }
+
+    @Override
+    public synchronized void onSensorChanged(SensorEvent event) {
+        float[] values = event.values;
+        if (mTimes == null || mDimensions != values.length) {
+            flush();
+            mDimensions = values.length;
+            mTimes = ByteBuffer.allocate(8 * mMaxSamples).order(ByteOrder.LITTLE_ENDIAN);
+            mValues = ByteBuffer.allocate(4 * mDimensions * mMaxSamples)
+                    .order(ByteOrder.LITTLE_ENDIAN);
+        }
+        mTimes.putLong(event.timestamp);
+        for (float v: values) {
+            mValues.putFloat(v);
+        }
+        mCount += 1;
+        if (mCount >= mMaxSamples || mInterval <= 0) {
+            flush();
+        } else if (!mFlushScheduled) {
+            mFlushScheduled = true;
+            mHandler.postDelayed(mFlush, mInterval);
+        }
+    }
+
+    @Override
+    public void onAccuracyChanged(Sensor sensor, int accuracy) {
+        if (mListener != null) {
+            mListener.onAccuracyChanged(accuracy);
+        }
+    }
+
+    /**
+     * Send the samples collected to python
+     */
+    public synchronized void flush() {
+        if (mFlushScheduled) {
+            mHandler.removeCallbacks(mFlush);
+            mFlushScheduled = false;
+        }
+        if (mCount == 0) {
+            return;
+        }
+        byte[] times = new byte[mTimes.position()];
+        byte[] values = new byte[mValues.position()];
+        mTimes.flip();
+        mTimes.get(times);
+        mTimes.clear();
+        mValues.flip();
+        mValues.get(values);
+        mValues.clear();
+        int count = mCount;
+        mCount = 0;
+        if (mListener != null) {
+            mListener.onSensorData(count, times, values);
+        }
+    }
+
+    /**
+     * Interface for listening from Python
+     */
+    interface SensorBatchListener {
+        void onSensorData(int count, byte[] times, byte[] values);
+        void onAccuracyChanged(int accuracy);
+    }
+
+}
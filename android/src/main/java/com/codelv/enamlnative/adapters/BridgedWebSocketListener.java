@@ -0,0 +1,229 @@
+package com.codelv.enamlnative.adapters;
+
+import android.os.Handler;
+import android.os.Looper;
+
+import java.util.ArrayList;
+
+import okhttp3.OkHttpClient;
+import okhttp3.Request;
+import okhttp3.Response;
+import okhttp3.WebSocket;
+import okhttp3.WebSocketListener;
+import okio.ByteString;
+
+/**
+ * Forwards the events of an OkHttp WebSocket to python. Messages received within the
+ * coalesce interval are sent to python together and messages from python can be sent
+ * in one call.
+ */
+public class BridgedWebSocketListener extends WebSocketListener {
+
+    private static final String TAG = "BridgedWebSocket";
+    protected WebSocketResponseListener mListener;
+
+    // Current connection, events from previous connections are ignored
+    protected volatile WebSocket mWebSocket;
+
+    // Messages received and not yet sent to python, either String or byte[]
+    protected final ArrayList<Object> mPending = new ArrayList<>();
+
+    // Time in ms to wait for more messages before sending them, 0 to send each one
+    protected int mCoalesceInterval = 16;
+    protected final Handler mHandler = new Handler(Looper.getMainLooper());
+    protected boolean mFlushScheduled = false;
+    protected final Runnable mFlush = new Runnable() {
+        @Override
+        public void run() {
+            flush();
+        }
+    };
+
+    /**
+     * Creates a new BridgedWebSocketListener
+     */
+    public BridgedWebSocketListener() {}
+
+    /**
+     * Set a listener that will be notified of all the events.
+     * @param listener
+     * @param coalesceInterval
+     */
+    public void setWebSocketListener(WebSocketResponseListener listener, int coalesceInterval) {
+        mListener = listener;
+        mCoalesceInterval = coalesceInterval;
+    }
+
+    /**
+     * Open a new connection, any existing connection is cancelled.
+     * @param client
+     * @param request
+     */
+    public void connect(OkHttpClient client, Request request) {
+        WebSocket webSocket = mWebSocket;
+        if (webSocket != null) {
+            webSocket.cancel();
+        }
+        mWebSocket = client.newWebSocket(request, this);
+    }
+
+    public boolean send(String message) {
+        return mWebSocket != null && mWebSocket.send(message);
+    }
+
+    public boolean send(byte[] message) {
+        return mWebSocket != null && mWebSocket.send(ByteString.of(message));
+    }
+
+    /**
+     * Send several messages at once
+     * @param messages Strings or byte arrays
+     */
+    public void sendAll(Object[] messages) {
+        WebSocket webSocket = mWebSocket;
+        if (webSocket == null) {
+            return;
+        }
+        for (Object message: messages) {
+            if (message instanceof byte[]) {
+                webSocket.send(ByteString.of((byte[]) message));
+            } else {
+                webSocket.send(message.toString());
+            }
+        }
+    }
+
+    public boolean close(int code, String reason) {
+        return mWebSocket != null && mWebSocket.close(code, reason);
+    }
+
+    public void cancel() {
+        if (mWebSocket != null) {
+            mWebSocket.cancel();
+        }
+    }
+
+    @Override
+    public void onOpen(WebSocket webSocket, Response response) {
+        if (webSocket == mWebSocket && mListener != null) {
+            mListener.onOpen(response.code());
+        }
+    }
+
+    @Override
+    public void onMessage(WebSocket webSocket, String text) {
+        if (webSocket == mWebSocket) {
+            receive(text);
+        }
+    }
+
+    @Override
+    public void onMessage(WebSocket webSocket, ByteString bytes) {
+        if (webSocket == mWebSocket) {
+            receive(bytes.toByteArray());
+        }
+    }
+
+    @Override
+    public void onClosing(WebSocket webSocket, int code, String reason) {
+        // Complete the close handshake started by the server
+        webSocket.close(code, reason);
+    }
+
+    @Override
+    public void onClosed(WebSocket webSocket, int code, String reason) {
+        if (webSocket == mWebSocket) {
+            flush();
+            if (mListener != null) {
+                mListener.onClosed(code, reason);
+            }
+        }
+    }
+
+    @Override
+    public void onFailure(WebSocket webSocket, Throwable t, Response response) {
+        if (webSocket == mWebSocket) {
+            flush();
+            if (mListener != null) {
+                mListener.onFailure(t.getMessage(), (response != null) ? response.code() : 0);
+            }
+        }
+    }
+
+    /**
+     * Queue a received message and schedule sending it
+     * @param message
+     */
+    protected void receive(Object message) {
+        if (mCoalesceInterval <= 0) {
+            synchronized (mPending) {
+                mPending.add(message);
+            }
+            flush();
+            return;
+        }
+        synchronized (mPending) {
+            mPending.add(message);
+            if (mFlushScheduled) {
+                return;
+            }
+            mFlushScheduled = true;
+        }
+        mHandler.postDelayed(mFlush, mCoalesceInterval);
+    }
+
+    /**
+     * Send the received messages to python. Consecutive messages of the same type are
+     * sent together and the order is kept.
+     */
+    protected synchronized void flush() {
+        Object[] messages;
+        synchronized (mPending) {
+            if (mFlushScheduled) {
+                mHandler.removeCallbacks(mFlush);
+                mFlushScheduled = false;
+            }
+            if (mPending.isEmpty()) {
+                return;
+            }
+            messages = mPending.toArray();
+            mPending.clear();
+        }
+        if (mListener == null) {
+            return;
+        }
+        int start = 0;
+        for (int i = 1; i <= messages.length; i++) {
+            boolean binary = messages[start] instanceof byte[];
+            if (i < messages.length && (messages[i] instanceof byte[]) == binary) {
+                continue;
+            }
+            if (binary) {
+                byte[][] run = new byte[i - start][];
+                for (int j = start; j < i; j++) {
+                    run[j - start] = (byte[]) messages[j];
+                }
+                mListener.onBinaryMessages(run);
+            } else {
+                String[] run = new String[i - start];
+                for (int j = start; j < i; j++) {
+                    run[j - start] = (String) messages[j];
+                }
+                mListener.onMessages(run);
+            }
+            start = i;
+        }
+    }
+
+    /**
+     * Interface for listening from Python
+     */
+    interface WebSocketResponseListener {
+        void onOpen(int code);
+        void onMessages(String[] messages);
+        void onBinaryMessages(byte[][] messages);
+        void onClosed(int code, String reason);
+        void onFailure(String error, int code);
+    }
+
+}
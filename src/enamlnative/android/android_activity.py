@@ -39,7 +39,7 @@ class Activity(Context):
 
     getSupportFragmentManager = JavaMethod(
         returns='android.support.v4.app.FragmentManager')
-    getBuildInfo = JavaMethod(returns='java.lang.HashMap')
+    getBuildInfo = JavaMethod(returns='java.lang.HashMap', cache='persistent')
 
     #: Permissions
     checkSelfPermission = JavaMethod('java.lang.String', returns='int')
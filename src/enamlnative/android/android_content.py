@@ -10,10 +10,11 @@ Created on July 24, 2017
 @author: jrm
 """
 
-from atom.api import Atom, Int, set_default
+from atom.api import Atom, Bool, Int, set_default
 from .bridge import (
     JavaBridgeObject, JavaMethod, JavaCallback, JavaStaticMethod
 )
+from ..core.bridge import batch
 
 
 class Context(JavaBridgeObject):
@@ -194,6 +195,9 @@ class BroadcastReceiver(JavaBridgeObject):
     onReceive = JavaCallback('android.content.Context',
                              'android.content.Intent')
 
+    #: Whether the receiver is registered with the activity
+    registered = Bool()
+
     @classmethod
     def for_action(cls, action, callback, single_shot=True):
         """ Create a BroadcastReceiver that is invoked when the given 
@@ -224,17 +228,37 @@ class BroadcastReceiver(JavaBridgeObject):
 
         receiver.onReceive.connect(on_receive)
         activity.registerReceiver(receiver, IntentFilter(action))
+        receiver.registered = True
         return receiver
 
-    def __del__(self):
-        """ Unregister automatically """
+    def unregister(self):
+        """ Stop receiving broadcasts and release the callback """
+        if not self.registered:
+            return
+        self.registered = False
+        self.onReceive.disconnect(None)
         activity = self.__app__.widget
         activity.unregisterReceiver(self)
+
+    def __del__(self):
+        """ Unregister automatically """
+        self.unregister()
         super(BroadcastReceiver, self).__del__()
 
 
+#: Futures resolved with the instance of each SystemService class once it's
+#: acquired
+SERVICES = {}
+
+#: SystemService classes whose future in SERVICES was resolved. This is
+#: tracked here since twisted Deferreds have no `done` method.
+RESOLVED = set()
+
+
 class SystemService(JavaBridgeObject):
-    """ A common api for system services as singletons
+    """ A common api for system services as singletons. Each service is 
+    only requested once, calls made while the request is in flight all wait
+    on the same result.
     
     """
     SERVICE_TYPE = None
@@ -242,7 +266,9 @@ class SystemService(JavaBridgeObject):
 
     @classmethod
     def instance(cls):
-        """ Get an instance of this service if it was already requested.
+        """ Get an instance of this service if it was already acquired. 
+        This returns None while the request is still in flight, use 
+        `reference()` to get the service before then.
     
         You should request it first using `UsbManager.get()`
     
@@ -258,29 +284,123 @@ class SystemService(JavaBridgeObject):
     
     
         """
-        return cls._instance
+        if cls in RESOLVED:
+            return cls._instance
+
+    @classmethod
+    def request_service(cls, app):
+        """ Send the request for the service over the bridge. Subclasses 
+        that are not acquired with `getSystemService` can override this.
+        
+        Returns
+        -------
+            result: Future
+                A future that resolves with the id of the service.
+        
+        """
+        return app.get_system_service(cls.SERVICE_TYPE)
+
+    @classmethod
+    def reference(cls):
+        """ Get the instance of this service without waiting for it to be 
+        returned. If it was not requested yet the request is sent and a 
+        reference to the result is returned. Methods invoked on it are 
+        queued in the bridge after the request so they can be sent in the 
+        same batch (pipelining). 
+        
+        __Example__
+    
+            :::python
+            
+            #: Both are sent in a single round trip
+            SensorManager.reference().getDefaultSensor(t).then(on_sensor)
+        
+        """
+        if cls._instance:
+            return cls._instance
+        from .app import AndroidApplication
+        app = AndroidApplication.instance()
+        m = cls(__id__=cls.request_service(app))
+        ready = cls.ready()
+
+        def on_ready(*args):
+            if cls not in RESOLVED:
+                RESOLVED.add(cls)
+                ready.set_result(m)
+
+        if m.__ready__ is None:
+            on_ready()
+        else:
+            app.add_done_callback(m.__ready__, on_ready)
+        return m
+
+    @classmethod
+    def ready(cls):
+        """ Get a future that resolves with the service once it's acquired. 
+        This does not request it.
+        
+        """
+        f = SERVICES.get(cls)
+        if f is None:
+            from .app import AndroidApplication
+            app = AndroidApplication.instance()
+            f = SERVICES[cls] = app.create_future()
+        return f
 
     @classmethod
     def get(cls):
-        """ Acquires the WifiManager service async. """
+        """ Acquires the service async. """
+        f = cls.ready()
+        if cls._instance is None:
+            cls.reference()
+        return f
+
+    @classmethod
+    def prewarm(cls, *services):
+        """ Request all of the given services that were not acquired yet in
+        a single bridge batch.
+        
+        Parameters
+        ----------
+            services: SystemService subclasses
+                The services to acquire
+        
+        Returns
+        -------
+            result: Future
+                A future that resolves with a list of the services once they
+                are all ready.
+                
+        __Example__
+    
+            :::python
+            
+            SystemService.prewarm(SensorManager, WifiManager, 
+                                  NotificationManager)
+        
+        """
         from .app import AndroidApplication
         app = AndroidApplication.instance()
         f = app.create_future()
-
-        if cls._instance:
-            f.set_result(cls._instance)
+        services = list(services)
+        pending = [s for s in services if s._instance is None]
+        if pending:
+            with batch():
+                for s in pending:
+                    s.reference()
+        if not services:
+            f.set_result([])
             return f
 
-        def on_service(obj_id):
-            #: Create the manager
-            if not cls.instance():
-                m = cls(__id__=obj_id)
-            else:
-                m = cls.instance()
-            f.set_result(m)
+        remaining = [len(services)]
 
-        app.get_system_service(cls.SERVICE_TYPE).then(on_service)
+        def on_ready(*args):
+            remaining[0] -= 1
+            if not remaining[0]:
+                f.set_result([s.instance() for s in services])
 
+        for s in services:
+            app.add_done_callback(s.ready(), on_ready)
         return f
 
     def __init__(self, *args, **kwargs):
@@ -9,14 +9,16 @@ Created on May 20, 2017
 
 @author: jrm
 """
-from atom.api import Typed, Value, set_default
+from atom.api import Typed, Value, Bool, Int, set_default
 
 from enamlnative.widgets.fragment import ProxyFragment
 from enamlnative.widgets.view_pager import ProxyPagerFragment
 
 from .android_toolkit_object import AndroidToolkitObject
 from .android_frame_layout import FrameLayout
-from .android_view_pager import BridgedFragmentStatePagerAdapter
+from .android_view_pager import (
+    BridgedFragmentStatePagerAdapter, AndroidViewPager
+)
 from .bridge import JavaBridgeObject, JavaMethod, JavaCallback
 
 
@@ -58,6 +60,12 @@ class AndroidFragment(AndroidToolkitObject, ProxyFragment):
     #: Future set when ready
     ready = Value()
 
+    #: Whether the ready future has been resolved
+    loaded = Bool()
+
+    #: Approximate number of native objects used by the view of this page
+    cost = Int()
+
     def _default_ready(self):
         return self.get_context().create_future()
 
@@ -108,6 +116,13 @@ class AndroidFragment(AndroidToolkitObject, ProxyFragment):
             if self.adapter is not None:
                 self.adapter.removeFragment(self.fragment)
 
+            #: Remove from the pager's cache
+            parent = self.parent()
+            if isinstance(parent, AndroidViewPager):
+                cache = parent.page_cache
+                if self in cache.pages:
+                    cache.pages.remove(self)
+
             del self.fragment
         super(AndroidFragment, self).destroy()
 
@@ -119,53 +134,94 @@ class AndroidFragment(AndroidToolkitObject, ProxyFragment):
 
         """
         d = self.declaration
-        changed = not d.condition
-        if changed:
+        hit = self.widget is not None
+        if not d.condition:
             d.condition = True
 
         view = self.get_view()
 
-        if changed:
+        parent = self.parent()
+        if isinstance(parent, AndroidViewPager):
+            parent.on_page_attached(self, hit)
+
+        if not self.loaded:
+            self.loaded = True
             self.ready.set_result(True)
 
         return view
 
     def on_destroy_view(self):
+        """ Release the view unless it's cached or the pager wants to keep
+        it alive.
+
+        """
+        d = self.declaration
+        parent = self.parent()
+        if isinstance(parent, AndroidViewPager):
+            parent.on_page_detached(self)
+        elif not d.cached:
+            self.release_view()
+
+    def release_view(self):
+        """ Destroy the view of this fragment. It will be built again the
+        next time it's requested.
+
+        """
         d = self.declaration
+        d.condition = False
+
+        #: Delete the reference
+        if self.widget:
+            del self.widget
+        self.cost = 0
 
-        #: Destroy if we don't want to cache it
-        if not d.cached:
-            d.condition = False
+        #: Clear the ready state again!
+        self.loaded = False
+        self.ready = self._default_ready()
 
-            #: Delete the reference
-            if self.widget:
-                del self.widget
+    def prefetch(self):
+        """ Build the view before it is requested by the adapter.
 
-            #: Clear the ready state again!
-            self.ready = self._default_ready()
+        """
+        d = self.declaration
+        if not d.condition:
+            d.condition = True
+        self.get_view()
 
     # -------------------------------------------------------------------------
     # ProxyFragment API
     # -------------------------------------------------------------------------
     def get_view(self):
         """ Get the page to display. If a view has already been created and
-        is cached, use that otherwise initialize the view and proxy. If defer
-        loading is used, wrap the view in a FrameLayout and defer add view 
-        until later. 
+        is cached or kept alive, use that otherwise initialize the view and
+        proxy. If defer loading is used, wrap the view in a FrameLayout and
+        defer add view until later.
         
         """
         d = self.declaration
-        if d.cached and self.widget:
+        if self.widget:
             return self.widget
         if d.defer_loading:
              self.widget = FrameLayout(self.get_context())
              app = self.get_context()
-             app.deferred_call(
-                 lambda: self.widget.addView(self.load_view(), 0))
+             app.deferred_call(self.load_deferred_view, self.widget)
         else:
             self.widget = self.load_view()
         return self.widget
 
+    def load_deferred_view(self, widget):
+        """ Load the view into the FrameLayout created by `get_view` when 
+        using defer loading. The pager's cache is updated since the cost 
+        of the page is only known once it's loaded.
+        
+        """
+        if widget is not self.widget:
+            return  # The view was released before it was loaded
+        widget.addView(self.load_view(), 0)
+        parent = self.parent()
+        if isinstance(parent, AndroidViewPager):
+            parent.evict_pages()
+
     def load_view(self):
         d = self.declaration
         for view in d.items:
@@ -173,6 +229,8 @@ class AndroidFragment(AndroidToolkitObject, ProxyFragment):
                 view.initialize()
             if not view.proxy_is_active:
                 view.activate_proxy()
+            self.cost = len([n for n in view.traverse()
+                             if getattr(n, 'proxy_is_active', False)])
             return view.proxy.widget
 
     def set_cached(self, cached):
@@ -9,17 +9,67 @@ Created on Sept 5, 2017
 
 @author: jrm
 """
-from atom.api import Atom, List, Float, Unicode, set_default
+from atom.api import (Atom, Callable, Instance, List, Float, Unicode,
+                       set_default)
 
-from .bridge import JavaCallback, JavaMethod, JavaProxy
+from .bridge import JavaBridgeObject, JavaCallback, JavaMethod, JavaProxy
 from .android_content import Context, SystemService
 from .app import AndroidApplication
+from ..core.track import Track
 
 
 class LocationAccessDenied(RuntimeError):
     """ User denied access or it's disabled by the system """
 
 
+class LocationBatchListener(JavaBridgeObject):
+    """ Collects location fixes natively and sends them in batches as 
+    packed int64 times and float64 values.
+    
+    """
+    __nativeclass__ = set_default(
+        'com.codelv.enamlnative.adapters.BridgedLocationListener')
+    setLocationBatchListener = JavaMethod(
+        'com.codelv.enamlnative.adapters.BridgedLocationListener'
+        '$LocationBatchListener', 'int', 'int')
+    flush = JavaMethod()
+
+    onLocationData = JavaCallback('int', '[B', '[B')
+    onProviderEnabled = JavaCallback('java.lang.String')
+    onProviderDisabled = JavaCallback('java.lang.String')
+
+
+class LocationStream(Atom):
+    """ Receives batches of fixes from a LocationBatchListener, passes them
+    through the filters, and records them in the track.
+    
+    """
+
+    #: Native listener
+    listener = Instance(LocationBatchListener)
+
+    #: Filters applied to each fix in order
+    filters = List()
+
+    #: Track the fixes are added to, None to not record them
+    track = Instance(Track)
+
+    #: Callback invoked with the list of fixes that passed the filters
+    callback = Callable()
+
+    def on_location_data(self, count, times, values):
+        fixes = Track.decode(count, times, values)
+        for f in self.filters:
+            fixes = [r for r in (f.process(fix) for fix in fixes)
+                     if r is not None]
+        if not fixes:
+            return
+        if self.track is not None:
+            self.track.extend(fixes)
+        if self.callback:
+            self.callback(fixes)
+
+
 class LocationManager(SystemService):
     SERVICE_TYPE = Context.LOCATION_SERVICE
     __nativeclass__ = set_default('android.location.LocationManager')
@@ -57,6 +107,9 @@ class LocationManager(SystemService):
     #: Active listeners
     listeners = List(LocationListener)
 
+    #: Active batched streams
+    streams = List(LocationStream)
+
     @classmethod
     def start(cls, callback, provider='gps', min_time=1000, min_distance=0):
         """ Convenience method that checks and requests permission if necessary
@@ -67,9 +120,6 @@ class LocationManager(SystemService):
         will be denied immediately.
 
         """
-        app = AndroidApplication.instance()
-        f = app.create_future()
-
         def on_success(lm):
             #: When we have finally have permission
             lm.onLocationChanged.connect(callback)
@@ -81,7 +131,91 @@ class LocationManager(SystemService):
 
             lm.requestLocationUpdates(provider, min_time, min_distance,
                                       listener)
-            app.set_future_result(f, True)
+
+        return cls.with_permission(provider, on_success)
+
+    @classmethod
+    def stream(cls, callback=None, provider='gps', min_time=1000,
+               min_distance=0, interval=10000, max_fixes=100, filters=None,
+               track=None):
+        """ Like `start` but fixes are collected natively and sent in 
+        batches every `interval` ms (or once `max_fixes` are collected) 
+        instead of sending an event for each fix. 
+        
+        Parameters
+        ----------
+            callback: Callable
+                Invoked with a list of fix dicts that passed the filters.
+            provider: String
+                Location provider to use.
+            min_time: Integer
+                Min time in ms between fixes requested from the provider.
+            min_distance: Float
+                Min distance in meters between fixes requested from the 
+                provider.
+            interval: Integer
+                Time in ms to collect fixes before sending them.
+            max_fixes: Integer
+                Send the fixes early when this many are collected.
+            filters: List
+                `enamlnative.core.track.LocationFilter` instances applied to
+                each fix in order, such as a `KalmanFilter` and
+                `DistanceFilter`.
+            track: Track
+                A `Track` to record the fixes in.
+                
+        Returns
+        -------
+            result: Future
+                A future that resolves with the `LocationStream` or None if
+                permission was denied.
+        
+        Examples
+        --------
+        
+        track = Track()
+        LocationManager.stream(provider='gps', track=track, filters=[
+            AccuracyFilter(max_accuracy=30), KalmanFilter(), 
+            DistanceFilter(min_distance=5)])
+        # ...
+        track.save(path)
+        
+        """
+        stream = LocationStream(filters=filters or [], track=track,
+                                callback=callback)
+
+        def on_success(lm):
+            listener = LocationBatchListener()
+            listener.setLocationBatchListener(listener.getId(), interval,
+                                              max_fixes)
+            listener.onLocationData.connect(stream.on_location_data)
+            stream.listener = listener
+            lm.streams.append(stream)
+            lm.requestLocationUpdates(provider, min_time, min_distance,
+                                      listener)
+            return stream
+
+        return cls.with_permission(provider, on_success)
+
+    @classmethod
+    def with_permission(cls, provider, callback):
+        """ Check and request permission if necessary then invoke the 
+        callback with the manager.
+        
+        Returns
+        -------
+            result: Future
+                A future that resolves to False if permission was denied
+                otherwise the result of the callback or True if it 
+                returns None.
+        
+        """
+        app = AndroidApplication.instance()
+        f = app.create_future()
+
+        def on_success(lm):
+            result = callback(lm)
+            app.set_future_result(f, True if result is None else result)
 
         def on_perm_request_result(allowed):
             #: When our permission request is accepted or decliend.
@@ -114,6 +248,11 @@ class LocationManager(SystemService):
             for l in manager.listeners:
                 manager.removeUpdates(l)
             manager.listeners = []
+            for stream in manager.streams:
+                manager.removeUpdates(stream.listener)
+                #: Deliver the fixes already collected
+                stream.listener.flush()
+            manager.streams = []
 
 
     @classmethod
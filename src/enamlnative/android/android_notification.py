@@ -28,13 +28,11 @@ from enamlnative.widgets.notification import ProxyNotification
 
 
 # Android really messed this one up
-class NotificationManager(JavaBridgeObject):
+class NotificationManager(SystemService):
     """ Android NotificationManager. Use the `show_notification` and 
     `create_channel` class methods.
     
     """
-    #: Holds the singleton instance
-    _instance = None
     __nativeclass__ = set_default(
         'android.support.v4.app.NotificationManagerCompat')
 
@@ -62,56 +60,12 @@ class NotificationManager(JavaBridgeObject):
     _receivers = List(BroadcastReceiver)
 
     @classmethod
-    def instance(cls):
-        """ Get an instance of this service if it was already requested.
-    
-        You should request it first using `NotificationManager.get()`
-    
-        __Example__
-    
-            :::python
-    
-            def on_manager(m):
-                #: Do stuff with it
-                assert m == NotificationManager.instance()
-    
-            NotificationManager.get().then(on_manager)
-    
-    
+    def request_service(cls, app):
+        """ The compat manager is acquired with `from` instead of 
+        `getSystemService`.
+        
         """
-        return cls._instance
-
-    @classmethod
-    def get(cls):
-        """ Acquires the NotificationManager service async. """
-        app = AndroidApplication.instance()
-        f = app.create_future()
-
-        if cls._instance:
-            f.set_result(cls._instance)
-            return f
-
-        def on_service(obj_id):
-            #: Create the manager
-            if not cls.instance():
-                m = cls(__id__=obj_id)
-            else:
-                m = cls.instance()
-            f.set_result(m)
-
-        cls.from_(app).then(on_service)
-
-        return f
-
-    def __init__(self, *args, **kwargs):
-        """ Force only one instance to exist """
-        cls = self.__class__
-        if cls._instance is not None:
-            raise RuntimeError("Only one instance of {cls} can exist! "
-                               "Use {cls}.instance() instead!"
-                               "".format(cls=cls.__name__))
-        super(NotificationManager, self).__init__(*args, **kwargs)
-        cls._instance = self
+        return cls.from_(app)
 
 
     @classmethod
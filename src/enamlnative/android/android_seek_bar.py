@@ -77,6 +77,18 @@ class AndroidSeekBar(AndroidProgressBar, ProxySeekBar):
     # -------------------------------------------------------------------------
     # ProxySeekBar API
     # -------------------------------------------------------------------------
+    def set_progress_delivery(self, mode):
+        self.update_progress_delivery()
+
+    def set_progress_interval(self, interval):
+        self.update_progress_delivery()
+
+    def update_progress_delivery(self):
+        """ Set how progress changes are sent from the native view """
+        d = self.declaration
+        self.widget.onProgressChanged.set_delivery(d.progress_delivery,
+                                                   d.progress_interval)
+
     def set_key_progress_increment(self, value):
         self.widget.setKeyProgressIncrement(value)
 
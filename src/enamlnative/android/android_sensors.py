@@ -9,11 +9,28 @@ Created on Jan 28, 2018
 
 @author: jrm
 """
-from atom.api import ForwardInstance, Int, set_default
+from atom.api import ForwardInstance, Callable, Instance, Int, set_default
 
 from .bridge import JavaBridgeObject, JavaCallback, JavaMethod
 from .android_content import Context, SystemService
 from .app import AndroidApplication
+from ..core.ringbuffer import RingBuffer
+
+
+class SensorBatchListener(JavaBridgeObject):
+    """ Collects sensor samples natively and sends them in batches as 
+    packed int64 timestamps and float32 values.
+    
+    """
+    __nativeclass__ = set_default(
+        'com.codelv.enamlnative.adapters.BridgedSensorListener')
+    setSensorBatchListener = JavaMethod(
+        'com.codelv.enamlnative.adapters.BridgedSensorListener'
+        '$SensorBatchListener', 'int', 'int')
+    flush = JavaMethod()
+
+    onSensorData = JavaCallback('int', '[B', '[B')
+    onAccuracyChanged = JavaCallback('int')
 
 
 class Sensor(JavaBridgeObject):
@@ -91,6 +108,15 @@ class Sensor(JavaBridgeObject):
     getStringType = JavaMethod(returns='java.lang.String')
     isWakeUpSensor = JavaMethod(returns='boolean')
 
+    #: Buffer of samples when streaming
+    buffer = Instance(RingBuffer)
+
+    #: Native listener that batches samples when streaming
+    listener = Instance(SensorBatchListener)
+
+    #: Callback invoked with the buffer and number of new samples
+    stream_callback = Callable()
+
     # -------------------------------------------------------------------------
     # SensorEventListener API
     # -------------------------------------------------------------------------
@@ -114,7 +140,7 @@ class Sensor(JavaBridgeObject):
         
         """
         app = AndroidApplication.instance()
-        f = app.create_future()
+        f = app.create_bridge_future()
 
         def on_sensor(sid, mgr):
             if sid is None:
@@ -122,9 +148,10 @@ class Sensor(JavaBridgeObject):
             else:
                 f.set_result(Sensor(__id__=sid, manager=mgr, type=sensor_type))
 
-        SensorManager.get().then(
-            lambda sm: sm.getDefaultSensor(sensor_type).then(
-                lambda sid, sm=sm:on_sensor(sid, sm)))
+        #: The manager and sensor are requested in the same round trip
+        sm = SensorManager.reference()
+        sm.getDefaultSensor(sensor_type).then(
+            lambda sid: on_sensor(sid, sm))
 
         return f
 
@@ -154,10 +181,83 @@ class Sensor(JavaBridgeObject):
         self.onSensorChanged.connect(callback)
         return self.manager.registerListener(self.getId(), self, rate)
 
+    def stream(self, callback, rate=SENSOR_DELAY_GAME, interval=100,
+               max_samples=256, capacity=4096, latency=0):
+        """ Start listening to sensor events in batches. Samples are 
+        collected natively and sent together every `interval` ms into a 
+        `RingBuffer` instead of sending an event for each sample.
+        
+        Parameters
+        ----------
+            callback: Callable
+                A callback invoked with the `RingBuffer` and the number of 
+                samples added to it.
+            rate: Integer
+                How fast to sample. One of the Sensor.SENSOR_DELAY values
+                or the delay between samples in microseconds. 
+            interval: Integer
+                Time in ms to collect samples before sending them.
+            max_samples: Integer
+                Send the samples early when this many are collected.
+            capacity: Integer
+                Number of samples kept in the buffer.
+            latency: Integer
+                Max time in microseconds the hardware can hold samples 
+                before reporting them (API 19+). This lets the processor 
+                sleep between batches on sensors with a FIFO.
+        
+        Returns
+        -------
+            result: Future
+                A future that resolves to whether the register call
+                completed.
+                
+        Examples
+        --------
+        
+        def on_data(buf, n):
+            times, values = buf.get(n)  # The new samples
+            print(buf.mean(100))  # Mean of the last 100 samples
+        
+        sensor.stream(on_data, rate=Sensor.SENSOR_DELAY_FASTEST)
+        
+        """
+        if not self.manager:
+            raise RuntimeError(
+                "Cannot start a sensor without a SensorManager!")
+        if self.buffer is None or self.buffer.capacity != capacity:
+            self.buffer = RingBuffer(capacity=capacity)
+        self.stream_callback = callback
+        if self.listener is None:
+            listener = self.listener = SensorBatchListener()
+            listener.onSensorData.connect(self.on_sensor_data)
+        listener = self.listener
+        listener.setSensorBatchListener(listener.getId(), interval,
+                                        max_samples)
+        if latency:
+            return self.manager.registerListener_(listener, self, rate,
+                                                  latency)
+        return self.manager.registerListener(listener, self, rate)
+
+    def on_sensor_data(self, count, times, values):
+        """ Add a batch of samples to the buffer """
+        buf = self.buffer
+        if not count or buf is None:
+            return
+        dimensions = len(values)//(4*count)
+        if buf.dimensions != dimensions:
+            buf.dimensions = dimensions
+        buf.extend_bytes(count, times, values)
+        if self.stream_callback:
+            self.stream_callback(buf, count)
+
     def stop(self):
         """ Stop listening to sensor events. This should be done in
         on resume.
         """
+        if self.listener is not None:
+            self.manager.unregisterListener(self.listener, self)
+            self.listener.flush()
         self.manager.unregisterListener(self.getId(), self)
 
 
@@ -168,6 +268,9 @@ class SensorManager(SystemService):
     registerListener = JavaMethod('android.hardware.SensorEventListener',
                                   'android.hardware.Sensor', 'int',
                                   returns='boolean')
+    registerListener_ = JavaMethod('android.hardware.SensorEventListener',
+                                   'android.hardware.Sensor', 'int', 'int',
+                                   returns='boolean')
     unregisterListener = JavaMethod('android.hardware.SensorEventListener',
                                     'android.hardware.Sensor')
 
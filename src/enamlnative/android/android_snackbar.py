@@ -163,7 +163,7 @@ class AndroidSnackbar(AndroidToolkitObject, ProxySnackbar):
 
             t = min(1000,dt)
             app = self.get_context()
-            app.timed_call(t, self._refresh_show, dt-t)
+            app.timed_call(t, self._refresh_show, dt-t, coarse=True)
 
     # -------------------------------------------------------------------------
     # ProxySnackbar API
@@ -199,6 +199,7 @@ class AndroidSnackbar(AndroidToolkitObject, ProxySnackbar):
             if d.duration:
                 app = self.get_context()
                 t = min(1000,d.duration)
-                app.timed_call(t, self._refresh_show, d.duration-t)
+                app.timed_call(t, self._refresh_show, d.duration-t,
+                               coarse=True)
         else:
             self.widget.dismiss()
@@ -121,7 +121,7 @@ class AndroidToast(AndroidToolkitObject, ProxyToast):
 
             t = min(1000, dt)
             app = self.get_context()
-            app.timed_call(t, self._refresh_show, dt-t)
+            app.timed_call(t, self._refresh_show, dt-t, coarse=True)
 
     # -------------------------------------------------------------------------
     # ProxyToast API
@@ -148,7 +148,7 @@ class AndroidToast(AndroidToolkitObject, ProxyToast):
             #: Get app
             app = self.get_context()
             t = min(1000, d.duration)
-            app.timed_call(t, self._refresh_show, d.duration-t)
+            app.timed_call(t, self._refresh_show, d.duration-t, coarse=True)
         else:
             self.toast.cancel()
 
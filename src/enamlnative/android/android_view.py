@@ -266,6 +266,21 @@ class AndroidView(AndroidToolkitObject, ProxyView):
         else:
             w.onTouch.disconnect(self.on_touch)
 
+    def set_touch_delivery(self, mode):
+        self.update_touch_delivery()
+
+    def set_touch_interval(self, interval):
+        self.update_touch_delivery()
+
+    def set_touch_blocking(self, blocking):
+        self.update_touch_delivery()
+
+    def update_touch_delivery(self):
+        """ Set how touch events are sent from the native view """
+        d = self.declaration
+        self.widget.onTouch.set_delivery(d.touch_delivery, d.touch_interval,
+                                         d.touch_blocking, False)
+
     def set_key_events(self, enabled):
         w = self.widget
         if enabled:
@@ -9,13 +9,14 @@ Created on May 20, 2017
 
 @author: jrm
 """
-from atom.api import Typed, Int, List, set_default
+from atom.api import Atom, Typed, Int, Bool, List, set_default
 
 from enamlnative.widgets.view_pager import (
     ProxyViewPager, ProxyPagerTitleStrip, ProxyPagerTabStrip
 )
 from enamlnative.widgets.view import coerce_gravity, coerce_size
 
+from ..core.loop import EventLoop
 from .android_view import LayoutParams
 from .android_view_group import AndroidViewGroup, ViewGroup
 from .bridge import JavaBridgeObject, JavaMethod, JavaCallback, JavaField
@@ -115,6 +116,45 @@ class BridgedFragmentStatePagerAdapter(JavaBridgeObject):
     notifyDataSetChanged = JavaMethod()
 
 
+class PageCache(Atom):
+    """ Keeps track of pages that have been released by the adapter but are
+    still kept alive by the pager so they don't have to be rebuilt when the
+    user swipes back to them.
+
+    """
+    #: Pages released by the adapter that are still alive in the order
+    #: they were released (least recently used first)
+    pages = List()
+
+    #: Number of times a page was requested and was already built
+    hits = Int()
+
+    #: Number of times a page was requested and had to be built
+    misses = Int()
+
+    #: Number of pages destroyed by the cache
+    evictions = Int()
+
+    #: Number of pages built ahead of time
+    prefetches = Int()
+
+    @property
+    def cost(self):
+        """ Approximate number of native objects held by the cache """
+        return sum(p.cost for p in self.pages)
+
+    def stats(self):
+        """ Return a dict of the current cache stats """
+        return {
+            'pages': len(self.pages),
+            'cost': self.cost,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'prefetches': self.prefetches,
+        }
+
+
 class AndroidViewPager(AndroidViewGroup, ProxyViewPager):
     """ An Android implementation of an Enaml ProxyViewPager.
 
@@ -125,9 +165,11 @@ class AndroidViewPager(AndroidViewGroup, ProxyViewPager):
     #: Adapter
     adapter = Typed(BridgedFragmentStatePagerAdapter)
 
+    #: Pages kept alive after the adapter released them
+    page_cache = Typed(PageCache, ())
+
     #: Pending changes
-    _notify_count = Int()
-    _notify_delay = Int(2)
+    _notify_pending = Bool()
     _pending_calls = List()
 
     @property
@@ -157,41 +199,54 @@ class AndroidViewPager(AndroidViewGroup, ProxyViewPager):
         w.addOnPageChangeListener(w.getId())
         w.onPageSelected.connect(self.on_page_selected)
 
+        #: Scroll events are sent every frame while paging but not used
+        w.onPageScrolled.set_delivery('none')
+
         if d.current_index:
             self.set_current_index(d.current_index)
 
     def child_added(self, child):
         """ When a child is added, schedule a data changed notification """
         super(AndroidViewPager, self).child_added(child)
-        self._notify_count += 1
-        self.get_context().timed_call(
-            self._notify_delay, self._notify_change)
+        self._schedule_notify()
 
     def child_removed(self, child):
         """ When a child is removed, schedule a data changed notification """
         super(AndroidViewPager, self).child_removed(child)
-        self._notify_count += 1
-        self.get_context().timed_call(
-            self._notify_delay, self._notify_change)
+        self._schedule_notify()
+
+    def _schedule_notify(self):
+        """ Notify Java once when the current batch of events is sent
+        regardless of how many children were changed.
+
+        """
+        if not self._notify_pending:
+            self._notify_pending = True
+            self.get_context().call_before_flush(self._notify_change)
 
     def _notify_change(self):
-        """ After all changes have settled, tell Java it changed """
-        d = self.declaration
-        self._notify_count -= 1
-        if self._notify_count == 0:
-            #: Tell the UI we made changes
-            self.adapter.notifyDataSetChanged(now=True)
-            self.get_context().timed_call(
-                500, self._queue_pending_calls)
+        """ After all changes have been queued, tell Java it changed """
+        self._notify_pending = False
+        if self.adapter is None:
+            return
+
+        #: Tell the UI we made changes
+        self.adapter.notifyDataSetChanged()
+        self._queue_pending_calls()
 
     def _queue_pending_calls(self):
+        #: Nothing to wait for, don't add another callback to the page
+        if not self._pending_calls:
+            return
+
         #: Now wait for current page to load, then invoke any pending calls
         for i, page in enumerate(self.pages):
             #: Wait for first page!
             #: Trigger when the current page is loaded
             page.ready.then(self._run_pending_calls)
             #: If the page is already complete it will be called right away
-            break
+            return
+        self._run_pending_calls()
 
     def _run_pending_calls(self, *args):
         if self._pending_calls:
@@ -221,7 +276,115 @@ class AndroidViewPager(AndroidViewGroup, ProxyViewPager):
         d = self.declaration
         with self.widget.setCurrentItem.suppressed():
             d.current_index = position
-    
+        self.evict_pages()
+        if d.prefetch:
+            self.prefetch_page(position + 1)
+
+    # -------------------------------------------------------------------------
+    # Page cache API
+    # -------------------------------------------------------------------------
+    def on_page_attached(self, page, hit):
+        """ Called by a page when the adapter requests it's view.
+
+        Parameters
+        ----------
+        page: AndroidFragment
+            The page that was requested.
+        hit: bool
+            Whether the view of the page was already built.
+
+        """
+        cache = self.page_cache
+        if page in cache.pages:
+            cache.pages.remove(page)
+        if hit:
+            cache.hits += 1
+        else:
+            cache.misses += 1
+
+    def on_page_detached(self, page):
+        """ Called by a page when the adapter destroys it's view. The page is
+        kept alive if it's cached or within the `cache_limit` and
+        `cache_budget` otherwise it's view is released.
+
+        Parameters
+        ----------
+        page: AndroidFragment
+            The page that was released by the adapter.
+
+        """
+        d = self.declaration
+        if page.declaration.cached:
+            return
+        if not d.cache_limit:
+            page.release_view()
+            return
+        self.page_cache.pages.append(page)
+        self.evict_pages()
+
+    def evict_pages(self):
+        """ Release pages kept alive by the cache that are either out of the
+        `cache_limit` range of the current page or that exceed the
+        `cache_budget` (least recently used first).
+
+        """
+        d = self.declaration
+        cache = self.page_cache
+        if not cache.pages:
+            return
+        pages = list(self.pages)
+        index = d.current_index
+        keep = []
+        for page in cache.pages:
+            if page not in pages or abs(pages.index(page)-index) > \
+                    d.cache_limit:
+                page.release_view()
+                cache.evictions += 1
+            else:
+                keep.append(page)
+
+        if d.cache_budget:
+            cost = sum(p.cost for p in keep)
+            while keep and cost > d.cache_budget:
+                page = keep.pop(0)
+                cost -= page.cost
+                page.release_view()
+                cache.evictions += 1
+        cache.pages = keep
+
+    def prefetch_page(self, index):
+        """ Build the page at the given index when the event loop is idle.
+
+        Parameters
+        ----------
+        index: int
+            The index of the page to build
+
+        """
+        self.get_context().deferred_call(self._prefetch_page, index,
+                                         priority=EventLoop.PRIORITY_IDLE)
+
+    def _prefetch_page(self, index):
+        """ Build the page at the given index if it still needs built. The
+        page is kept by the cache until the adapter requests it so it's
+        released like any other page if the user never swipes to it.
+        
+        """
+        d = self.declaration
+        if not d.cache_limit:
+            return
+        pages = list(self.pages)
+        if 0 <= index < len(pages):
+            page = pages[index]
+            if page is not None and page.fragment is not None and \
+                    page.widget is None:
+                page.prefetch()
+                cache = self.page_cache
+                cache.prefetches += 1
+                if not page.declaration.cached:
+                    cache.pages.append(page)
+                    self.evict_pages()
+
     # -------------------------------------------------------------------------
     # ProxyViewPager API
     # -------------------------------------------------------------------------
@@ -234,7 +397,7 @@ class AndroidViewPager(AndroidViewGroup, ProxyViewPager):
         # d = self.declaration
         # #: We have to wait for the current_index to be ready before we can
         # #: change pages
-        if self._notify_count > 0:
+        if self._notify_pending:
             self._pending_calls.append(
                 lambda index=index: self.widget.setCurrentItem(index))
         else:
@@ -253,6 +416,16 @@ class AndroidViewPager(AndroidViewGroup, ProxyViewPager):
         self.widget.setPageTransformer(True,
                                        PageTransformer.from_name(transition))
 
+    def set_cache_limit(self, limit):
+        self.evict_pages()
+
+    def set_cache_budget(self, budget):
+        self.evict_pages()
+
+    def set_prefetch(self, prefetch):
+        if prefetch:
+            self.prefetch_page(self.declaration.current_index + 1)
+
     def create_layout_params(self, child, layout):
         """ Override as there is no (width, height) constructor.
         
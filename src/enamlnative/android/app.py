@@ -50,6 +50,10 @@ class AndroidApplication(BridgedApplication):
     #: to handle back presses.
     back_pressed = Event(dict)
 
+    #: SystemService subclasses to acquire in a single bridge batch when the 
+    #: app starts (ex. [SensorManager, WifiManager]). 
+    services = List()
+
     #: Permission code increments on each request
     _permission_code = Int()
 
@@ -65,6 +69,13 @@ class AndroidApplication(BridgedApplication):
          """
         return Activity(__id__=-1)
 
+    def _default_process_executor(self):
+        """ Android apps cannot fork the embedded interpreter so 
+        `run_in_process` uses the thread pool.
+        
+        """
+        return None
+
     # -------------------------------------------------------------------------
     # AndroidApplication Constructor
     # -------------------------------------------------------------------------
@@ -101,7 +112,7 @@ class AndroidApplication(BridgedApplication):
         """ Return a future that resolves with the result of the permission 
         
         """
-        f = self.create_future()
+        f = self.create_bridge_future()
 
         #: Old versions of android did permissions at install time
         if self.api_level < 23:
@@ -121,7 +132,7 @@ class AndroidApplication(BridgedApplication):
         of the permission requests
         
         """
-        f = self.create_future()
+        f = self.create_bridge_future()
 
         #: Old versions of android did permissions at install time
         if self.api_level < 23:
@@ -218,6 +229,7 @@ class AndroidApplication(BridgedApplication):
                 display the view 
                 
                 """
+                shown = bool(self.build_info)
                 self.dp = info['DISPLAY_DENSITY']
                 self.width = info['DISPLAY_WIDTH']
                 self.height = info['DISPLAY_HEIGHT']
@@ -225,10 +237,23 @@ class AndroidApplication(BridgedApplication):
                                     info['DISPLAY_ORIENTATION']]
                 self.api_level = info['SDK_INT']
                 self.build_info = info
-                self._show_view()
+                if not shown:
+                    self._show_view()
 
             self.init_widget()
-            self.widget.getBuildInfo().then(on_build_info)
+
+            if self.services:
+                from .android_content import SystemService
+                SystemService.prewarm(*self.services)
+
+            #: The build info is saved from the last run so the view can
+            #: be shown without waiting for the bridge. It's refreshed
+            #: afterwards in case the display changed (ex rotated).
+            get_build_info = self.widget.getBuildInfo
+            cached = get_build_info.is_cached()
+            get_build_info().then(on_build_info)
+            if cached:
+                get_build_info.refresh().then(on_build_info)
         else:
             self._show_view()
 
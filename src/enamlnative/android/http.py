@@ -10,13 +10,16 @@ Created on July 18, 2017
 @author: jrm
 """
 
+import os
 import time
 from atom.api import (Atom, Callable, Dict, List, ForwardInstance, Int,
                       Float, Bool, Unicode, Instance, set_default)
 from .bridge import (JavaBridgeObject, JavaMethod, JavaCallback,
                      JavaStaticMethod)
+from .android_content import BroadcastReceiver
 from ..core.http import (HttpRequest, HttpError, AbstractAsyncHttpClient,
                          AbstractWebsocketClient)
+from ..core.http_queue import HttpRequestQueue
 
 
 class BridgedAsyncHttpCallback(JavaBridgeObject):
@@ -25,6 +28,9 @@ class BridgedAsyncHttpCallback(JavaBridgeObject):
     setAsyncHttpResponseListener = JavaMethod(
         'com.codelv.enamlnative.adapters.BridgedAsyncHttpCallback'
         '$AsyncHttpResponseListener', 'boolean')
+    setOutputFile = JavaMethod('java.lang.String')
+    setStreamOptions = JavaMethod('int', 'int')
+    ack = JavaMethod()
 
     # -------------------------------------------------------------------------
     # AsyncHttpResponseHandler API
@@ -94,11 +100,31 @@ class MediaType(JavaBridgeObject):
     parse = JavaStaticMethod('java.lang.String', returns='okhttp3.MediaType')
 
 
+class File(JavaBridgeObject):
+    __nativeclass__ = set_default('java.io.File')
+    __signature__ = set_default(('java.lang.String',))
+
+
 class RequestBody(JavaBridgeObject):
     __nativeclass__ = set_default('okhttp3.RequestBody')
     create = JavaStaticMethod('okhttp3.MediaType', 'java.lang.String',
-                              # TODO: Should support '[B',
                               returns='okhttp3.RequestBody')
+    create_ = JavaStaticMethod('okhttp3.MediaType', '[B',
+                               returns='okhttp3.RequestBody')
+    create__ = JavaStaticMethod('okhttp3.MediaType', 'java.io.File',
+                                returns='okhttp3.RequestBody')
+
+
+class MultipartBody(JavaBridgeObject):
+    __nativeclass__ = set_default('okhttp3.MultipartBody')
+
+    class Builder(JavaBridgeObject):
+        __nativeclass__ = set_default('okhttp3.MultipartBody$Builder')
+        setType = JavaMethod('okhttp3.MediaType')
+        addFormDataPart = JavaMethod('java.lang.String', 'java.lang.String')
+        addFormDataPart_ = JavaMethod('java.lang.String', 'java.lang.String',
+                                      'okhttp3.RequestBody')
+        build = JavaMethod(returns='okhttp3.MultipartBody')
 
 
 class Request(JavaBridgeObject):
@@ -117,13 +143,22 @@ class Request(JavaBridgeObject):
 
 class WebSocketListener(JavaBridgeObject):
     __nativeclass__ = set_default(
-        'com.codelv.enamlnative.adapters.BridgedWebsocketListener')
+        'com.codelv.enamlnative.adapters.BridgedWebSocketListener')
+    setWebSocketListener = JavaMethod(
+        'com.codelv.enamlnative.adapters.BridgedWebSocketListener'
+        '$WebSocketResponseListener', 'int')
+    connect = JavaMethod('okhttp3.OkHttpClient', 'okhttp3.Request')
+    send = JavaMethod('java.lang.String')
+    send_ = JavaMethod('[B')
+    sendAll = JavaMethod('[Ljava.lang.Object;')
+    close = JavaMethod('int', 'java.lang.String')
+    cancel = JavaMethod()
 
-    onClosed = JavaCallback('WebSocket webSocket', 'int code', 'String reason')
-    onClosing = JavaCallback('WebSocket webSocket, int code, String reason')
-    onFailure = JavaCallback('WebSocket webSocket, Throwable t, Response response')
-    onMessage = JavaCallback('WebSocket webSocket', 'bytes or string')
-    onOpen = JavaCallback('WebSocket webSocket', 'Response response')
+    onOpen = JavaCallback('int')
+    onMessages = JavaCallback('[Ljava.lang.String;')
+    onBinaryMessages = JavaCallback('[[B')
+    onClosed = JavaCallback('int', 'java.lang.String')
+    onFailure = JavaCallback('java.lang.String', 'int')
 
 
 class AndroidHttpRequest(HttpRequest):
@@ -144,19 +179,29 @@ class AndroidHttpRequest(HttpRequest):
         builder = Request.Builder()
         builder.url(self.url)
 
+        #: Get the body or generate from the data given, this may add
+        #: a Content-Encoding header
+        body = self.encode_body()
+
         #: Set any headers
         for k, v in self.headers.items():
             builder.addHeader(k, v)
 
-        #: Get the body or generate from the data given
-        body = self.body
-
-        if body:
+        if self.files:
+            builder.method(self.method, self.create_multipart_body())
+        elif body:
             #: Create the request body
             media_type = MediaType(
                 __id__=MediaType.parse(self.content_type))
-            request_body = RequestBody(
-                __id__=RequestBody.create(media_type, body))
+            #: Bytes are sent as a byte[] so compressed bodies aren't decoded
+            #: as text, this includes py2 str which the bridge packs as a
+            #: msgpack str
+            if isinstance(body, bytes):
+                request_body = RequestBody(
+                    __id__=RequestBody.create_(media_type, body))
+            else:
+                request_body = RequestBody(
+                    __id__=RequestBody.create(media_type, body))
             #: Set the request method
             builder.method(self.method, request_body)
         elif self.method in ['get', 'delete', 'head']:
@@ -174,6 +219,10 @@ class AndroidHttpRequest(HttpRequest):
         handler.setAsyncHttpResponseListener(
             handler.getId(),
             self.streaming_callback is not None)
+        if self.output:
+            handler.setOutputFile(self.output)
+        elif self.streaming_callback is not None:
+            handler.setStreamOptions(self.chunk_size, self.stream_window)
         handler.onStart.connect(self.on_start)
         handler.onCancel.connect(self.on_cancel)
         handler.onFailure.connect(self.on_failure)
@@ -181,27 +230,31 @@ class AndroidHttpRequest(HttpRequest):
         handler.onProgress.connect(self.on_progress)
         handler.onProgressData.connect(self.on_progress_data)
         handler.onSuccess.connect(self.on_success)
-        handler.onRetry(self.on_retry)
+        handler.onRetry.connect(self.on_retry)
 
         return handler
 
-    def _default_body(self):
-        """ If the body is not passed in by the user try to create one
-        using the given data parameters. 
+    def create_multipart_body(self):
+        """ Create a multipart/form-data body with the data and files. The
+        files are streamed from disk by OkHttp.
+        
         """
-        if not self.data:
-            return ""
-        if self.content_type == 'application/json':
-            import json
-            return json.dumps(self.data)
-        elif self.content_type == 'application/x-www-form-urlencoded':
-            import urllib
-            return urllib.urlencode(self.data)
-        else:
-            raise NotImplementedError(
-                "You must manually encode the request "
-                "body for '{}'".format(self.content_type)
-            )
+        builder = MultipartBody.Builder()
+        builder.setType(MediaType(__id__=MediaType.parse(
+            'multipart/form-data')))
+        for name, value in self.data.items():
+            builder.addFormDataPart(name, u"{}".format(value))
+        for name, value in self.files.items():
+            if isinstance(value, (tuple, list)):
+                filename, path, content_type = value
+            else:
+                filename, path = os.path.basename(value), value
+                content_type = 'application/octet-stream'
+            media_type = MediaType(__id__=MediaType.parse(content_type))
+            part = RequestBody(__id__=RequestBody.create__(media_type,
+                                                           File(path)))
+            builder.addFormDataPart_(name, filename, part)
+        return MultipartBody(__id__=builder.build())
 
     def on_start(self):
         pass
@@ -218,7 +271,7 @@ class AndroidHttpRequest(HttpRequest):
         if headers:
             r.headers = headers
         if data:
-            r.body = data
+            r.body = r.decode(data)
         r.progress = 100
         r.ok = True
 
@@ -231,7 +284,7 @@ class AndroidHttpRequest(HttpRequest):
             r.reason = error
         r.error = HttpError(status, error, r)
         if data:
-            r.body = data
+            r.body = r.decode(data)
         r.ok = False
 
     def on_finish(self):
@@ -248,8 +301,20 @@ class AndroidHttpRequest(HttpRequest):
             r.progress = int(100*written/total)
 
     def on_progress_data(self, data):
-        if self.streaming_callback:
-            self.streaming_callback(data)
+        """ Pass the chunk to the streaming callback and let the native 
+        client read the next one when it's handled.
+        
+        """
+        result = None
+        try:
+            if self.streaming_callback:
+                result = self.streaming_callback(data)
+        finally:
+            if hasattr(result, 'then'):
+                result.then(lambda r: self.handler.ack())
+                result.catch(lambda e: self.handler.ack())
+            else:
+                self.handler.ack()
 
 
 class AsyncHttpClient(AbstractAsyncHttpClient):
@@ -283,3 +348,102 @@ class AsyncHttpClient(AbstractAsyncHttpClient):
 
         #: Save the call reference
         request.call = call
+
+
+class WebsocketClient(AbstractWebsocketClient):
+    """ A websocket client using OkHttp. See `AbstractWebsocketClient` """
+
+    #: The client that opens the connection
+    client = Instance(OkHttpClient)
+
+    #: Handles the native connection and callbacks
+    listener = Instance(WebSocketListener)
+
+    def _default_client(self):
+        return OkHttpClient.instance()
+
+    def _default_listener(self):
+        listener = WebSocketListener()
+        listener.setWebSocketListener(listener.getId(),
+                                      self.coalesce_interval)
+        listener.onOpen.connect(self.on_native_open)
+        listener.onMessages.connect(self.on_native_messages)
+        listener.onBinaryMessages.connect(self.on_native_binary_messages)
+        listener.onClosed.connect(self.on_native_closed)
+        listener.onFailure.connect(self.on_native_failure)
+        return listener
+
+    def _connect(self):
+        builder = Request.Builder()
+        builder.url(self.url)
+        for k, v in self.headers.items():
+            builder.addHeader(k, v)
+        request = Request(__id__=builder.build())
+        self.listener.connect(self.client, request)
+
+    def _send(self, messages):
+        listener = self.listener
+        if len(messages) == 1:
+            message, binary = messages[0]
+            if binary:
+                listener.send_(message)
+            else:
+                listener.send(message)
+        else:
+            listener.sendAll([m for m, binary in messages])
+
+    def _close(self, code, reason):
+        self.listener.close(code, reason)
+
+    def on_native_open(self, code):
+        self.handle_open()
+
+    def on_native_messages(self, messages):
+        self.handle_messages(messages, False)
+
+    def on_native_binary_messages(self, messages):
+        self.handle_messages(messages, True)
+
+    def on_native_closed(self, code, reason):
+        self.handle_close(code, reason)
+
+    def on_native_failure(self, error, code):
+        self.handle_close(code, error=error or "Connection failed")
+
+
+class AndroidHttpRequestQueue(HttpRequestQueue):
+    """ An HttpRequestQueue that is also sent when the network 
+    connectivity changes. See `HttpRequestQueue`
+    
+    """
+    #: Action broadcast when the network connectivity changes
+    CONNECTIVITY_ACTION = 'android.net.conn.CONNECTIVITY_CHANGE'
+
+    #: Receives connectivity changes once requests are waiting to be sent
+    receiver = Instance(BroadcastReceiver)
+
+    def _default_client(self):
+        return AsyncHttpClient()
+
+    def schedule_replay(self):
+        """ Also send the queue when the connectivity changes """
+        if self.receiver is None:
+            self.receiver = BroadcastReceiver.for_action(
+                self.CONNECTIVITY_ACTION, self.on_connectivity_changed,
+                single_shot=False)
+        super(AndroidHttpRequestQueue, self).schedule_replay()
+
+    def on_connectivity_changed(self, intent):
+        if self.pending and not self.replaying:
+            self.resume()
+
+    def stop(self):
+        """ Stop listening for connectivity changes so the receiver and 
+        this queue can be released. It's registered again the next time a 
+        replay is scheduled.
+        
+        """
+        receiver = self.receiver
+        if receiver is not None:
+            del self.receiver
+            receiver.unregister()
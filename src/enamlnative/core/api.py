@@ -16,4 +16,6 @@ from enaml.core.api import *
 if sys.platform == 'darwin':
     pass  #: iOS
 else:
-    from enamlnative.android.http import AsyncHttpClient
\ No newline at end of file
+    from enamlnative.android.http import (
+        AsyncHttpClient, WebsocketClient, AndroidHttpRequestQueue
+    )
\ No newline at end of file
@@ -10,6 +10,7 @@ The full license is in the file LICENSE, distributed with this software.
 
 """
 import json
+import inspect
 import traceback
 from atom.api import (
     Atom, Enum, Callable, List, Instance, Value, Int, Unicode, Bool, Dict,
@@ -21,6 +22,15 @@ from .loop import EventLoop
 from time import time
 
 
+def is_coroutine(obj):
+    """ Check if the object is a coroutine (from an `async def` function).
+    Always False on python 2.
+    
+    """
+    iscoroutine = getattr(inspect, 'iscoroutine', None)
+    return iscoroutine is not None and iscoroutine(obj)
+
+
 class Plugin(Atom):
     """ Simplified way to load a plugin from an entry_point line. 
     The enaml-native and p4a build process removes pkg_resources 
@@ -75,6 +85,11 @@ class BridgedApplication(Application):
     #: If true, debug bridge statements
     debug = Bool()
 
+    #: Build the view in chunks taking at most this many ms per loop
+    #: iteration so events are still handled while large views load.
+    #: If zero, the whole view is built at once.
+    build_budget = Float(strict=False)
+
     #: Use dev server
     dev = Unicode()
     _dev_session = Value()
@@ -82,6 +97,18 @@ class BridgedApplication(Application):
     #: Event loop
     loop = Instance(EventLoop)
 
+    #: Thread pool used by `run_in_executor`. A `ThreadPoolExecutor` with
+    #: `executor_workers` threads is created when first used.
+    executor = Value()
+
+    #: Number of threads used by the default executor
+    executor_workers = Int(4)
+
+    #: Process pool used by `run_in_process`. This is None on platforms
+    #: where a `ProcessPoolExecutor` cannot be used. The Android and iOS 
+    #: applications cannot start worker processes so it's always None.
+    process_executor = Value()
+
     #: Events to send to the bridge
     _bridge_queue = List()
 
@@ -91,6 +118,9 @@ class BridgedApplication(Application):
     #: Time last sent
     _bridge_last_scheduled = Float()
 
+    #: Callbacks to invoke right before the next batch is sent
+    _bridge_flush_callbacks = List()
+
     #: Entry points to load plugins
     plugins = Dict()
 
@@ -101,6 +131,22 @@ class BridgedApplication(Application):
         """ Get the event loop based on what libraries are available. """
         return EventLoop.default()
 
+    def _default_executor(self):
+        from concurrent.futures import ThreadPoolExecutor
+        return ThreadPoolExecutor(self.executor_workers)
+
+    def _default_process_executor(self):
+        """ Create a process pool if the platform supports it. Platform
+        applications that cannot start processes return None so the 
+        thread pool is used instead.
+        
+        """
+        try:
+            from concurrent.futures import ProcessPoolExecutor
+            return ProcessPoolExecutor()
+        except (ImportError, NotImplementedError, OSError) as e:
+            self.loop.log_error(self._default_process_executor, e)
+
     def _default_plugins(self):
         """ Get entry points to load any plugins installed. 
         The build process should create an "entry_points.json" file
@@ -154,6 +200,10 @@ class BridgedApplication(Application):
 
         """
         self.loop.stop()
+        for executor in (self.get_member('executor').get_slot(self),
+                         self.get_member('process_executor').get_slot(self)):
+            if executor is not None:
+                executor.shutdown(wait=False)
 
     def deferred_call(self, callback, *args, **kwargs):
         """ Invoke a callable on the next cycle of the main event loop
@@ -166,6 +216,9 @@ class BridgedApplication(Application):
 
         *args, **kwargs
             Any additional positional and keyword arguments to pass to
+            the callback. A `priority` keyword argument with one of the
+            `EventLoop.PRIORITY_*` values can be given to run the callback
+            before or after other pending callbacks. It is not passed to
             the callback.
 
         """
@@ -186,11 +239,134 @@ class BridgedApplication(Application):
 
         *args, **kwargs
             Any additional positional and keyword arguments to pass to
-            the callback.
+            the callback. A `coarse` keyword argument can be given for
+            timers that don't need to be precise (debounces, clock ticks)
+            which are much cheaper to add and cancel with the builtin 
+            event loop. It is not passed to the callback.
 
         """
         return self.loop.timed_call(ms, callback, *args, **kwargs)
 
+    def run_in_executor(self, func, *args, **kwargs):
+        """ Invoke a callable in the thread pool so cpu bound work (ex 
+        parsing a large response) does not block the event loop. 
+
+        Parameters
+        ----------
+        func : callable
+            The callable object to execute in a worker thread.
+
+        *args, **kwargs
+            Any additional positional and keyword arguments to pass to
+            the callable.
+
+        Returns
+        -------
+        result: Future
+            A future that is resolved with the return value (or error) 
+            of the callable in the event loop thread.
+
+        """
+        return self._submit(self.executor, func, *args, **kwargs)
+
+    def run_in_process(self, func, *args, **kwargs):
+        """ Invoke a callable in the process pool. The callable and 
+        arguments must be picklable. If the platform does not support 
+        a process pool the thread pool is used instead.
+
+        Parameters
+        ----------
+        func : callable
+            The callable object to execute in a worker process.
+
+        *args, **kwargs
+            Any additional positional and keyword arguments to pass to
+            the callable.
+
+        Returns
+        -------
+        result: Future
+            A future that is resolved with the return value (or error) 
+            of the callable in the event loop thread.
+
+        """
+        executor = self.process_executor or self.executor
+        return self._submit(executor, func, *args, **kwargs)
+
+    def _submit(self, executor, func, *args, **kwargs):
+        """ Submit the call to the executor and return a future that is 
+        resolved in the event loop thread.
+        
+        """
+        f = self.create_future()
+
+        def on_done(result):
+            #: Called from the worker thread
+            self.loop.threadsafe_call(self._resolve_executor_future, f,
+                                      result)
+
+        executor.submit(func, *args, **kwargs).add_done_callback(on_done)
+        return f
+
+    def run_coroutine(self, coro):
+        """ Run a coroutine (from calling an `async def` function) in the
+        event loop. Bridge futures and widget callbacks can be awaited within
+        the coroutine.
+
+        Parameters
+        ----------
+        coro : coroutine
+            The coroutine to run.
+
+        Returns
+        -------
+        result: Future
+            A future that is resolved with the return value (or error) 
+            of the coroutine.
+
+        """
+        return self.loop.run_coroutine(coro)
+
+    def _resolve_executor_future(self, f, result):
+        """ Pass the result of the executor future to the loop future """
+        error = result.exception()
+        if error is not None:
+            f.set_exception(error)
+        else:
+            self.set_future_result(f, result.result())
+
+    def start_loop_monitor(self, **kwargs):
+        """ Start recording event loop lag, callback execution times, 
+        and queue depths to find handlers that cause dropped frames.
+        
+        Parameters
+        ----------
+        kwargs:
+            Options to pass to the `LoopMonitor` such as `interval`, 
+            `slow_threshold`, or `log_slow`.
+        
+        Returns
+        -------
+        monitor: LoopMonitor
+            The monitor recording the data.
+        
+        """
+        return self.loop.start_monitor(**kwargs)
+
+    def get_loop_stats(self):
+        """ Get the stats recorded by the loop monitor.
+        
+        Returns
+        -------
+        stats: dict or None
+            The histograms, queue depths, and slowest callbacks recorded
+            or None if the monitor was never started.
+        
+        """
+        monitor = self.loop.monitor
+        if monitor is not None:
+            return monitor.stats()
+
     def is_main_thread(self):
         """ Indicates whether the caller is on the main gui thread.
 
@@ -229,6 +405,10 @@ class BridgedApplication(Application):
         """ Create a future object using the EventLoop implementation """
         return self.loop.create_future()
 
+    def create_bridge_future(self):
+        """ Create a future object for a result returned over the bridge """
+        return self.loop.create_bridge_future()
+
     def run_iteration(self):
         """ Run an iteration of the event loop  """
         return self.loop.run_iteration()
@@ -281,6 +461,11 @@ class BridgedApplication(Application):
         
         """
         view = self.view
+        if self.build_budget and not view.proxy_is_active:
+            from .builder import ChunkedBuilder
+            builder = ChunkedBuilder(app=self, view=view,
+                                     budget=self.build_budget)
+            return builder.start()
         if not view.is_initialized:
             view.initialize()
         if not view.proxy_is_active:
@@ -318,7 +503,8 @@ class BridgedApplication(Application):
         if n == 0:
             # First event, send at next available time
             self._bridge_last_scheduled = time()
-            self.deferred_call(self._bridge_send)
+            self.deferred_call(self._bridge_send,
+                               priority=EventLoop.PRIORITY_FLUSH)
             return
         elif kwargs.get('now'):
             self._bridge_send(now=True)
@@ -329,6 +515,29 @@ class BridgedApplication(Application):
         if dt > self._bridge_max_delay:
             self._bridge_send(now=True)
 
+    def call_before_flush(self, callback):
+        """ Invoke the callback once right before the next batch of events
+        is sent over the bridge. Use this to coalesce several changes made
+        within the same loop iteration into a single native call. Adding
+        the same callback more than once per batch only invokes it once.
+
+        Parameters
+        ----------
+        callback : callable
+            The callable object to invoke with no arguments. It may send
+            events which will be included in the batch.
+
+        """
+        if callback in self._bridge_flush_callbacks:
+            return
+        self._bridge_flush_callbacks.append(callback)
+
+        #: Make sure a flush is scheduled
+        if not self._bridge_queue and len(self._bridge_flush_callbacks) == 1:
+            self._bridge_last_scheduled = time()
+            self.deferred_call(self._bridge_send,
+                               priority=EventLoop.PRIORITY_FLUSH)
+
     def force_update(self):
         """ Force an update now. """
         #: So we don't get out of order
@@ -345,6 +554,11 @@ class BridgedApplication(Application):
             to finish. Use this when you want to update the screen
 
         """
+        if self._bridge_flush_callbacks:
+            callbacks = self._bridge_flush_callbacks
+            self._bridge_flush_callbacks = []
+            for callback in callbacks:
+                callback()
         if len(self._bridge_queue):
             if self.debug:
                 print("======== Py --> Native ======")
@@ -384,6 +598,11 @@ class BridgedApplication(Application):
         try:
             obj, handler = bridge.get_handler(ptr, method)
             result = handler(*[v for t, v in args])
+            if is_coroutine(result):
+                #: Run `async def` handlers in the event loop, native code
+                #: cannot wait for the result
+                self.loop.run_coroutine(result)
+                result = None
         except bridge.BridgeReferenceError as e:
             #: Log the event, don't blow up here
             msg = "Error processing event: {} - {}".format(
@@ -431,7 +650,8 @@ class BridgedApplication(Application):
         
         """
         #: Pass to event loop thread
-        self.deferred_call(self.process_events, data)
+        self.deferred_call(self.process_events, data,
+                           priority=EventLoop.PRIORITY_INPUT)
 
     def on_pause(self):
         """ Called when the app is paused.
@@ -9,15 +9,26 @@ Created on June 21, 2017
 
 @author: jrm
 """
+import os
+import json
 import msgpack
 import functools
-from atom.api import Atom, Property, Instance, ForwardInstance, Dict, Unicode, Tuple, Int
-from weakref import WeakValueDictionary
+import tempfile
+from atom.api import (
+    Atom, Property, Instance, ForwardInstance, Unicode, Tuple, Int, Value
+)
+from weakref import WeakValueDictionary, WeakKeyDictionary, ref
 from contextlib import contextmanager
 
 CACHE = WeakValueDictionary()
+FUTURES = {}
+BATCHES = []
+PERSISTENT_RESULTS = None
+RESULT_CACHE_SCOPES = ('object', 'process', 'persistent')
+DELIVERY_MODES = ('all', 'sample', 'latest', 'none')
 PROXY_CACHE = WeakValueDictionary()
 CLASS_CACHE = {}
+CALLBACK_SLOTS = {}
 __global_id__ = 0
 __proxy_id__ = 0
 __property_id__ = 0
@@ -32,6 +43,9 @@ class Command:
     DELETE = "d"
     RESULT = "r"
     ERROR = "e"
+    BATCH_START = "bs"
+    BATCH_END = "be"
+    EVENT_MODE = "em"
     DEF = "def"
 
 
@@ -118,17 +132,425 @@ class BridgeReferenceError(ReferenceError):
 
 def get_handler(ptr, method):
     """ Dereference the pointer and return the handler method. """
-    obj = CACHE.get(ptr, None)
+    obj = FUTURES.get(ptr, None)
+    if obj is None:
+        obj = CACHE.get(ptr, None)
     if obj is None:
         raise BridgeReferenceError(
             "Reference id={} never existed or has already been destroyed"
             .format(ptr))
+
+    #: Skip creating the partials used by the callback's getter
+    callback = getattr(type(obj), method, None)
+    if isinstance(callback, BridgeCallback):
+        return obj, functools.partial(callback, obj)
     elif not hasattr(obj, method):
         raise NotImplementedError("{}.{} is not implemented.".format(obj,
                                                                      method))
     return obj, getattr(obj, method)
 
 
+class BridgeFuture(object):
+    """ A minimal future for one-shot results returned over the bridge. 
+    
+    It's held in the `FUTURES` dict until it's resolved instead of the 
+    weakref `CACHE`, runs callbacks inline when the result arrives, and 
+    supports the same `then` and `catch` api as the event loop futures. It
+    can also be awaited when using the asyncio event loop.
+    
+    """
+    __slots__ = ('__id__', '__weakref__', '_loop', '_done', '_result',
+                 '_error', '_callbacks', '_asyncio_future_blocking')
+
+    def __init__(self, loop=None):
+        self._loop = loop
+        self._done = False
+        self._result = None
+        self._error = None
+        self._callbacks = None
+        self._asyncio_future_blocking = False
+        self.__id__ = generate_id()
+        FUTURES[self.__id__] = self
+
+    def done(self):
+        return self._done
+
+    def cancelled(self):
+        return False
+
+    def cancel(self):
+        return False
+
+    def result(self):
+        if not self._done:
+            raise RuntimeError("Result is not ready")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def exception(self):
+        if not self._done:
+            raise RuntimeError("Result is not ready")
+        return self._error
+
+    def set_result(self, result):
+        self._result = result
+        self._resolve()
+
+    def set_exception(self, error):
+        self._error = error
+        self._resolve()
+
+    def then(self, callback):
+        """ Invoke the callback with the result when it's available. """
+        return self._add_callback(callback, 0)
+
+    def catch(self, callback):
+        """ Invoke the callback with the error if one occurs. """
+        return self._add_callback(callback, 1)
+
+    def add_done_callback(self, callback, context=None):
+        """ Invoke the callback with this future when it's done. """
+        return self._add_callback(callback, 2)
+
+    def get_loop(self):
+        """ Return the asyncio loop so the future can be awaited """
+        return self._loop.loop
+
+    def __await__(self):
+        return _BridgeFutureIterator(self)
+
+    __iter__ = __await__
+
+    def _add_callback(self, callback, kind):
+        if self._done:
+            self._invoke(callback, kind)
+        elif self._callbacks is None:
+            self._callbacks = [(callback, kind)]
+        else:
+            self._callbacks.append((callback, kind))
+        return self
+
+    def _resolve(self):
+        if self._done:
+            raise RuntimeError("Result was already set")
+        self._done = True
+        FUTURES.pop(self.__id__, None)
+        callbacks = self._callbacks
+        if callbacks:
+            self._callbacks = None
+            for callback, kind in callbacks:
+                self._invoke(callback, kind)
+
+    def _invoke(self, callback, kind):
+        error = self._error
+        try:
+            if kind == 2:
+                callback(self)
+            elif error is None:
+                if kind == 0:
+                    callback(self._result)
+            elif kind == 1:
+                callback(error)
+        except Exception:
+            loop = self._loop
+            if loop is not None and loop._handler:
+                loop._handler(callback)
+            else:
+                raise
+
+
+class _BridgeFutureIterator(object):
+    """ Iterator used to await a BridgeFuture. This is a class instead of a 
+    generator so it does not need to use py3 only syntax.
+    
+    """
+    __slots__ = ('future', )
+
+    def __init__(self, future):
+        self.future = future
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        future = self.future
+        if not future._done:
+            future._asyncio_future_blocking = True
+            return future
+        raise StopIteration(future.result())
+
+    next = __next__
+
+    def send(self, value):
+        return self.__next__()
+
+    def throw(self, *args):
+        raise args[1] if len(args) > 1 and args[1] is not None else args[0]
+
+
+def get_tmp_path(name):
+    """ Path of the given file or directory in the app's temp directory. 
+    The native app sets the `TMP` env variable to a writable directory.
+    
+    """
+    tmp = os.environ.get('TMP') or tempfile.gettempdir()
+    return os.path.join(tmp, name)
+
+
+def log_error(callback, error):
+    """ Report an error that was handled while running the callback with 
+    the app's event loop. 
+    
+    """
+    app = get_app_class().instance()
+    if app is None:
+        print("Error during {}: {}".format(callback, error))
+        return
+    app.loop.log_error(callback, error)
+
+
+def persistent_results_path():
+    """ Path of the file used to store results of methods with a 
+    persistent cache. 
+    
+    """
+    return get_tmp_path('enamlnative-results.json')
+
+
+def load_persistent_results():
+    """ Load the results of methods with a persistent cache from disk """
+    global PERSISTENT_RESULTS
+    if PERSISTENT_RESULTS is None:
+        try:
+            with open(persistent_results_path()) as f:
+                PERSISTENT_RESULTS = json.load(f)
+        except (IOError, OSError, ValueError):
+            PERSISTENT_RESULTS = {}
+    return PERSISTENT_RESULTS
+
+
+def save_persistent_result(key, result):
+    """ Save the result of a method with a persistent cache to disk """
+    results = load_persistent_results()
+    results[key] = result
+    try:
+        data = json.dumps(results)
+    except (TypeError, ValueError) as e:
+        del results[key]
+        log_error(save_persistent_result, e)
+        return
+    try:
+        with open(persistent_results_path(), 'w') as f:
+            f.write(data)
+    except (IOError, OSError) as e:
+        log_error(save_persistent_result, e)
+
+
+def clear_persistent_results():
+    """ Remove all results of methods with a persistent cache. The results 
+    cached in memory are not cleared.
+    
+    """
+    global PERSISTENT_RESULTS
+    PERSISTENT_RESULTS = {}
+    try:
+        os.remove(persistent_results_path())
+    except (IOError, OSError):
+        pass
+
+
+def is_cached(method, obj, owner, args):
+    """ Check if a result for the given args is in the method's result cache
+    either in memory or on disk.
+    
+    """
+    try:
+        key = tuple(encode(arg) for arg in args)
+        hash(key)
+    except TypeError:
+        return False
+    cache = method.__results__
+    if method.__cachescope__ == 'object':
+        cache = cache.get(obj, {})
+    if key in cache:
+        return True
+    if method.__cachescope__ == 'persistent':
+        name = "{}.{}{}".format(owner, method.name, key)
+        return name in load_persistent_results()
+    return False
+
+
+def cached_call(method, obj, owner, args, kwargs, refresh=False):
+    """ Return the future from the method's result cache or invoke the 
+    method and add the future it returns to the cache.
+    
+    Parameters
+    ----------
+    method: BridgeMethod or BridgeStaticMethod
+        The method with a cache scope.
+    obj: BridgeObject or None
+        The object the method is invoked on or None for static methods
+    owner: string
+        Native class name used as the persistent cache key
+    args: tuple
+        Args of the call, these must be hashable
+    kwargs: dict
+        Kwargs of the call, these are not part of the key
+    refresh: bool
+        Invoke the method and replace the cached result.
+    
+    """
+    try:
+        key = tuple(encode(arg) for arg in args)
+        hash(key)
+    except TypeError:
+        #: Can't cache calls with unhashable arguments
+        return method.invoke(obj, *args, **kwargs)
+
+    scope = method.__cachescope__
+    cache = method.__results__
+    if scope == 'object':
+        cache = cache.setdefault(obj, {})
+
+    if not refresh:
+        result = cache.get(key)
+        if result is not None:
+            return result
+
+    name = None
+    if scope == 'persistent':
+        name = "{}.{}{}".format(owner, method.name, key)
+        results = load_persistent_results()
+        if not refresh and name in results:
+            result = get_app_class().instance().create_bridge_future()
+            result.set_result(results[name])
+            cache[key] = result
+            return result
+
+    result = method.invoke(obj, *args, **kwargs)
+    cache[key] = result
+
+    #: Don't keep failed results so the next call tries again
+    result.catch(lambda e: cache.pop(key, None))
+    if name is not None:
+        result.then(lambda r: save_persistent_result(name, r))
+    return result
+
+
+class BridgeBatch(object):
+    """ Collects the results of returning calls made within a `batch()` so
+    they can be returned by the native bridge as a single event.
+    
+    """
+    __slots__ = ('__id__', '__weakref__', 'futures', 'result')
+
+    def __init__(self, app):
+        #: Futures of the calls made in the batch
+        self.futures = []
+
+        #: Future that resolves with a list of all of the results
+        self.result = app.create_future()
+        self.__id__ = generate_id()
+        FUTURES[self.__id__] = self
+
+    def add(self, future):
+        """ Add the future of a returning call to the batch """
+        self.futures.append(future)
+
+    def then(self, callback):
+        """ Invoke the callback with the list of results when done """
+        self.result.then(callback)
+        return self
+
+    def set_results(self, *args):
+        """ Called by the native bridge with the id and result of each call
+        in the batch as a flat list. Each future is resolved then the batch
+        result with the list of results in the order the calls were made. 
+        Calls that failed have a result of None.
+        
+        """
+        del FUTURES[self.__id__]
+        results = dict(zip(args[0::2], args[1::2]))
+        for f in self.futures:
+            #: Resolve calls without a result too so they're released
+            f.set_result(results.get(f.__id__))
+        self.result.set_result([results.get(f.__id__)
+                                for f in self.futures])
+
+
+@contextmanager
+def batch():
+    """ Group the results of returning calls made within this context so 
+    they are returned from the native bridge in a single event. 
+    
+    Each call still returns it's own future, the batch's `result` future 
+    resolves with a list of all of the results.
+    
+    __Example__
+    
+        :::python
+        
+        with bridge.batch() as b:
+            for p in permissions:
+                activity.checkSelfPermission(p)
+        b.then(on_results)
+    
+    """
+    app = get_app_class().instance()
+    b = BridgeBatch(app)
+    app.send_event(Command.BATCH_START, b.__id__)
+    BATCHES.append(b)
+    try:
+        yield b
+    finally:
+        BATCHES.remove(b)
+        app.send_event(Command.BATCH_END, b.__id__)
+
+
+@contextmanager
+def suppress(obj, name):
+    """ Suppress calls to the method, field, or callback with the given name 
+    on the object within this context to avoid feedback loops.
+    
+    """
+    suppressed = obj.__suppressed__
+    if suppressed is None:
+        suppressed = obj.__suppressed__ = set()
+    suppressed.add(name)
+    try:
+        yield
+    finally:
+        suppressed.discard(name)
+
+
+def init_cache_scope(method, kwargs):
+    """ Validate the `cache` scope passed to a bridge method. Methods with a 
+    cache only send the call once and return the same future every time 
+    they're called with the same arguments. The scope may be one of:
+    
+    object
+        Results are cached per object the method is invoked on
+    process
+        Results are cached for the life of the app (regardless of the 
+        object the method is invoked on)
+    persistent
+        Results are cached and also saved to disk so they're available 
+        immediately the next time the app runs. This can only be used with 
+        methods that return values which can be saved as json (not 
+        references).
+    
+    """
+    scope = kwargs.get('cache', None)
+    if scope is not None and scope not in RESULT_CACHE_SCOPES:
+        raise ValueError("Invalid cache scope {}, expected one of {}".format(
+            scope, RESULT_CACHE_SCOPES))
+    if scope is not None and not kwargs.get('returns'):
+        raise ValueError("A cache can only be used on methods that return "
+                         "a result")
+    return scope
+
+
 class BridgeMethod(Property):
     """ A method that is callable via the bridge.
     When called, this serializes the call, packs the arguments,
@@ -146,39 +568,59 @@ class BridgeMethod(Property):
     view.addView(view2)
 
     """
-    __slots__ = ('__signature__', '__returns__', '__cache__', '__bridge_id__')
+    __slots__ = ('__signature__', '__returns__', '__cache__', '__bridge_id__',
+                 '__cachescope__', '__results__')
 
     def __init__(self, *args, **kwargs):
         self.__returns__ = kwargs.get('returns', None)
         self.__signature__ = args
         self.__cache__ = {}  # Result cache otherwise gc cleans up
         self.__bridge_id__ = generate_property_id()
+        self.__cachescope__ = init_cache_scope(self, kwargs)
+        self.__results__ = (WeakKeyDictionary()
+                            if self.__cachescope__ == 'object' else {})
         super(BridgeMethod, self).__init__(self.__fget__)
 
-    @contextmanager
     def suppressed(self, obj):
         """ Suppress calls within this context to avoid feedback loops"""
-        obj.__suppressed__[self.name] = True
-        yield
-        obj.__suppressed__[self.name] = False
+        return suppress(obj, self.name)
 
     def __fget__(self, obj):
         f = functools.partial(self.__call__, obj)
         f.suppressed = functools.partial(self.suppressed, obj)
+        if self.__cachescope__ is not None:
+            f.refresh = functools.partial(self.refresh, obj)
+            f.is_cached = functools.partial(self.is_cached, obj)
         return f
 
     def __call__(self, obj, *args, **kwargs):
         """ The Swift like syntax is used"""
-        if obj.__suppressed__.get(self.name):
+        suppressed = obj.__suppressed__
+        if suppressed and self.name in suppressed:
             return
+        if self.__cachescope__ is not None:
+            return cached_call(self, obj, obj.__nativeclass__, args, kwargs)
+        return self.invoke(obj, *args, **kwargs)
+
+    def refresh(self, obj, *args, **kwargs):
+        """ Invoke the method and replace the cached result """
+        return cached_call(self, obj, obj.__nativeclass__, args, kwargs,
+                           refresh=True)
+
+    def is_cached(self, obj, *args):
+        """ Check if a result for the given args is cached """
+        return is_cached(self, obj, obj.__nativeclass__, args)
 
+    def invoke(self, obj, *args, **kwargs):
+        """ Send the call over the bridge """
         #: Format the args as needed
         method_name, method_args = self.pack_args(obj, *args, **kwargs)
 
         #: Create a future to retrieve the result if needed
-        result = obj.__app__.create_future() if self.__returns__ else None
+        app = obj.__app__
+        result = app.create_bridge_future() if self.__returns__ else None
 
-        if result:
+        if result and not isinstance(result, BridgeFuture):
             #: Store in local cache or global cache (weakref) removes it
             #: resulting in a Reference error when the result is returned
             self.__cache__[result.__id__] = result
@@ -190,7 +632,10 @@ class BridgeMethod(Property):
             #: Delete from the local cache once resolved.
             result.then(resolve)
 
-        obj.__app__.send_event(
+        if result and BATCHES:
+            BATCHES[-1].add(result)
+
+        app.send_event(
             Command.METHOD,  #: method
             obj.__id__,
             result.__id__ if result else 0,
@@ -224,7 +669,7 @@ class BridgeStaticMethod(Property):
 
     """
     __slots__ = ('__signature__', '__returns__', '__cache__', '__owner__',
-                 '__bridge_id__')
+                 '__bridge_id__', '__cachescope__', '__results__')
 
     def __init__(self, *args, **kwargs):
         self.__returns__ = kwargs.get('returns', None)
@@ -232,6 +677,8 @@ class BridgeStaticMethod(Property):
         self.__owner__ = None
         self.__cache__ = {}  # Result cache otherwise gc cleans up
         self.__bridge_id__ = generate_property_id()
+        self.__cachescope__ = init_cache_scope(self, kwargs)
+        self.__results__ = {}
         super(BridgeStaticMethod, self).__init__()
 
     def __get__(self, instance, owner):
@@ -241,15 +688,34 @@ class BridgeStaticMethod(Property):
         return super(BridgeStaticMethod, self).__get__(instance, owner)
 
     def __call__(self, *args, **kwargs):
+        if self.__cachescope__ is not None:
+            return cached_call(self, None, self.native_class, args, kwargs)
+        return self.invoke(None, *args, **kwargs)
+
+    def refresh(self, *args, **kwargs):
+        """ Invoke the method and replace the cached result """
+        return cached_call(self, None, self.native_class, args, kwargs,
+                           refresh=True)
+
+    def is_cached(self, *args):
+        """ Check if a result for the given args is cached """
+        return is_cached(self, None, self.native_class, args)
+
+    @property
+    def native_class(self):
+        return self.__owner__.__nativeclass__.default_value_mode[1]
+
+    def invoke(self, obj, *args, **kwargs):
+        """ Send the call over the bridge """
         #: Format the args as needed
         method_name, method_args = self.pack_args(*args, **kwargs)
 
         app = get_app_class().instance()
 
         #: Create a future to retrieve the result if needed
-        result = app.create_future() if self.__returns__ else None
+        result = app.create_bridge_future() if self.__returns__ else None
 
-        if result:
+        if result and not isinstance(result, BridgeFuture):
             #: Store in local cache or global cache (weakref) removes it
             #: resulting in a Reference error when the result is returned
             self.__cache__[result.__id__] = result
@@ -261,9 +727,12 @@ class BridgeStaticMethod(Property):
             #: Delete from the local cache once resolved.
             result.then(resolve)
 
+        if result and BATCHES:
+            BATCHES[-1].add(result)
+
         app.send_event(
             Command.STATIC_METHOD,  #: method
-            self.__owner__.__nativeclass__.default_value_mode[1],
+            self.native_class,
             result.__id__ if result else 0,
             self.__bridge_id__,
             method_name,  #: method name
@@ -304,15 +773,13 @@ class BridgeField(Property):
         self.__bridge_cached_ = False
         super(BridgeField, self).__init__(self.__fget__, self.__fset__)
 
-    @contextmanager
     def suppressed(self, obj):
         """ Suppress calls within this context to avoid feedback loops"""
-        obj.__suppressed__[self.name] = True
-        yield
-        obj.__suppressed__[self.name] = False
+        return suppress(obj, self.name)
 
     def __fset__(self, obj, arg):
-        if obj.__suppressed__.get(self.name):
+        suppressed = obj.__suppressed__
+        if suppressed and self.name in suppressed:
             return
         obj.__app__.send_event(
             Command.FIELD,  #: method
@@ -371,29 +838,178 @@ class BridgeCallback(BridgeMethod):
         #: Add a method so it can be connected like in Qt
         f.connect = functools.partial(self.connect, obj)
         f.disconnect = functools.partial(self.disconnect, obj)
+        f.set_delivery = functools.partial(self.set_delivery, obj)
         return f
 
+    def __init__(self, *args, **kwargs):
+        #: Index of this callback in the callbacks of an object
+        #: (see `callback_slots`)
+        self.__slot_index__ = -1
+        super(BridgeCallback, self).__init__(*args, **kwargs)
+
     def __call__(self, obj, *args):
         """ Fire the callback if one is connected """
-        if obj.__suppressed__.get(self.name):
+        suppressed = obj.__suppressed__
+        if suppressed and self.name in suppressed:
             return
-        callback = obj.__callbacks__.get(self.name)
-        if not callback:
-            #: Try to get the default callback
-            key = '_impl_{}'.format(self.name)
-            if hasattr(obj, key):
-                callback = getattr(obj, key)
-
-        if callback:
-            return callback(*args)
-
-    def connect(self, obj, callback):
-        """ Set the callback to be fired when the event occurs. """
-        obj.__callbacks__[self.name] = callback
+        callbacks = obj.__callbacks__
+        if callbacks is not None:
+            callback = callbacks[self.__slot_index__]
+            if callback is not None:
+                return callback(*args)
+
+        #: Try to get the default callback
+        slots = CALLBACK_SLOTS.get(type(obj)) or callback_slots(type(obj))
+        impl = slots[1][self.__slot_index__]
+        if impl is not None:
+            return impl(obj, *args)
+
+    def connect(self, obj, callback, weak=False):
+        """ Set the callback to be fired when the event occurs. If weak is 
+        True, only a weak reference to the callback (or the object of a 
+        bound method) is kept.
+        
+        """
+        callbacks = obj.__callbacks__
+        if callbacks is None:
+            n = len(callback_slots(type(obj))[0])
+            callbacks = obj.__callbacks__ = [None]*n
+        callbacks[self.__slot_index__] = (WeakCallback(callback) if weak
+                                          else callback)
 
     def disconnect(self, obj, callback):
         """ Remove the callback to be fired when the event occurs. """
-        del obj.__callbacks__[self.name]
+        callbacks = obj.__callbacks__
+        if callbacks is not None:
+            callbacks[self.__slot_index__] = None
+
+    def set_delivery(self, obj, mode='all', interval=0, blocking=True,
+                     result=None):
+        """ Set how the native bridge sends this callback for high 
+        frequency events (touch moves, scrolling, progress changes, etc..).
+        
+        Parameters
+        ----------
+        mode: string
+            One of `all` (send every event), `sample` (send at most one 
+            event every `interval` ms), `latest` (send only the latest event
+            every `interval` ms or every frame if 0), or `none` (never send 
+            it). Events that are not a continuous part of a gesture (ex a 
+            touch down or up) are always sent. With `sample` the last event
+            dropped in an interval is sent when it ends so the final value 
+            is never lost.
+        interval: int
+            Interval in ms used by the `sample` and `latest` modes
+        blocking: bool
+            If the callback returns a value, whether the native side 
+            waits for it. When False or when an event is not sent, the 
+            given result is returned without waiting.
+        result: bool, int, or None
+            Result to return when not waiting for the callback
+            
+        """
+        if mode not in DELIVERY_MODES:
+            raise ValueError("Invalid delivery mode {}, expected one of {}"
+                             .format(mode, DELIVERY_MODES))
+        obj.__app__.send_event(
+            Command.EVENT_MODE,
+            obj.__id__,
+            self.name,
+            DELIVERY_MODES.index(mode),
+            interval,
+            blocking,
+            result
+        )
+
+
+class WeakCallback(object):
+    """ A callback that only holds a weak reference to the function or 
+    the object of a bound method. It does nothing once it's released.
+    
+    """
+    __slots__ = ('func', 'ref')
+
+    def __init__(self, callback):
+        self.func = getattr(callback, '__func__', None)
+        self.ref = ref(callback if self.func is None else callback.__self__)
+
+    def __call__(self, *args):
+        obj = self.ref()
+        if obj is None:
+            return
+        if self.func is None:
+            return obj(*args)
+        return self.func(obj, *args)
+
+
+def callback_slots(cls):
+    """ Get the callbacks of the class in the order they're stored on each 
+    object and the default implementation of each (named `_impl_<name>`) 
+    or None. 
+    
+    Each BridgeCallback is assigned an index so objects can store connected 
+    callbacks in a list instead of a dict. A subclass uses the same indices 
+    as it's first base class, callbacks of the other bases and callbacks it
+    adds are appended and callbacks it overrides reuse the index of the one
+    they replace. If a callback of another base already uses a different
+    index, a copy of it is added to the class.
+    
+    Parameters
+    ----------
+    cls: Type[BridgeObject]
+        The class to lookup
+        
+    Returns
+    -------
+    slots: Tuple
+        A tuple of (callbacks, defaults)
+    
+    """
+    slots = CALLBACK_SLOTS.get(cls)
+    if slots is not None:
+        return slots
+    bases = [b for b in cls.__bases__ if issubclass(b, BridgeObject)]
+    names = []
+    if bases:
+        names = [c.name for c in callback_slots(bases[0])[0]]
+    for base in bases[1:]:
+        for c in callback_slots(base)[0]:
+            if c.name not in names:
+                names.append(c.name)
+    for name in sorted(cls.__dict__):
+        if (isinstance(cls.__dict__[name], BridgeCallback) and
+                name not in names):
+            names.append(name)
+
+    callbacks = []
+    for i, name in enumerate(names):
+        #: Use the callback that is found first in the MRO
+        member = callback = next(c.__dict__[name] for c in cls.__mro__
+                                 if name in c.__dict__)
+        if not hasattr(callback, '__slot_index__'):
+            #: Atom clones members of bases that conflict, the clone's
+            #: getter is bound to the original
+            callback = callback.fget.__self__
+        if callback.__slot_index__ < 0:
+            callback.__slot_index__ = i
+        elif callback.__slot_index__ != i:
+            callback = copy_callback(callback)
+            callback.__slot_index__ = i
+        if callback is not member:
+            setattr(cls, name, callback)
+        callbacks.append(callback)
+    defaults = tuple(getattr(cls, '_impl_{}'.format(name), None)
+                     for name in names)
+    slots = CALLBACK_SLOTS[cls] = (tuple(callbacks), defaults)
+    return slots
+
+
+def copy_callback(callback):
+    """ Create a new callback with the same name and signature """
+    copy = type(callback)(*callback.__signature__,
+                          returns=callback.__returns__)
+    copy.set_name(callback.name)
+    return copy
 
 
 def tag_property(cls):
@@ -419,6 +1035,13 @@ class BridgeObject(Atom):
             then the __id__ of he future will be used. When the future 
             completes this object will then be put into the cache. This allows
             passing results directly instead of using the `.then()` method.
+            
+            Methods can be invoked on the object (or it can be passed as 
+            an argument) before the future completes. The bridge processes
+            these calls after the call that returns the result so a chain of
+            calls can be done in a single round trip (pipelining). This only
+            works for results that are references to native objects (not 
+            numbers, strings, etc..).
 
     """
     __slots__ = ('__weakref__', )
@@ -429,11 +1052,12 @@ class BridgeObject(Atom):
     #: Constructor signature
     __signature__ = Tuple()
 
-    #: Suppressed methods / fields
-    __suppressed__ = Dict()
+    #: Names of suppressed methods / fields, None until one is suppressed
+    __suppressed__ = Value()
 
-    #: Callbacks
-    __callbacks__ = Dict()
+    #: Connected callbacks indexed by the slot of each callback (see
+    #: `callback_slots`), None until one is connected
+    __callbacks__ = Value()
 
     #: Bridge object ID
     __id__ = Int(0, factory=generate_id)
@@ -448,6 +1072,9 @@ class BridgeObject(Atom):
     #: Bridge
     __app__ = ForwardInstance(get_app_class)
 
+    #: Future the object was created from when pipelining (see `__init__`)
+    __ready__ = Value()
+
     def _default___app__(self):
         return get_app_class().instance()
 
@@ -469,7 +1096,8 @@ class BridgeObject(Atom):
         if __id__ is not None:
             if isinstance(__id__, int):
                 kwargs['__id__'] = __id__
-            elif isinstance(__id__, self.__app__.loop.future):
+            elif isinstance(__id__, (BridgeFuture,
+                                     self.__app__.loop.future)):
                 #: If a future is given don't store this object in the cache
                 #: until after the future completes
                 f = __id__
@@ -477,6 +1105,7 @@ class BridgeObject(Atom):
 
                 #: The future is used to return the result
                 kwargs['__id__'] = f.__id__
+                kwargs['__ready__'] = f
 
                 #: Save it into the cache when the result from the future
                 #: arrives over the bridge.
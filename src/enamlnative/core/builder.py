@@ -0,0 +1,149 @@
+"""
+Copyright (c) 2018, Jairus Martin.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+@author jrm
+
+"""
+from collections import deque
+from time import time
+from atom.api import Atom, Dict, Instance, Float, Int, Value
+from enaml.widgets.toolkit_object import ToolkitObject
+
+
+class ChunkedBuilder(Atom):
+    """ Activates the proxies of a view in small chunks so the event loop
+    can still handle events (touches, back presses) while a large view is
+    being built.
+
+    The root is activated first so it can be displayed right away, then
+    the children are activated in order and added to their (already active)
+    parent using the same `child_added` path enaml uses for dynamic content.
+    The bridge is flushed after each chunk so the top of the screen appears
+    first.
+
+    As with `activate_proxy`, a node's `activated` is only called once all
+    of the nodes below it are active, so it always sees a complete subtree.
+
+    """
+    #: Application used to schedule chunks and flush the bridge
+    app = Value()
+
+    #: Root declaration to build
+    view = Instance(ToolkitObject)
+
+    #: Time in ms to spend building per loop iteration
+    budget = Float(4, strict=False)
+
+    #: Number of levels below the root that are added incrementally. Deeper
+    #: nodes are activated together with their parent.
+    depth = Int(1)
+
+    #: Future that resolves with the view when all nodes are active
+    done = Value()
+
+    #: Nodes waiting to be activated as (parent, child, level) tuples
+    _queue = Instance(deque, ())
+
+    #: Nodes with children that are not active yet mapped to a list of
+    #: [number of children left, parent]
+    _pending = Dict()
+
+    def _default_done(self):
+        return self.app.create_future()
+
+    def start(self):
+        """ Activate the root node and schedule building the rest of the
+        tree in the next loop iterations.
+
+        Returns
+        -------
+        widget: BridgeObject
+            The widget of the root node.
+
+        """
+        view = self.view
+        if not view.is_initialized:
+            view.initialize()
+        if view.proxy_is_active:
+            self.done.set_result(view)
+        else:
+            self._activate(view, None, 0)
+            if view in self._pending:
+                self.app.deferred_call(self._run)
+            else:
+                self._complete(view, None)
+        return view.proxy.widget
+
+    def _activate(self, node, parent, level):
+        """ Activate only the given node and queue it's children so they
+        are activated first in the next chunk.
+
+        """
+        node.activate_top_down()
+        node.activate_bottom_up()
+        node.proxy_is_active = True
+        children = [(node, child, level+1) for child in node.children
+                    if isinstance(child, ToolkitObject)]
+        if children:
+            self._pending[node] = [len(children), parent]
+            self._queue.extendleft(reversed(children))
+
+    def _complete(self, node, parent):
+        """ Called when the node and all of the nodes below it are active.
+
+        """
+        if not node.is_destroyed:
+            node.activated()
+        if parent is None:
+            self.done.set_result(self.view)
+        else:
+            self._child_complete(parent)
+
+    def _child_complete(self, node):
+        """ Called when a child of the node and all of it's children are
+        active. Completes the node once it was the last one.
+
+        """
+        state = self._pending[node]
+        state[0] -= 1
+        if not state[0]:
+            del self._pending[node]
+            self._complete(node, state[1])
+
+    def _run(self):
+        """ Activate nodes until the budget for this iteration is used then
+        flush the bridge and schedule the next chunk.
+
+        """
+        queue = self._queue
+        budget = self.budget/1000.0
+        start = time()
+        while queue:
+            parent, child, level = queue.popleft()
+
+            #: Skip nodes that were removed or activated by other means
+            if (child.is_destroyed or child.proxy_is_active or
+                    child.parent is not parent):
+                self._child_complete(parent)
+                continue
+
+            if level < self.depth:
+                self._activate(child, parent, level)
+                parent.proxy.child_added(child.proxy)
+                if child not in self._pending:
+                    self._complete(child, parent)
+            else:
+                child.activate_proxy()
+                parent.proxy.child_added(child.proxy)
+                self._child_complete(parent)
+
+            if time()-start > budget:
+                break
+
+        self.app.force_update()
+        if queue:
+            self.app.deferred_call(self._run)
@@ -150,6 +150,12 @@ class IOLoop(Atom):
     WRITE = 0x004
     ERROR = 0x008 | 0x010
 
+    # Callback priorities used by `add_priority_callback`
+    PRIORITY_INPUT = 0
+    PRIORITY_FLUSH = 1
+    PRIORITY_NORMAL = 2
+    PRIORITY_IDLE = 3
+
     # Global lock for creating global IOLoop instance
     _instance_lock = threading.Lock()
 
@@ -582,6 +588,18 @@ class IOLoop(Atom):
         """
         return self.add_timeout(when, callback, *args, **kwargs)
 
+    def call_later_coarse(self, delay, callback, *args, **kwargs):
+        """Runs the ``callback`` after ``delay`` seconds have passed using
+        a timer wheel instead of the timeout heap.
+
+        The callback may run up to one ``timer_resolution`` late and timers
+        that expire in the same tick are run together. Inserting and
+        cancelling is O(1) so this should be used for coarse timers that
+        are frequently added and removed (debounces, clock ticks, etc..).
+        The returned handle may be passed to `remove_timeout`.
+        """
+        return self.call_later(delay, callback, *args, **kwargs)
+
     def remove_timeout(self, timeout):
         """Cancels a pending timeout.
 
@@ -606,6 +624,16 @@ class IOLoop(Atom):
         """
         raise NotImplementedError()
 
+    def add_priority_callback(self, priority, callback, *args, **kwargs):
+        """Calls the given callback on the next I/O loop iteration after
+        all callbacks with a higher priority.
+
+        The priority must be one of ``PRIORITY_INPUT``, ``PRIORITY_FLUSH``,
+        ``PRIORITY_NORMAL``, or ``PRIORITY_IDLE``. Callbacks added with
+        ``PRIORITY_NORMAL`` are the same as using `add_callback`.
+        """
+        raise NotImplementedError()
+
     def add_callback_from_signal(self, callback, *args, **kwargs):
         """Calls the given callback on the next I/O loop iteration.
 
@@ -745,8 +773,14 @@ class PollIOLoop(IOLoop):
     _handlers = Dict()
     _events = Dict()
     _callbacks = Instance(collections.deque)
+    _lanes = List()
+    _idle_skipped = Int()
+    idle_starvation_limit = Int(10)
     _timeouts = List()
     _cancellations = Int()
+    _wheel = Value()
+    timer_resolution = Float(0.01)
+    fast = Bool()
     _running = Bool()
     _stopped = Bool()
     _closing = Bool()
@@ -765,6 +799,9 @@ class PollIOLoop(IOLoop):
         #self._handlers = {}
         #self._events = {}
         self._callbacks = collections.deque()
+        # One queue per priority, normal priority callbacks use _callbacks
+        self._lanes = [collections.deque(), collections.deque(),
+                       self._callbacks, collections.deque()]
         #self._timeouts = []
         #self._cancellations = 0
         #self._running = False
@@ -807,7 +844,9 @@ class PollIOLoop(IOLoop):
         self._waker.close()
         self._impl.close()
         self._callbacks = None
+        self._lanes = []
         self._timeouts = None
+        self._wheel = None
 
     def add_handler(self, fd, handler, events):
         fd, obj = self.split_fd(fd)
@@ -888,7 +927,7 @@ class PollIOLoop(IOLoop):
             while True:
                 # Prevent IO event starvation by delaying new callbacks
                 # to the next iteration of the event loop.
-                ncallbacks = len(self._callbacks)
+                ncallbacks = [len(lane) for lane in self._lanes]
 
                 # Add any timeouts that have come due to the callback list.
                 # Do not run anything until we have determined which ones
@@ -916,9 +955,10 @@ class PollIOLoop(IOLoop):
                         self._timeouts = [x for x in self._timeouts
                                           if x.callback is not None]
                         heapq.heapify(self._timeouts)
+                if self._wheel is not None and self._wheel.count:
+                    due_timeouts.extend(self._wheel.advance(self.time()))
 
-                for i in range(ncallbacks):
-                    self._run_callback(self._callbacks.popleft())
+                self._run_callbacks(ncallbacks)
                 for timeout in due_timeouts:
                     if timeout.callback is not None:
                         self._run_callback(timeout.callback)
@@ -926,7 +966,7 @@ class PollIOLoop(IOLoop):
                 # them to be freed before we go into our poll wait.
                 due_timeouts = timeout = None
 
-                if self._callbacks:
+                if any(self._lanes):
                     # If any callbacks or timeouts called add_callback,
                     # we don't want to wait in poll() before we run them.
                     poll_timeout = 0.0
@@ -939,6 +979,12 @@ class PollIOLoop(IOLoop):
                 else:
                     # No timeouts and no callbacks, so use the default.
                     poll_timeout = _POLL_TIMEOUT
+                if self._wheel is not None and self._wheel.count:
+                    # Wake up for the next tick of the timer wheel that
+                    # has timers
+                    poll_timeout = max(0, min(
+                        poll_timeout,
+                        self._wheel.next_deadline() - self.time()))
 
                 if not self._running:
                     break
@@ -994,6 +1040,37 @@ class PollIOLoop(IOLoop):
             if old_wakeup_fd is not None:
                 signal.set_wakeup_fd(old_wakeup_fd)
 
+    def _run_callbacks(self, ncallbacks):
+        """Runs the callbacks that were queued at the start of this
+        iteration in order of priority.
+
+        Input callbacks added while flush, normal, or idle callbacks are
+        running are run before the next one so they don't have to wait for
+        the rest of the iteration. Idle callbacks are only run when nothing
+        else is pending unless they were skipped for
+        ``idle_starvation_limit`` iterations, in which case one is run.
+        """
+        lanes = self._lanes
+        for priority, lane in enumerate(lanes):
+            n = ncallbacks[priority]
+            if priority == self.PRIORITY_IDLE and n:
+                if any(lanes[:self.PRIORITY_IDLE]):
+                    self._idle_skipped += 1
+                    if self._idle_skipped < self.idle_starvation_limit:
+                        return
+                    n = 1
+                self._idle_skipped = 0
+            for i in range(n):
+                if priority != self.PRIORITY_INPUT:
+                    self._run_input_callbacks()
+                self._run_callback(lane.popleft())
+
+    def _run_input_callbacks(self):
+        """Runs any input callbacks that are currently queued."""
+        lane = self._lanes[self.PRIORITY_INPUT]
+        for i in range(len(lane)):
+            self._run_callback(lane.popleft())
+
     def stop(self):
         self._running = False
         self._stopped = True
@@ -1005,12 +1082,33 @@ class PollIOLoop(IOLoop):
     def call_at(self, deadline, callback, *args, **kwargs):
         timeout = _Timeout(
             deadline,
-            functools.partial(stack_context.wrap(callback), *args, **kwargs),
+            self._wrap_callback(callback, args, kwargs),
             self)
         heapq.heappush(self._timeouts, timeout)
         return timeout
 
+    def call_later_coarse(self, delay, callback, *args, **kwargs):
+        now = self.time()
+        if self._wheel is None:
+            self._wheel = _TimerWheel(resolution=self.timer_resolution,
+                                      start=now)
+        elif not self._wheel.count:
+            # Skip ahead to now since the wheel is not advanced when empty
+            self._wheel.advance(now)
+        timeout = _WheelTimeout(
+            now + delay,
+            self._wrap_callback(callback, args, kwargs),
+            self)
+        self._wheel.add(timeout)
+        return timeout
+
     def remove_timeout(self, timeout):
+        if isinstance(timeout, _WheelTimeout):
+            # Timer wheel buckets support removal in O(1)
+            if self._wheel is not None:
+                self._wheel.remove(timeout)
+            timeout.callback = None
+            return
         # Removing from a heap is complicated, so just leave the defunct
         # timeout object in the queue (see discussion in
         # http://docs.python.org/library/heapq.html).
@@ -1024,8 +1122,7 @@ class PollIOLoop(IOLoop):
             return
         # Blindly insert into self._callbacks. This is safe even
         # from signal handlers because deque.append is atomic.
-        self._callbacks.append(functools.partial(
-            stack_context.wrap(callback), *args, **kwargs))
+        self._callbacks.append(self._wrap_callback(callback, args, kwargs))
         if thread.get_ident() != self._thread_ident:
             # This will write one byte but Waker.consume() reads many
             # at once, so it's ok to write even when not strictly
@@ -1035,6 +1132,30 @@ class PollIOLoop(IOLoop):
             # If we're on the IOLoop's thread, we don't need to wake anyone.
             pass
 
+    def add_priority_callback(self, priority, callback, *args, **kwargs):
+        if self._closing:
+            return
+        self._lanes[priority].append(
+            self._wrap_callback(callback, args, kwargs))
+        if thread.get_ident() != self._thread_ident:
+            self._waker.wake()
+
+    def _wrap_callback(self, callback, args, kwargs):
+        """Binds the arguments to the callback and wraps it so it runs in
+        the current stack context.
+
+        When ``fast`` is enabled stack contexts are not captured (callbacks
+        are run without any StackContext active) and callbacks without
+        arguments are queued as is. Errors are still passed to
+        `handle_callback_exception`.
+        """
+        if not self.fast:
+            return functools.partial(stack_context.wrap(callback),
+                                     *args, **kwargs)
+        if args or kwargs:
+            return functools.partial(callback, *args, **kwargs)
+        return callback
+
     def add_callback_from_signal(self, callback, *args, **kwargs):
         with stack_context.NullContext():
             self.add_callback(callback, *args, **kwargs)
@@ -1067,6 +1188,150 @@ class _Timeout(Atom):
         return self.tdeadline <= other.tdeadline
 
 
+class _WheelTimeout(_Timeout):
+    """A timeout stored in a `_TimerWheel` bucket"""
+
+    # Bucket the timeout is currently in so it can be removed in O(1)
+    bucket = Value()
+
+
+class _TimerWheel(Atom):
+    """A hierarchical timer wheel for coarse timeouts.
+
+    Time is divided into ticks of ``resolution`` seconds. Each level has
+    ``slots`` buckets and each bucket of a level spans a full rotation of
+    the level below it. Timeouts are added to the bucket of the level that
+    covers their deadline and moved down a level when the wheel reaches
+    that bucket, so adding and removing is O(1) and all timeouts in a tick
+    expire together.
+    """
+
+    # Length of a tick in seconds
+    resolution = Float(0.01)
+
+    # Number of buckets in each level, must be a power of 2
+    slots = Int(64)
+
+    # Number of levels, 64 slots * 4 levels with 10ms ticks covers ~46 hours
+    levels = Int(4)
+
+    # Time of tick 0
+    start = Float()
+
+    # Last tick that was processed
+    tick = Int()
+
+    # Number of timeouts in the wheel
+    count = Int()
+
+    # Buckets of each level
+    _wheels = List()
+
+    _bits = Int()
+
+    def __init__(self, *args, **kwargs):
+        super(_TimerWheel, self).__init__(*args, **kwargs)
+        self._bits = self.slots.bit_length() - 1
+        self._wheels = [[set() for i in range(self.slots)]
+                        for level in range(self.levels)]
+
+    def add(self, timeout):
+        """Add the timeout to the bucket covering it's deadline"""
+        ticks = int(math.ceil((timeout.deadline - self.start) /
+                              self.resolution))
+        self._insert(timeout, max(ticks, self.tick + 1))
+        self.count += 1
+
+    def remove(self, timeout):
+        """Remove the timeout from the bucket it's in"""
+        bucket = timeout.bucket
+        if bucket is not None and timeout in bucket:
+            bucket.discard(timeout)
+            timeout.bucket = None
+            self.count -= 1
+
+    def _insert(self, timeout, ticks):
+        delta = ticks - self.tick
+        bits, mask = self._bits, self.slots - 1
+        level = 0
+        while level < self.levels - 1 and delta >= (1 << (bits * (level+1))):
+            level += 1
+        bucket = self._wheels[level][(ticks >> (bits * level)) & mask]
+        bucket.add(timeout)
+        timeout.bucket = bucket
+
+    def _cascade(self, level):
+        """Move the timeouts in the current bucket of the level down"""
+        bits, mask = self._bits, self.slots - 1
+        wheel = self._wheels[level]
+        i = (self.tick >> (bits * level)) & mask
+        bucket = wheel[i]
+        if bucket:
+            wheel[i] = set()
+            for timeout in bucket:
+                ticks = int(math.ceil((timeout.deadline - self.start) /
+                                      self.resolution))
+                self._insert(timeout, max(ticks, self.tick))
+        return i
+
+    def advance(self, now):
+        """Advance the wheel to the given time and return the timeouts
+        that are due sorted by deadline. Ticks without timeouts to expire
+        or move down a level are skipped.
+        """
+        target = int((now - self.start) / self.resolution)
+        due = []
+        mask = self.slots - 1
+        wheel = self._wheels[0]
+        while self.count:
+            tick = self._next_tick(target + 1)
+            if tick > target:
+                break
+            self.tick = tick
+            if not tick & mask:
+                level = 1
+                while level < self.levels and self._cascade(level) == 0:
+                    level += 1
+            i = tick & mask
+            bucket = wheel[i]
+            if bucket:
+                wheel[i] = set()
+                self.count -= len(bucket)
+                for timeout in bucket:
+                    timeout.bucket = None
+                due.extend(bucket)
+        self.tick = max(self.tick, target)
+        due.sort()
+        return due
+
+    def _next_tick(self, limit):
+        """Get the next tick that has timeouts or needs to move timeouts
+        down a level, or ``limit`` if there are none before it.
+        """
+        bits, mask = self._bits, self.slots - 1
+        best = limit
+        for level, wheel in enumerate(self._wheels):
+            # Each bucket of a level is reached once per rotation starting
+            # from the next tick that is a multiple of the bucket span
+            shift = bits * level
+            tick = ((self.tick >> shift) + 1) << shift
+            for i in range(self.slots):
+                if tick >= best:
+                    break
+                if wheel[(tick >> shift) & mask]:
+                    best = tick
+                    break
+                tick += 1 << shift
+        return best
+
+    def next_deadline(self):
+        """Time of the next tick that has timeouts or needs to move 
+        timeouts down a level.
+        """
+        limit = self.tick + (self.slots << (self._bits * (self.levels - 1)))
+        return self.start + self._next_tick(limit) * self.resolution
+
+
 class PeriodicCallback(Atom):
     """Schedules the given callback to be called periodically.
 
@@ -9,16 +9,27 @@ The full license is in the file LICENSE, distributed with this software.
 
 """
 import sys
+import json
 import time
+import zlib
+import heapq
+import random
+import itertools
 
 if sys.version_info.major < 3:
     from httplib import responses
+    from urlparse import urlparse
+    from urllib import urlencode
 else:
     from http.client import responses
+    from urllib.parse import urlparse, urlencode
 
 from atom.api import (Atom, List, Bool, Unicode, Dict, Int, ForwardInstance,
-                      Instance, Float, Callable, Subclass)
+                      Instance, Float, Callable, Subclass, Value, Enum,
+                      Property)
 from .app import BridgedApplication
+from .http_cache import (HttpCache, HttpCacheEntry, get_header,
+                         parse_cache_control, parse_http_date)
 
 
 class HttpError(Exception):
@@ -31,6 +42,34 @@ class HttpError(Exception):
         return "HTTP %d: %s" %(self.code, self.message)
 
 
+def find_json_encoder():
+    """ Get the fastest json encoder installed (orjson, ujson, or the 
+    builtin json module).
+    
+    """
+    try:
+        import orjson
+        return orjson.dumps
+    except ImportError:
+        pass
+    try:
+        import ujson
+        return ujson.dumps
+    except ImportError:
+        pass
+    return json.dumps
+
+
+#: Default encoder used for json request data
+JSON_ENCODER = None
+
+
+def gzip_compress(data, level=6):
+    """ Compress the data in the gzip format """
+    c = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return c.compress(data) + c.flush()
+
+
 class HttpRequest(Atom):
     """ The request object created for fetch calls. 
     It's based on the design of Tornado's HttpRequest.
@@ -48,14 +87,30 @@ class HttpRequest(Atom):
     #: Retry count
     retries = Int()
 
-    #: Request parameter data
+    #: Request parameter data, encoded using the content type if no body
+    #: is given
     data = Dict()
 
+    #: Files uploaded as multipart/form-data by field name. Each value is a
+    #: path or a tuple of (filename, path, content_type). The files are
+    #: read by the native client. 
+    files = Dict()
+
     #: Content type
     content_type = Unicode("application/x-www-urlencoded")
 
-    #: Raw request body
-    body = Unicode()
+    #: Raw request body as text or bytes
+    body = Value('')
+
+    #: Compress the body with `gzip` or `deflate` before sending it
+    compress = Enum('', 'gzip', 'deflate')
+
+    #: Only compress bodies at least this many bytes
+    compress_min_size = Int(1024)
+
+    #: Function used to encode json data, defaults to the fastest encoder
+    #: installed
+    json_encoder = Callable()
 
     #: Response created
     response = ForwardInstance(lambda: HttpResponse)
@@ -63,12 +118,31 @@ class HttpRequest(Atom):
     #: Called when complete
     callback = Callable()
 
-    #: Streaming callback
+    #: Streaming callback, called with each chunk of the body as bytes. If
+    #: it returns a future the next chunks are not read until it completes.
     streaming_callback = Callable()
 
+    #: Size of each chunk passed to the streaming callback
+    chunk_size = Int(64*1024)
+
+    #: Number of chunks that can be waiting to be handled by the streaming
+    #: callback before the native client stops reading the response
+    stream_window = Int(4)
+
+    #: Return the response body as bytes instead of decoding it as text
+    binary = Bool()
+
+    #: Path of a file the native client writes the response body to. The
+    #: body is not sent to python (use `response.mmap()` to read it).
+    output = Unicode()
+
     #: Start time
     start_time = Float()
 
+    #: Requests with a lower value are sent first when the client is 
+    #: limiting the number of concurrent requests
+    priority = Int()
+
     def __init__(self, *args, **kwargs):
         """ Build the request as configured.
         
@@ -84,6 +158,58 @@ class HttpRequest(Atom):
         """
         raise NotImplementedError
 
+    def _default_json_encoder(self):
+        global JSON_ENCODER
+        if JSON_ENCODER is None:
+            JSON_ENCODER = find_json_encoder()
+        return JSON_ENCODER
+
+    def _default_body(self):
+        """ If the body is not passed in by the user try to create one
+        using the given data parameters. 
+        
+        """
+        if not self.data or self.files:
+            return ""
+        content_type = self.content_type.split(";")[0].strip()
+        if content_type == 'application/json':
+            return self.json_encoder(self.data)
+        elif content_type in ('application/x-www-form-urlencoded',
+                              'application/x-www-urlencoded'):
+            return urlencode(self.data)
+        else:
+            raise NotImplementedError(
+                "You must manually encode the request "
+                "body for '{}'".format(self.content_type)
+            )
+
+    def encode_body(self):
+        """ Get the body to send, compressing it if enabled and adding the 
+        Content-Encoding header. Call this before the headers are sent.
+        
+        Returns
+        -------
+        body: text or bytes
+            The body to send
+        
+        """
+        body = self.body
+        if not self.compress:
+            return body
+
+        #: The min size is in bytes so measure the encoded body
+        data = body if isinstance(body, bytes) else body.encode('utf-8')
+        if len(data) < self.compress_min_size:
+            return body
+        if self.compress == 'gzip':
+            body = gzip_compress(data)
+        else:
+            body = zlib.compress(data)
+        headers = dict(self.headers)
+        headers['Content-Encoding'] = self.compress
+        self.headers = headers
+        return body
+
 
 class HttpResponse(Atom):
     """ The response object returned to an AsyncHttpClient fetch callback.
@@ -106,10 +232,10 @@ class HttpResponse(Atom):
     #: Result success
     ok = Bool()
 
-    #: Response body
-    #: Note: if a streaming_callback is given to the request
+    #: Response body, bytes if the request is `binary` otherwise text
+    #: Note: if a streaming_callback or output is given to the request
     #: then this is NOT used and will be empty
-    body = Unicode()
+    body = Value('')
 
     #: Size
     content_length = Int()
@@ -123,6 +249,158 @@ class HttpResponse(Atom):
     #: Done time
     request_time = Float()
 
+    #: Whether the body was served from the client's cache
+    cached = Bool()
+
+    def decode(self, data):
+        """ Decode the body using the charset of the content type or utf-8 
+        unless the request is binary.
+        
+        """
+        if self.request.binary or not isinstance(data, bytes):
+            return data
+        charset = 'utf-8'
+        content_type = get_header(self.headers, 'content-type') or ''
+        for part in content_type.split(';'):
+            part = part.strip()
+            if part.lower().startswith('charset='):
+                charset = part[8:].strip('"')
+        try:
+            return data.decode(charset, 'replace')
+        except LookupError:
+            return data.decode('utf-8', 'replace')
+
+    def mmap(self):
+        """ Memory map the file the body was written to when the request 
+        has an `output` path.
+        
+        Returns
+        -------
+        buffer: mmap.mmap
+            A read only buffer of the file contents
+        
+        """
+        import mmap
+        with open(self.request.output, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class CachedHttpRequest(HttpRequest):
+    """ The request of a response served from the cache without making a 
+    native request.
+    
+    """
+
+    def init_request(self):
+        pass
+
+
+class RetryPolicy(Atom):
+    """ Decides if and when a failed request is sent again. Delays grow 
+    exponentially with random jitter and requests are only retried if the 
+    method is idempotent.
+    
+    """
+
+    #: Max number of times a request is retried
+    max_retries = Int(3)
+
+    #: Delay before the first retry in seconds, it's doubled for each retry
+    backoff = Float(0.5)
+
+    #: Max delay between retries in seconds
+    max_backoff = Float(30)
+
+    #: Fraction of the delay that is randomized so clients don't retry at 
+    #: the same time (0 for none, 1 for "full jitter")
+    jitter = Float(0.5)
+
+    #: Status codes that are retried
+    statuses = Instance(frozenset,
+                        (frozenset((408, 429, 500, 502, 503, 504)),))
+
+    #: Methods that are safe to retry
+    methods = Instance(frozenset, (frozenset(('get', 'head', 'put', 'delete',
+                                              'options')),))
+
+    #: Retry requests that failed without a response (connection errors)
+    retry_errors = Bool(True)
+
+    #: Don't retry if the request would complete after this many seconds
+    #: since it was first sent, 0 for no deadline
+    deadline = Float()
+
+    #: Total number of retries
+    retries = Int()
+
+    #: Number of requests that succeeded after being retried
+    recovered = Int()
+
+    #: Number of requests that failed after being retried
+    exhausted = Int()
+
+    def get_delay(self, response, elapsed=0):
+        """ Get the delay before retrying the request of the response.
+
+        Parameters
+        ----------
+        response: HttpResponse
+            The response of the last attempt
+        elapsed: float
+            Seconds since the first attempt was sent
+
+        Returns
+        -------
+        delay: float or None
+            The delay in seconds or None if it should not be retried.
+
+        """
+        request = response.request
+        if request.retries >= self.max_retries:
+            return None
+        if request.method.lower() not in self.methods:
+            return None
+        if request.streaming_callback:
+            #: Part of the body may have been handled already
+            return None
+        if response.code == 0:
+            if not self.retry_errors:
+                return None
+        elif response.code not in self.statuses:
+            return None
+
+        delay = min(self.max_backoff, self.backoff*2**request.retries)
+        delay -= delay*self.jitter*random.random()
+
+        #: Respect the server's Retry-After header
+        retry_after = get_header(response.headers, 'retry-after')
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                date = parse_http_date(retry_after)
+                if date:
+                    delay = max(delay, date-time.time())
+        if self.deadline and elapsed+delay > self.deadline:
+            return None
+        return delay
+
+    def record(self, response):
+        """ Record the result of a request when it's complete """
+        if response.request.retries:
+            if response.ok and response.code < 400:
+                self.recovered += 1
+            else:
+                self.exhausted += 1
+
+    def stats(self):
+        """ Get the retry metrics as a dict """
+        return {
+            'retries': self.retries,
+            'recovered': self.recovered,
+            'exhausted': self.exhausted,
+        }
+
 
 class AbstractAsyncHttpClient(Atom):
     """ An AsyncHttpClient that lets you fetch using a format similar to 
@@ -138,8 +416,45 @@ class AbstractAsyncHttpClient(Atom):
     #: Factory used to build the request
     request_factory = Subclass(HttpRequest)
 
-    #: Pending requests
-    requests = List(HttpRequest)
+    #: Pending requests (sent or queued) and the futures waiting on each
+    futures = Dict()
+
+    #: Pending requests, a read only list of the keys of `futures`
+    requests = Property(lambda self: list(self.futures))
+
+    #: Identical GET requests are only sent once and all fetch calls get 
+    #: the same response
+    coalesce = Bool(True)
+
+    #: Requests in flight that other fetch calls can wait on by key
+    inflight = Dict()
+
+    #: Max number of requests sent at once, 0 for no limit
+    max_requests = Int(16)
+
+    #: Max number of requests sent at once to the same host, 0 for no limit
+    max_requests_per_host = Int(6)
+
+    #: Number of requests sent and not yet complete
+    active = Int()
+
+    #: Number of requests sent and not yet complete by host
+    active_hosts = Dict()
+
+    #: Requests waiting to be sent as a heap of (priority, count, request)
+    queue = List()
+
+    #: Counter used to send requests with the same priority in order
+    _counter = Instance(itertools.count, ())
+
+    #: Cache used for GET requests. Fresh responses are returned without a
+    #: request and stale ones are revalidated using the ETag or 
+    #: Last-Modified headers (see `enamlnative.core.http_cache`).
+    cache = Instance(HttpCache)
+
+    #: Policy used to retry failed requests, a `retry_policy` can also be 
+    #: passed to each fetch call
+    retry_policy = Instance(RetryPolicy)
 
     def fetch(self, url, callback=None, raise_error=True, **kwargs):
         """  Fetch the given url and fire the callback when ready. Optionally
@@ -165,33 +480,156 @@ class AbstractAsyncHttpClient(Atom):
         """
         app = BridgedApplication.instance()
         f = app.create_future()
+        policy = kwargs.pop('retry_policy', self.retry_policy)
 
         #: Set callback for when response is in
         if callback is not None:
             f.then(callback)
 
+        #: Check the cache
+        entry = None
+        cache = self.cache
+        if cache is not None and self.is_cacheable(kwargs):
+            headers = kwargs.get('headers', {})
+            cc = parse_cache_control(get_header(headers, 'cache-control'))
+            entry = cache.get(self.cache_key(url, kwargs.get('binary')))
+            if entry is not None and not entry.matches(headers):
+                entry = None
+            if entry is not None:
+                if entry.is_fresh() and 'no-cache' not in cc:
+                    request = CachedHttpRequest(url=url, **kwargs)
+                    self.load_cached_response(request.response, entry)
+                    f.request = request
+                    f.set_result(request.response)
+                    return f
+                #: Send a conditional request
+                headers = dict(headers)
+                headers.update(entry.validators())
+                kwargs['headers'] = headers
+
+        #: Wait on an identical request if one is in flight
+        key = self.coalesce_key(url, kwargs) if self.coalesce else None
+        if key is not None:
+            request = self.inflight.get(key)
+            if request is not None:
+                self.futures[request].append(f)
+                f.request = request
+                return f
+
         def handle_response(response):
             """ Callback when the request is complete. """
-            self.requests.remove(response.request)
-            f.set_result(response)
+            request = response.request
+            self.release(request)
+
+            #: Send it again later if the policy allows
+            if policy is not None:
+                delay = policy.get_delay(response,
+                                         time.time()-first.start_time)
+                if delay is not None:
+                    policy.retries += 1
+                    retry = self.request_factory(
+                        url=url, callback=handle_response,
+                        **dict(kwargs, retries=request.retries+1))
+                    futures = self.futures[retry] = self.futures.pop(request)
+                    for future in futures:
+                        future.request = retry
+                    if key is not None:
+                        self.inflight[key] = retry
+                    app.timed_call(int(delay*1000), self.dispatch, retry)
+                    return
+                policy.record(response)
+
+            futures = self.futures.pop(request)
+            if key is not None:
+                self.inflight.pop(key, None)
+            if cache is not None:
+                self.update_cache(response, entry)
+            for future in futures:
+                future.set_result(response)
 
         #: Create and dispatch the request object
-        request = self.request_factory(url=url,
-                                       callback=handle_response,
-                                       **kwargs)
+        request = first = self.request_factory(url=url,
+                                               callback=handle_response,
+                                               **kwargs)
 
         #: Save a reference
         #: This gets removed in the handle response
-        self.requests.append(request)
+        self.futures[request] = [f]
+        if key is not None:
+            self.inflight[key] = request
 
-        #: Run the request
-        self._fetch(request)
+        self.dispatch(request)
 
         #: Save it on the future so it can be accessed and observed
         #: from a view if needed
         f.request = request
         return f
 
+    def coalesce_key(self, url, kwargs):
+        """ Get the key used to find identical requests in flight or None 
+        if the request cannot be shared.
+        
+        """
+        if kwargs.get('method', 'get').lower() not in ('get', 'head'):
+            return None
+        if kwargs.get('streaming_callback') or kwargs.get('body') or \
+                kwargs.get('data') or kwargs.get('output'):
+            return None
+        headers = kwargs.get('headers')
+        return (kwargs.get('method', 'get').lower(), url,
+                tuple(sorted(headers.items())) if headers else (),
+                bool(kwargs.get('binary')))
+
+    def dispatch(self, request):
+        """ Send the request now or queue it until the limits allow """
+        if self.can_send(request):
+            self.send(request)
+        else:
+            heapq.heappush(self.queue,
+                           (request.priority, next(self._counter), request))
+
+    def can_send(self, request):
+        """ Check if the request can be sent without exceeding the limits """
+        if self.max_requests and self.active >= self.max_requests:
+            return False
+        n = self.max_requests_per_host
+        return not n or self.active_hosts.get(self.get_host(request), 0) < n
+
+    def get_host(self, request):
+        return urlparse(request.url).netloc
+
+    def send(self, request):
+        """ Send the request and count it against the limits """
+        host = self.get_host(request)
+        self.active += 1
+        self.active_hosts[host] = self.active_hosts.get(host, 0) + 1
+        self._fetch(request)
+
+    def release(self, request):
+        """ Release the request from the limits and send any queued
+        requests that can now be sent in order of priority.
+        
+        """
+        host = self.get_host(request)
+        self.active -= 1
+        n = self.active_hosts.get(host, 0) - 1
+        if n > 0:
+            self.active_hosts[host] = n
+        else:
+            self.active_hosts.pop(host, None)
+
+        queue = self.queue
+        skipped = []
+        while queue and not (self.max_requests and
+                             self.active >= self.max_requests):
+            item = heapq.heappop(queue)
+            if self.can_send(item[2]):
+                self.send(item[2])
+            else:
+                skipped.append(item)
+        for item in skipped:
+            heapq.heappush(queue, item)
+
     def _fetch(self, request):
         """ Actually do the request. Subclasses shall override this
         to implement it using the native API's.
@@ -199,6 +637,73 @@ class AbstractAsyncHttpClient(Atom):
         """
         raise NotImplementedError
 
+    def is_cacheable(self, kwargs):
+        """ Check if a request with the given arguments can use the cache. 
+        
+        """
+        if kwargs.get('method', 'get').lower() != 'get':
+            return False
+        if kwargs.get('streaming_callback') or kwargs.get('output'):
+            return False
+        headers = kwargs.get('headers')
+        if get_header(headers, 'if-none-match') or \
+                get_header(headers, 'if-modified-since'):
+            #: Let the user handle their own conditional requests
+            return False
+        cc = parse_cache_control(get_header(headers, 'cache-control'))
+        return 'no-store' not in cc
+
+    def cache_key(self, url, binary=False):
+        """ Get the key the response of the url is cached with. Binary 
+        responses are cached separately since the body is bytes instead of 
+        text.
+        
+        """
+        return u'{} binary'.format(url) if binary else url
+
+    def load_cached_response(self, response, entry):
+        """ Load the cached entry into the response """
+        response.code = entry.code
+        response.headers = entry.headers
+        response.body = entry.body
+        response.content_length = entry.size
+        response.progress = 100
+        response.ok = True
+        response.error = None
+        response.cached = True
+
+    def update_cache(self, response, entry=None):
+        """ Update the cache with the response. A 304 Not Modified response
+        is replaced with the cached entry that was revalidated and a changed
+        response replaces the entry.
+
+        """
+        cache = self.cache
+        request = response.request
+        key = self.cache_key(request.url, request.binary)
+        method = request.method.lower()
+        headers = request.headers
+        if entry is not None:
+            #: Ignore the validators added by fetch to revalidate the entry
+            headers = {k: v for k, v in headers.items()
+                       if k.lower() not in ('if-none-match',
+                                            'if-modified-since')}
+        if method not in ('get', 'head'):
+            #: Unsafe methods invalidate the cached response
+            if response.ok:
+                cache.remove(self.cache_key(request.url))
+                cache.remove(self.cache_key(request.url, True))
+        elif response.code == 304 and entry is not None:
+            entry.update(response.headers)
+            cache.set(key, entry)
+            self.load_cached_response(response, entry)
+        elif not self.is_cacheable({'headers': headers}):
+            return
+        elif method == 'get' and response.code == 200 and response.ok:
+            entry = HttpCacheEntry.from_response(response)
+            if entry is not None:
+                cache.set(key, entry)
+
 
 class AbstractWebsocketClient(Atom):
     """ An AsyncWebsocketClient that lets you handle WSS using a 
@@ -208,17 +713,77 @@ class AbstractWebsocketClient(Atom):
     SSL stuff for us. Otherwise we have to compile and link all the SSL
     libraries with python which makes the app huge (at least 5Mb in ssl 
     libs alone) and the build process even more complicated.
+    
+    Messages written within the same loop iteration are sent together
+    right before the bridge is flushed and messages received together 
+    are delivered in one call to `on_messages`. If the connection fails 
+    or is closed by the server it's reopened after a delay that grows 
+    exponentially.
 
     """
 
+    #: Url to connect to
+    url = Unicode()
+
+    #: Headers sent with the handshake request
+    headers = Dict()
+
+    #: Whether the connection is open
+    connected = Bool()
+
+    #: Set once `close` is called so the connection is not reopened
+    closed = Bool()
+
+    #: Messages written and not yet sent as a list of (message, binary)
+    pending = List()
+
+    #: Send the messages written in the same loop iteration together before
+    #: the bridge is flushed. If False each message is sent when written.
+    batch = Bool(True)
+
+    #: Messages received within this many ms are delivered together, 
+    #: 0 to deliver each message when it's received
+    coalesce_interval = Int(16)
+
+    #: Reopen the connection when it fails or is closed by the server
+    reconnect = Bool(True)
+
+    #: Max number of attempts to reopen the connection before giving up, 
+    #: 0 for no limit
+    max_reconnects = Int(10)
+
+    #: Delay before the first attempt to reopen in seconds, it's doubled
+    #: for each attempt
+    backoff = Float(0.5)
+
+    #: Max delay between attempts to reopen in seconds
+    max_backoff = Float(30)
+
+    #: Fraction of the delay that is randomized so clients don't all 
+    #: reconnect at the same time
+    jitter = Float(0.5)
+
+    #: Number of attempts to reopen since the connection was last open
+    reconnects = Int()
+
+    #: Future resolved with this client when the first attempt to connect 
+    #: succeeds or fails. Attempts to reopen the connection continue in 
+    #: the background after a failure.
+    future = Value()
+
+    #: Whether the future was resolved (twisted Deferreds have no `done`)
+    resolved = Bool()
+
     @classmethod
-    def connect(cls, url):
+    def connect(cls, url, **kwargs):
         """ Start a connection and return an instance 
         
         Parameters
         ----------
             url: string
                 The url to connect to.
+            kwargs:
+                Members of the client to set such as `headers`.
         
         Returns
         -------
@@ -227,24 +792,148 @@ class AbstractWebsocketClient(Atom):
                 instance when the connection succeeds or fails.
         
         """
-        raise NotImplementedError
+        client = cls(url=url, **kwargs)
+        return client.open()
+
+    def open(self):
+        """ Open the connection 
+        
+        Returns
+        -------
+            result: Future
+                A future that resolves with this client when the connection
+                succeeds or fails.
+        
+        """
+        app = BridgedApplication.instance()
+        self.future = app.create_future()
+        self.resolved = False
+        self.closed = False
+        self._connect()
+        return self.future
 
     def write_message(self, message, binary=False):
-        """ Sends a message to the WebSocket server. """
+        """ Sends a message to the WebSocket server. Messages written while
+        the connection is being opened are sent once it's open.
+        
+        """
+        self.pending.append((message, binary))
+        if not self.connected:
+            return
+        if self.batch:
+            app = BridgedApplication.instance()
+            app.call_before_flush(self.flush)
+        else:
+            self.flush()
+
+    def flush(self):
+        """ Send all the pending messages """
+        if not self.connected or not self.pending:
+            return
+        messages, self.pending = self.pending, []
+        self._send(messages)
+
+    def close(self, code=1000, reason=''):
+        """ Close the websocket with the given code and reason """
+        self.closed = True
+        self.flush()
+        self._close(code, reason)
+
+    def get_reconnect_delay(self):
+        """ Get the delay before reopening the connection in seconds or 
+        None if it should not be reopened.
+        
+        """
+        if self.closed or not self.reconnect:
+            return None
+        if self.max_reconnects and self.reconnects >= self.max_reconnects:
+            return None
+        delay = min(self.max_backoff, self.backoff*2**self.reconnects)
+        return delay - delay*self.jitter*random.random()
+
+    # -------------------------------------------------------------------------
+    # Native API
+    # -------------------------------------------------------------------------
+    def _connect(self):
+        """ Start a native connection to the url """
         raise NotImplementedError
 
-    def close(self, code=None, reason=None):
-        """ Close the websocket with the given code and reason """
+    def _send(self, messages):
+        """ Send a list of (message, binary) tuples over the connection """
         raise NotImplementedError
 
+    def _close(self, code, reason):
+        """ Close the native connection """
+        raise NotImplementedError
+
+    # -------------------------------------------------------------------------
+    # Native callbacks
+    # -------------------------------------------------------------------------
+    def handle_open(self):
+        """ Called by the implementation when the connection is open """
+        self.connected = True
+        self.reconnects = 0
+        self._resolve()
+        self.on_open()
+        self.flush()
+
+    def handle_messages(self, messages, is_binary):
+        """ Called by the implementation with messages received """
+        self.on_messages(messages, is_binary)
+
+    def handle_close(self, code=None, reason=None, error=None):
+        """ Called by the implementation when the connection is closed or
+        fails. Reopens the connection if needed.
+        
+        """
+        was_connected = self.connected
+        self.connected = False
+        if error is not None:
+            self.on_error(error)
+        if was_connected or error is None:
+            self.on_close(code, reason)
+        self._resolve()
+        delay = self.get_reconnect_delay()
+        if delay is None:
+            return
+        self.reconnects += 1
+        app = BridgedApplication.instance()
+        app.timed_call(int(delay*1000), self._reconnect)
+
+    def _reconnect(self):
+        if not self.closed and not self.connected:
+            self._connect()
+
+    def _resolve(self):
+        """ Resolve the future of the first attempt to connect """
+        if self.future is not None and not self.resolved:
+            self.resolved = True
+            self.future.set_result(self)
+
+    # -------------------------------------------------------------------------
+    # User API
+    # -------------------------------------------------------------------------
     def on_open(self):
         """ Called when a connection has opened """
         pass
 
+    def on_messages(self, messages, is_binary):
+        """ Called with a list of messages received together. By default 
+        this calls `on_message` for each one.
+        
+        """
+        on_message = self.on_message
+        for message in messages:
+            on_message(message, is_binary)
+
     def on_message(self, message, is_binary):
         """ Called when a message is received """
         raise NotImplementedError
 
+    def on_error(self, error):
+        """ Called when the connection fails """
+        pass
+
     def on_close(self, code=None, reason=None):
         """ Called when the connection is closed"""
-        pass
\ No newline at end of file
+        pass
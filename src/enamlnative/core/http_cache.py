@@ -0,0 +1,435 @@
+"""
+Copyright (c) 2018, Jairus Martin.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+@author jrm
+
+"""
+import os
+import json
+import time
+import base64
+import hashlib
+from collections import OrderedDict
+from email.utils import parsedate_tz, mktime_tz
+from atom.api import Atom, Dict, Float, Int, Unicode, Value, Instance
+from .bridge import get_tmp_path, log_error
+
+
+def get_header(headers, name):
+    """ Get the value of a header. Header names are case insensitive and
+    native clients may return a list of values for each header.
+
+    Parameters
+    ----------
+    headers: dict
+        The request or response headers
+    name: string
+        The lowercase name of the header
+
+    Returns
+    -------
+    value: string or None
+        The value of the header with multiple values joined by a comma.
+
+    """
+    if not headers:
+        return None
+    for k, v in headers.items():
+        if k.lower() == name:
+            if isinstance(v, (list, tuple)):
+                return ", ".join(v)
+            return v
+    return None
+
+
+def parse_cache_control(value):
+    """ Parse a Cache-Control header into a dict of directives. Directives
+    without a value are set to True.
+
+    """
+    directives = {}
+    if not value:
+        return directives
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "=" in part:
+            k, v = part.split("=", 1)
+            directives[k.strip().lower()] = v.strip().strip('"')
+        else:
+            directives[part.lower()] = True
+    return directives
+
+
+def parse_http_date(value):
+    """ Parse an HTTP date into a timestamp or return None if it's invalid
+
+    """
+    if not value:
+        return None
+    date = parsedate_tz(value)
+    if date is None:
+        return None
+    return mktime_tz(date)
+
+
+class HttpCacheEntry(Atom):
+    """ A response stored in an HttpCache """
+
+    #: Url of the response
+    url = Unicode()
+
+    #: Status code
+    code = Int()
+
+    #: Response headers
+    headers = Dict()
+
+    #: Response body
+    body = Value()
+
+    #: Validators used to send conditional requests
+    etag = Unicode()
+    last_modified = Unicode()
+
+    #: Time the response is considered stale
+    expires = Float()
+
+    #: Values of the request headers named in the response Vary header
+    vary = Dict()
+
+    @classmethod
+    def from_response(cls, response, now=None):
+        """ Create an entry from the response if it can be cached according
+        to the Cache-Control and validator headers.
+
+        Parameters
+        ----------
+        response: HttpResponse
+            The response to store
+        now: float
+            The current time
+
+        Returns
+        -------
+        entry: HttpCacheEntry or None
+            The entry or None if the response cannot be cached
+
+        """
+        headers = response.headers
+        cc = parse_cache_control(get_header(headers, 'cache-control'))
+        if 'no-store' in cc:
+            return None
+        vary = get_header(headers, 'vary')
+        if vary and vary.strip() == '*':
+            return None
+        entry = cls(url=response.request.url, code=response.code,
+                    body=response.body,
+                    etag=get_header(headers, 'etag') or '',
+                    last_modified=get_header(headers, 'last-modified') or '')
+        if vary:
+            request_headers = response.request.headers
+            entry.vary = {
+                name.strip().lower(): get_header(request_headers,
+                                                 name.strip().lower())
+                for name in vary.split(",")
+            }
+        entry.update(headers, now)
+        if not entry.is_fresh(now) and not (entry.etag or
+                                            entry.last_modified):
+            #: Nothing to gain by keeping it
+            return None
+        return entry
+
+    @classmethod
+    def from_dict(cls, state):
+        """ Restore an entry saved with `to_dict` """
+        state = dict(state)
+        if state.pop('base64', False):
+            state['body'] = base64.b64decode(state['body'].encode('ascii'))
+        return cls(**state)
+
+    def to_dict(self):
+        """ Get the state of this entry as json serializable dict """
+        state = {
+            'url': self.url,
+            'code': self.code,
+            'headers': self.headers,
+            'body': self.body,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'expires': self.expires,
+            'vary': self.vary,
+        }
+        if isinstance(self.body, bytes):
+            state['body'] = base64.b64encode(self.body).decode('ascii')
+            state['base64'] = True
+        return state
+
+    @property
+    def size(self):
+        """ Approximate size of the entry in bytes """
+        return len(self.body or '')
+
+    def update(self, headers, now=None):
+        """ Update the headers and expiry time from the headers of a
+        response (or a 304 Not Modified response to a conditional
+        request).
+
+        """
+        now = now or time.time()
+        merged = dict(self.headers)
+        for k, v in headers.items():
+            k = k.lower()
+            if k != 'content-length':
+                merged[k] = v
+        self.headers = merged
+        etag = get_header(headers, 'etag')
+        if etag:
+            self.etag = etag
+        last_modified = get_header(headers, 'last-modified')
+        if last_modified:
+            self.last_modified = last_modified
+
+        cc = parse_cache_control(get_header(merged, 'cache-control'))
+        date = parse_http_date(get_header(merged, 'date')) or now
+        lifetime = 0
+        if 'no-cache' in cc:
+            lifetime = 0
+        elif 'max-age' in cc:
+            try:
+                lifetime = int(cc['max-age'])
+            except ValueError:
+                lifetime = 0
+        elif get_header(merged, 'expires'):
+            expires = parse_http_date(get_header(merged, 'expires'))
+            lifetime = expires - date if expires else 0
+        elif self.last_modified:
+            #: Heuristic freshness (RFC 7234 section 4.2.2)
+            modified = parse_http_date(self.last_modified)
+            if modified:
+                lifetime = min((date - modified) / 10.0, 86400)
+        try:
+            age = int(get_header(merged, 'age') or 0)
+        except ValueError:
+            age = 0
+        self.expires = now + max(0, lifetime - age)
+
+    def is_fresh(self, now=None):
+        """ Whether the entry can be used without revalidating it """
+        return self.expires > (now or time.time())
+
+    def matches(self, headers):
+        """ Whether the request headers match the headers the response
+        varies on.
+
+        """
+        for name, value in self.vary.items():
+            if get_header(headers, name) != value:
+                return False
+        return True
+
+    def validators(self):
+        """ Get the headers used to revalidate the entry """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache(Atom):
+    """ A store of responses used by an AsyncHttpClient. Subclasses
+    implement where the entries are kept.
+
+    """
+
+    def get(self, key):
+        """ Get the entry stored with the given key or None """
+        raise NotImplementedError
+
+    def set(self, key, entry):
+        """ Store the entry with the given key """
+        raise NotImplementedError
+
+    def remove(self, key):
+        """ Remove the entry with the given key if it exists """
+        raise NotImplementedError
+
+    def clear(self):
+        """ Remove all entries """
+        raise NotImplementedError
+
+
+class MemoryHttpCache(HttpCache):
+    """ An LRU cache of responses kept in memory """
+
+    #: Max number of entries
+    max_entries = Int(100)
+
+    #: Max total size of all entries in bytes
+    max_size = Int(4*1024*1024)
+
+    #: Total size of all entries in bytes
+    size = Int()
+
+    #: Entries in order of use
+    entries = Instance(OrderedDict, ())
+
+    def get(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.entries[key] = entry
+        return entry
+
+    def set(self, key, entry):
+        self.remove(key)
+        if entry.size > self.max_size:
+            return
+        self.entries[key] = entry
+        self.size += entry.size
+        entries = self.entries
+        while len(entries) > self.max_entries or self.size > self.max_size:
+            k, e = entries.popitem(last=False)
+            self.size -= e.size
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+
+class DiskHttpCache(HttpCache):
+    """ A cache of responses saved as files in a directory. The least
+    recently used entries are removed when the size limit is reached.
+
+    """
+
+    #: Directory the entries are saved in
+    path = Unicode()
+
+    #: Max total size of the files in bytes
+    max_size = Int(20*1024*1024)
+
+    #: Total size of the files in bytes
+    size = Int()
+
+    #: Size of each file by name in order of use, loaded from the directory
+    #: when first needed
+    index = Instance(OrderedDict)
+
+    def _default_path(self):
+        return get_tmp_path('enamlnative-http')
+
+    def _default_index(self):
+        index = OrderedDict()
+        path = self.path
+        if not os.path.exists(path):
+            os.makedirs(path)
+        files = []
+        for name in os.listdir(path):
+            stat = os.stat(os.path.join(path, name))
+            files.append((stat.st_mtime, name, stat.st_size))
+        for mtime, name, size in sorted(files):
+            index[name] = size
+            self.size += size
+        return index
+
+    def filename(self, key):
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        name = self.filename(key)
+        index = self.index
+        if name not in index:
+            return None
+        try:
+            with open(os.path.join(self.path, name)) as f:
+                entry = HttpCacheEntry.from_dict(json.load(f))
+        except (IOError, OSError, ValueError, TypeError):
+            self._delete(name)
+            return None
+        index[name] = index.pop(name)
+        return entry
+
+    def set(self, key, entry):
+        name = self.filename(key)
+        try:
+            data = json.dumps(entry.to_dict())
+        except (TypeError, ValueError) as e:
+            log_error(self.set, e)
+            return
+        if len(data) > self.max_size:
+            return
+        self._delete(name)
+        try:
+            with open(os.path.join(self.path, name), 'w') as f:
+                f.write(data)
+        except (IOError, OSError) as e:
+            log_error(self.set, e)
+            return
+        index = self.index
+        index[name] = len(data)
+        self.size += len(data)
+        while self.size > self.max_size:
+            self._delete(next(iter(index)))
+
+    def remove(self, key):
+        self._delete(self.filename(key))
+
+    def clear(self):
+        for name in list(self.index):
+            self._delete(name)
+
+    def _delete(self, name):
+        size = self.index.pop(name, None)
+        if size is None:
+            return
+        self.size -= size
+        try:
+            os.remove(os.path.join(self.path, name))
+        except (IOError, OSError):
+            pass
+
+
+class LayeredHttpCache(HttpCache):
+    """ A memory cache in front of a disk cache. Entries read from disk are
+    kept in memory until they're evicted.
+
+    """
+
+    #: Cache checked first
+    memory = Instance(HttpCache, factory=MemoryHttpCache)
+
+    #: Cache checked if not in memory
+    disk = Instance(HttpCache, factory=DiskHttpCache)
+
+    def get(self, key):
+        entry = self.memory.get(key)
+        if entry is None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self.memory.set(key, entry)
+        return entry
+
+    def set(self, key, entry):
+        self.memory.set(key, entry)
+        self.disk.set(key, entry)
+
+    def remove(self, key):
+        self.memory.remove(key)
+        self.disk.remove(key)
+
+    def clear(self):
+        self.memory.clear()
+        self.disk.clear()
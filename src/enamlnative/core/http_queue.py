@@ -0,0 +1,493 @@
+"""
+Copyright (c) 2018, Jairus Martin.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+@author jrm
+
+"""
+import os
+import json
+import time
+import uuid
+import base64
+from collections import OrderedDict
+from atom.api import (Atom, Bool, Dict, Float, Int, Unicode, Value, Instance,
+                      ForwardInstance)
+from .app import BridgedApplication
+from .bridge import get_tmp_path, log_error
+
+
+def get_client_class():
+    from .http import AbstractAsyncHttpClient
+    return AbstractAsyncHttpClient
+
+
+class QueuedRequest(Atom):
+    """ A request stored in an HttpRequestQueue until it's sent """
+
+    #: Unique id of the request
+    id = Unicode()
+
+    #: Request url
+    url = Unicode()
+
+    #: Arguments passed to the client's fetch call
+    kwargs = Dict()
+
+    #: Time the request was queued
+    created = Float()
+
+    #: Number of times sending it failed
+    attempts = Int()
+
+    #: Reason the last attempt failed
+    error = Unicode()
+
+    @classmethod
+    def from_dict(cls, state):
+        """ Restore a request saved with `to_dict` """
+        state = dict(state)
+        kwargs = dict(state.get('kwargs', {}))
+        if kwargs.pop('base64', False):
+            kwargs['body'] = base64.b64decode(kwargs['body'].encode('ascii'))
+        state['kwargs'] = kwargs
+        return cls(**state)
+
+    def to_dict(self):
+        """ Get the state of this request as a json serializable dict """
+        kwargs = self.kwargs
+        if isinstance(kwargs.get('body'), bytes) and bytes is not str:
+            kwargs = dict(kwargs)
+            kwargs['body'] = base64.b64encode(kwargs['body']).decode('ascii')
+            kwargs['base64'] = True
+        return {
+            'id': self.id,
+            'url': self.url,
+            'kwargs': kwargs,
+            'created': self.created,
+            'attempts': self.attempts,
+            'error': self.error,
+        }
+
+
+class RequestStore(Atom):
+    """ Storage of the requests in an HttpRequestQueue. Subclasses
+    implement where the requests are kept.
+
+    """
+
+    def load(self):
+        """ Get all the stored requests in the order they were added """
+        raise NotImplementedError
+
+    def add(self, request):
+        """ Store the request """
+        raise NotImplementedError
+
+    def update(self, request):
+        """ Save changes to a stored request """
+        raise NotImplementedError
+
+    def remove(self, request):
+        """ Remove the request """
+        raise NotImplementedError
+
+    def clear(self):
+        """ Remove all requests """
+        raise NotImplementedError
+
+
+class MemoryRequestStore(RequestStore):
+    """ Keeps requests in memory only, they're lost when the app exits """
+
+    #: Requests by id in order they were added
+    requests = Instance(OrderedDict, ())
+
+    def load(self):
+        return list(self.requests.values())
+
+    def add(self, request):
+        self.requests[request.id] = request
+
+    def update(self, request):
+        self.requests[request.id] = request
+
+    def remove(self, request):
+        self.requests.pop(request.id, None)
+
+    def clear(self):
+        self.requests.clear()
+
+
+class FileRequestStore(RequestStore):
+    """ Saves requests to an append only journal where each line is a json
+    record of a request being added, updated, or removed. The file is
+    rewritten with only the pending requests once most of it's records
+    are obsolete.
+
+    """
+
+    #: Path of the journal file
+    path = Unicode()
+
+    #: Flush each record to disk before returning
+    sync = Bool(True)
+
+    #: Pending requests by id, loaded from the file when first needed
+    requests = Instance(OrderedDict)
+
+    #: Number of records in the file
+    records = Int()
+
+    #: Rewrite the file when it has more than this many records and less
+    #: than half of them are pending requests
+    compact_threshold = Int(64)
+
+    def _default_path(self):
+        return get_tmp_path('enamlnative-requests.log')
+
+    def _default_requests(self):
+        requests = OrderedDict()
+        if not os.path.exists(self.path):
+            return requests
+        with open(self.path) as f:
+            for line in f:
+                self.records += 1
+                try:
+                    record = json.loads(line)
+                    if record['op'] == 'remove':
+                        requests.pop(record['id'], None)
+                    else:
+                        request = QueuedRequest.from_dict(record['request'])
+                        requests[request.id] = request
+                except (ValueError, KeyError, TypeError) as e:
+                    #: A partial write when the app was killed
+                    log_error(self._default_requests, e)
+        return requests
+
+    def load(self):
+        return list(self.requests.values())
+
+    def add(self, request):
+        self.requests[request.id] = request
+        self._write({'op': 'add', 'request': request.to_dict()})
+
+    def update(self, request):
+        if request.id in self.requests:
+            self.requests[request.id] = request
+            self._write({'op': 'update', 'request': request.to_dict()})
+
+    def remove(self, request):
+        if self.requests.pop(request.id, None) is not None:
+            self._write({'op': 'remove', 'id': request.id})
+            if (self.records > self.compact_threshold and
+                    len(self.requests)*2 < self.records):
+                self.compact()
+
+    def clear(self):
+        self.requests.clear()
+        self.compact()
+
+    def compact(self):
+        """ Rewrite the file with only the pending requests """
+        path = self.path
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            for request in self.requests.values():
+                f.write(json.dumps({'op': 'add',
+                                    'request': request.to_dict()}) + '\n')
+            f.flush()
+            if self.sync:
+                os.fsync(f.fileno())
+        os.rename(tmp, path)
+        self.records = len(self.requests)
+
+    def _write(self, record):
+        path = self.path
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            if self.sync:
+                os.fsync(f.fileno())
+        self.records += 1
+
+
+class HttpRequestQueue(Atom):
+    """ A persistent outbox for requests that change data on the server.
+    Requests are stored before they're sent and removed once the server 
+    responds. Requests that fail without a response (or with a status in
+    `statuses`) are sent again in batches when the connection returns, so 
+    they survive going offline and restarting the app.
+
+    Use `fetch` in place of the client's fetch for requests that must be
+    delivered. The kwargs are stored so they must be json serializable
+    (or bytes for the `body`), callbacks cannot be stored.
+
+    """
+
+    #: Client used to send the requests. This must be given unless a 
+    #: platform subclass provides one (ex AndroidHttpRequestQueue).
+    client = ForwardInstance(get_client_class)
+
+    #: Where the requests are kept until they're sent
+    store = Instance(RequestStore, factory=FileRequestStore)
+
+    #: Requests waiting to be sent in the order they were queued
+    pending = Instance(OrderedDict)
+
+    #: Ids of the requests sent and not yet complete
+    inflight = Dict()
+
+    #: Futures returned by fetch calls by request id
+    futures = Dict()
+
+    #: Whether the last request got a response. While offline requests
+    #: are queued without trying to send them.
+    online = Bool(True)
+
+    #: Whether the queued requests are being sent
+    replaying = Bool()
+
+    #: Max number of queued requests sent at once. Requests are sent in 
+    #: the order they were queued, use 1 if they must also complete in order.
+    max_concurrent = Int(4)
+
+    #: Max number of queued requests sent per replay
+    batch_size = Int(50)
+
+    #: Seconds between attempts to send the queue while it's not empty,
+    #: 0 to only send it when `replay` is called
+    replay_interval = Float(60)
+
+    #: Remove requests that failed this many times, 0 for no limit
+    max_attempts = Int(0)
+
+    #: Status codes that are treated like a failed connection and queued
+    statuses = Instance(frozenset,
+                        (frozenset((408, 429, 500, 502, 503, 504)),))
+
+    #: Header sent with a unique id for each request so the server can
+    #: ignore a request it already handled, empty to disable
+    idempotency_header = Unicode('Idempotency-Key')
+
+    #: Callback invoked with the QueuedRequest and HttpResponse when a
+    #: queued request is rejected by the server or exceeds `max_attempts`
+    on_dropped = Value()
+
+    #: Whether a replay timer is scheduled
+    _timer_scheduled = Bool()
+
+    #: Set when a request fails during a replay to stop it
+    _halted = Bool()
+
+    # -------------------------------------------------------------------------
+    # Metrics
+    # -------------------------------------------------------------------------
+    #: Number of requests queued since the app started
+    queued = Int()
+
+    #: Number of queued requests sent successfully
+    sent = Int()
+
+    #: Number of queued requests that failed and remain queued
+    failed = Int()
+
+    #: Number of queued requests removed without being sent successfully
+    dropped = Int()
+
+    def _default_pending(self):
+        return OrderedDict((r.id, r) for r in self.store.load())
+
+    @property
+    def depth(self):
+        """ Number of requests waiting to be sent """
+        return len(self.pending)
+
+    def stats(self):
+        """ Get the queue metrics as a dict """
+        return {
+            'depth': self.depth,
+            'inflight': len(self.inflight),
+            'queued': self.queued,
+            'sent': self.sent,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'online': self.online,
+        }
+
+    # -------------------------------------------------------------------------
+    # Public api
+    # -------------------------------------------------------------------------
+    def fetch(self, url, callback=None, **kwargs):
+        """ Queue the request and send it after any requests queued before
+        it if online.
+
+        Parameters
+        ----------
+            url: string
+                The url to access.
+            callback: callable
+                The callback to invoke when the request is sent
+                successfully or dropped. It is not invoked when it is sent
+                after the app is restarted.
+            kwargs:
+                The arguments to pass to the `HttpRequest` object.
+
+        Returns
+        --------
+            result: Future
+                A future that resolves with the `HttpResponse` when the
+                request was sent successfully or dropped.
+
+        """
+        self.check_client()
+        for k, v in kwargs.items():
+            if callable(v):
+                raise ValueError("Queued requests cannot store the "
+                                 "callable '{}'".format(k))
+        if self.idempotency_header:
+            headers = dict(kwargs.get('headers', {}))
+            headers.setdefault(self.idempotency_header, uuid.uuid4().hex)
+            kwargs['headers'] = headers
+        request = QueuedRequest(id=uuid.uuid4().hex, url=url, kwargs=kwargs,
+                                created=time.time())
+        app = BridgedApplication.instance()
+        f = app.create_future()
+        if callback is not None:
+            f.then(callback)
+        f.queued_request = request
+        self.futures[request.id] = f
+
+        #: Persist it before sending so it's not lost if the app is killed
+        self.pending[request.id] = request
+        self.store.add(request)
+        self.queued += 1
+
+        if self.online:
+            self.replay()
+        else:
+            self.schedule_replay()
+        return f
+
+    def replay(self):
+        """ Send the next batch of queued requests. Up to `max_concurrent`
+        are sent at once and the replay stops at the first request that
+        fails to connect.
+
+        """
+        if self.replaying or not self.pending:
+            return
+        self.check_client()
+        self.replaying = True
+        self._halted = False
+        batch = [r for r in self.pending.values()
+                 if r.id not in self.inflight][:self.batch_size]
+        batch.reverse()
+        for i in range(min(self.max_concurrent, len(batch))):
+            self.send(batch.pop(), batch)
+        if not self.inflight:
+            self.replaying = False
+
+    def clear(self):
+        """ Remove all the queued requests that are not in flight """
+        for request in list(self.pending.values()):
+            if request.id not in self.inflight:
+                self.remove(request)
+
+    def schedule_replay(self):
+        """ Schedule a replay after `replay_interval` """
+        if self._timer_scheduled or not self.replay_interval:
+            return
+        self._timer_scheduled = True
+        app = BridgedApplication.instance()
+        app.timed_call(int(self.replay_interval*1000), self._on_timer)
+
+    # -------------------------------------------------------------------------
+    # Internal api
+    # -------------------------------------------------------------------------
+    def check_client(self):
+        """ Make sure a client was given to send the requests """
+        if self.client is None:
+            raise RuntimeError("A client is required to send the requests "
+                               "of an HttpRequestQueue")
+
+    def send(self, request, batch):
+        """ Send the queued request and the next one in the batch when it 
+        completes.
+
+        """
+        def on_response(response):
+            del self.inflight[request.id]
+            if not self.handle_response(request, response):
+                #: Stop and let the timer try again later
+                self._halted = True
+                del batch[:]
+            if batch:
+                self.send(batch.pop(), batch)
+            elif not self.inflight:
+                self.replaying = False
+                if not self._halted and self.pending:
+                    #: Send the next batch
+                    app = BridgedApplication.instance()
+                    app.deferred_call(self.replay)
+
+        self.inflight[request.id] = request
+        self.client.fetch(request.url, raise_error=False,
+                          **request.kwargs).then(on_response)
+
+    def handle_response(self, request, response):
+        """ Remove the request from the queue if it was sent or rejected and
+        keep it otherwise. Returns False if it was kept.
+
+        """
+        if response.code == 0 or response.code in self.statuses:
+            #: No connection or a temporary server error
+            self.online = response.code != 0
+            request.attempts += 1
+            request.error = u"{}".format(response.reason or response.code)
+            if not self.max_attempts or request.attempts < self.max_attempts:
+                self.failed += 1
+                self.store.update(request)
+                self.schedule_replay()
+                return False
+        elif response.ok and response.code < 400:
+            self.online = True
+            self.sent += 1
+            self.remove(request)
+            future = self.futures.pop(request.id, None)
+            if future is not None:
+                future.set_result(response)
+            return True
+
+        #: Rejected by the server or out of attempts
+        self.online = response.code != 0
+        self.dropped += 1
+        self.remove(request)
+        print("Warning: Dropped queued request to {}: {}".format(
+            request.url, request.error or response.code))
+        if self.on_dropped is not None:
+            self.on_dropped(request, response)
+        future = self.futures.pop(request.id, None)
+        if future is not None:
+            future.set_result(response)
+        return True
+
+    def remove(self, request):
+        """ Remove the request from the queue and the store """
+        self.pending.pop(request.id, None)
+        self.store.remove(request)
+
+    def resume(self):
+        """ Send the queue when the connection may have returned """
+        self.online = True
+        self.replay()
+
+    def _on_timer(self):
+        self._timer_scheduled = False
+        self.resume()
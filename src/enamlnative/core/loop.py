@@ -9,15 +9,24 @@ The full license is in the file LICENSE, distributed with this software.
 
 """
 import enamlnative
-from atom.api import Atom, Value, Subclass, Callable, Unicode
+import threading
+from atom.api import Atom, Value, Subclass, Callable, Unicode, Typed, Bool
 from functools import partial
 from . import bridge
+from .monitor import LoopMonitor
 
 
 class EventLoop(Atom):
     """ Event loop delegation api
 
     """
+    #: Priorities that can be passed to `deferred_call`. Implementations
+    #: that don't support priorities run everything in the order queued.
+    PRIORITY_INPUT = 0
+    PRIORITY_FLUSH = 1
+    PRIORITY_NORMAL = 2
+    PRIORITY_IDLE = 3
+
     #: So users can check if needed
     name = Unicode()
 
@@ -30,6 +39,15 @@ class EventLoop(Atom):
     #: Future implementation for type checks
     future = Value()
 
+    #: Records loop lag and callback times when started
+    monitor = Typed(LoopMonitor)
+
+    #: Use a `bridge.BridgeFuture` for results returned over the bridge
+    #: instead of this loop's future. These are much lighter but cannot be
+    #: yielded in tornado or twisted coroutines (they can be awaited when
+    #: using asyncio).
+    lightweight_futures = Bool()
+
     @classmethod
     def default(cls):
         """ Get the first available event loop implementation
@@ -38,6 +56,7 @@ class EventLoop(Atom):
         """
         with enamlnative.imports():
             for impl in [
+                AsyncioEventLoop,
                 TornadoEventLoop,
                 TwistedEventLoop,
                 BuiltinEventLoop,
@@ -46,7 +65,7 @@ class EventLoop(Atom):
                     print("Using {} event loop!".format(impl))
                     return impl()
         raise RuntimeError("No event loop implementation is available. "
-                           "Install tornado or twisted.")
+                           "Use python 3 or install tornado or twisted.")
 
     @classmethod
     def available(cls):
@@ -67,17 +86,29 @@ class EventLoop(Atom):
 
     def deferred_call(self, callback, *args, **kwargs):
         """ Schedule the given callback to be invoked at the next 
-        available time.
+        available time. An optional `priority` keyword argument may be
+        given which is one of the `EventLoop.PRIORITY_*` values.
          
         """
         raise NotImplementedError
 
     def timed_call(self, ms, callback, *args, **kwargs):
         """ Schedule the given callback to be invoked at a time `ms` later. 
+        An optional `coarse` keyword argument may be given for timers that
+        don't need to be precise, implementations that support it use a 
+        timer wheel for these.
         
         """
         raise NotImplementedError
 
+    def threadsafe_call(self, callback, *args, **kwargs):
+        """ Schedule the given callback to be invoked in the loop thread
+        from another thread. Implementations where `deferred_call` is not
+        thread safe must override this.
+        
+        """
+        return self.deferred_call(callback, *args, **kwargs)
+
     def create_future(self):
         """ Create a future instance for this event loop.
 
@@ -98,10 +129,43 @@ class EventLoop(Atom):
         """
         return self.future()
 
+    def create_bridge_future(self):
+        """ Create a future for a result returned over the bridge. If 
+        `lightweight_futures` is enabled this returns a `BridgeFuture` 
+        otherwise it's the same as `create_future`.
+        
+        """
+        if self.lightweight_futures:
+            return bridge.BridgeFuture(self)
+        return self.future()
+
     def run_iteration(self):
         """ Run one iteration of the event loop """
         raise NotImplementedError
 
+    def run_coroutine(self, coro):
+        """ Schedule the coroutine to run in the event loop. 
+        
+        Returns
+        -------
+        result: Future
+            A future created with `create_future` that resolves with the 
+            result of the coroutine.
+        
+        """
+        raise NotImplementedError
+
+    def chain_future(self, source, future):
+        """ Pass the result or error of the source future to the future """
+        def on_done(source):
+            error = source.exception()
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(source.result())
+        source.add_done_callback(on_done)
+        return future
+
     def set_error_handler(self, handler):
         """ Set the error handler method to be the given handler. """
         self._handler = handler
@@ -119,6 +183,235 @@ class EventLoop(Atom):
         print("Uncaught error during callback: {}".format(callback))
         print("Error: {}".format(error))
 
+    def start_monitor(self, **kwargs):
+        """ Start recording loop lag, callback times, and queue depths.
+        
+        Parameters
+        ----------
+        kwargs: 
+            Options to pass to the `LoopMonitor` if one is created.
+        
+        Returns
+        -------
+        monitor: LoopMonitor
+            The monitor that records the data. Use `monitor.stats()` to
+            retrieve it.
+        
+        """
+        if self.monitor is None:
+            self.monitor = LoopMonitor(loop=self, **kwargs)
+        self.monitor.start()
+        return self.monitor
+
+    def stop_monitor(self):
+        """ Stop recording loop stats. """
+        if self.monitor is not None:
+            self.monitor.stop()
+
+    def monitored(self, callback, deferred=False):
+        """ Wrap the callback with the monitor if it's running. """
+        monitor = self.monitor
+        if monitor is None:
+            return callback
+        return monitor.wrap(callback, deferred)
+
+
+class AsyncioTimerHandle(Atom):
+    """ Handle of a timer started from a thread other than the one the
+    asyncio loop runs in. The timer is created by the loop thread, so a 
+    cancel is either applied before it's created or forwarded to it.
+    
+    """
+    #: AsyncioEventLoop the timer is created in
+    event_loop = Value()
+
+    #: The asyncio TimerHandle once created
+    handle = Value()
+
+    #: Whether the timer was cancelled
+    _cancelled = Bool()
+
+    #: Guards the handle as cancel can be called from any thread
+    _lock = Value(factory=threading.Lock)
+
+    def start(self, delay, callback, *args):
+        """ Create the timer unless it was already cancelled. This must 
+        be called from the loop thread.
+        
+        """
+        with self._lock:
+            if not self._cancelled:
+                self.handle = self.event_loop.loop.call_later(
+                    delay, callback, *args)
+
+    def cancel(self):
+        """ Cancel the timer from any thread """
+        with self._lock:
+            self._cancelled = True
+            handle = self.handle
+        if handle is None:
+            return
+        event_loop = self.event_loop
+        if threading.current_thread() is event_loop.thread:
+            handle.cancel()
+        else:
+            event_loop.loop.call_soon_threadsafe(handle.cancel)
+
+    def cancelled(self):
+        return self._cancelled
+
+
+class AsyncioEventLoop(EventLoop):
+    """ Eventloop using asyncio. If uvloop is installed it's used instead 
+    of the default asyncio loop.
+    
+    Futures created by this loop are asyncio futures so they can be awaited
+    from `async def` handlers (scheduled with `asyncio.ensure_future`).
+    
+    """
+
+    #: Thread the loop is running in, calls from other threads must wake
+    #: up the loop
+    thread = Value()
+
+    @classmethod
+    def available(cls):
+        try:
+            import asyncio
+            return True
+        except ImportError as e:
+            print("Asyncio event loop not available {}".format(e))
+            return False
+
+    def _default_name(self):
+        return "asyncio"
+
+    def _default_loop(self):
+        import asyncio
+        try:
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            pass
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        return loop
+
+    def _default_thread(self):
+        return threading.current_thread()
+
+    def _default_future(self):
+        import asyncio
+        loop = self
+
+        class Future(asyncio.Future):
+            def __init__(self):
+                super(Future, self).__init__(loop=loop.loop)
+                bridge.tag_object_with_id(self)
+
+            def then(self, callback):
+                """ Add then method so you can easily chain callbacks.
+                asyncio passes the future not the result to callbacks so
+                the callback is wrapped.
+                """
+                self.add_done_callback(partial(self.safe_callback, callback,
+                                               False))
+                return self
+
+            def catch(self, callback):
+                """ Add catch method so you can easily chain callbacks 
+                """
+                self.add_done_callback(partial(self.safe_callback, callback,
+                                               True))
+                return self
+
+            def safe_callback(self, callback, catch, future):
+                try:
+                    if future.cancelled():
+                        return
+                    error = future.exception()
+                    if catch:
+                        if error is not None:
+                            callback(error)
+                    elif error is None:
+                        callback(future.result())
+                except Exception as e:
+                    if loop._handler:
+                        loop._handler(callback)
+                    else:
+                        raise
+
+        return Future
+
+    def start(self):
+        self.thread = threading.current_thread()
+        self.loop.run_forever()
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def deferred_call(self, callback, *args, **kwargs):
+        """ asyncio does not pass keyword arguments so they're bound with
+        a partial. Calls from other threads (ex the bridge) wake up the loop.
+        
+        """
+        kwargs.pop('priority', None)
+        callback = self.monitored(callback, True)
+        if kwargs:
+            callback = partial(callback, *args, **kwargs)
+            args = ()
+        if threading.current_thread() is self.thread:
+            return self.loop.call_soon(callback, *args)
+        return self.loop.call_soon_threadsafe(callback, *args)
+
+    def timed_call(self, ms, callback, *args, **kwargs):
+        kwargs.pop('coarse', None)
+        callback = self.monitored(callback)
+        if kwargs:
+            callback = partial(callback, *args, **kwargs)
+            args = ()
+        if threading.current_thread() is self.thread:
+            return self.loop.call_later(ms/1000.0, callback, *args)
+
+        #: The timer is created in the loop's thread so return a handle that
+        #: cancels it once it exists
+        handle = AsyncioTimerHandle(event_loop=self)
+        self.loop.call_soon_threadsafe(handle.start, ms/1000.0, callback,
+                                       *args)
+        return handle
+
+    def set_error_handler(self, handler):
+        """ asyncio passes a context dict to the exception handler instead
+        of calling it from within the except block so re-raise the error
+        to give the handler access to the traceback.
+        
+        """
+        self._handler = handler
+
+        def handle_exception(loop, context):
+            error = context.get('exception')
+            callback = context.get('handle', context.get('message'))
+            if error is None:
+                print("Error: {}".format(context.get('message')))
+                return
+            try:
+                raise error
+            except Exception:
+                handler(callback)
+
+        self.loop.set_exception_handler(handle_exception)
+
+    def run_iteration(self):
+        """ Run one iteration of the event loop """
+        loop = self.loop
+        loop.call_soon(loop.stop)
+        loop.run_forever()
+
+    def run_coroutine(self, coro):
+        import asyncio
+        task = asyncio.ensure_future(coro, loop=self.loop)
+        return self.chain_future(task, self.create_future())
+
 
 class TornadoEventLoop(EventLoop):
     """ Eventloop using tornado's ioloop """
@@ -143,19 +436,34 @@ class TornadoEventLoop(EventLoop):
         return IOLoop.current()
 
     def deferred_call(self, callback, *args, **kwargs):
+        kwargs.pop('priority', None)
+        callback = self.monitored(callback, True)
         return self.loop.add_callback(callback, *args, **kwargs)
 
     def timed_call(self, ms, callback, *args, **kwargs):
+        kwargs.pop('coarse', None)
+        callback = self.monitored(callback)
         return self.loop.call_later(ms/1000.0, callback, *args, **kwargs)
 
     def set_error_handler(self, handler):
         self._handler = handler
         self.loop.handle_callback_exception = handler
 
+    #: Function that converts a coroutine into a future
+    convert_yielded = Callable()
+
     def _default_base_future(self):
         from tornado.concurrent import Future
         return Future
 
+    def _default_convert_yielded(self):
+        from tornado.gen import convert_yielded
+        return convert_yielded
+
+    def run_coroutine(self, coro):
+        return self.chain_future(self.convert_yielded(coro),
+                                 self.create_future())
+
     def _default_future(self):
         BaseFuture = self.base_future
         loop = self
@@ -202,7 +510,7 @@ class TornadoEventLoop(EventLoop):
         """ Run one iteration of the event loop """
         self.loop.doIteration(0.000001)
 
-    def log_error(self, callback):
+    def log_error(self, callback, error=None):
         from tornado.log import app_log
         app_log.error("Exception in callback %r", callback, exc_info=True)
 
@@ -261,12 +569,22 @@ class TwistedEventLoop(EventLoop):
             def set_result(self, result):
                 self.callback(result)
 
+            def set_exception(self, error):
+                self.errback(error)
+
         return Future
 
     def start(self):
         print("Starting reactor {}".format(self.loop))
         self.loop.run()
 
+    def run_coroutine(self, coro):
+        from twisted.internet.defer import ensureDeferred
+        f = self.create_future()
+        d = ensureDeferred(coro)
+        d.addCallbacks(f.set_result, f.set_exception)
+        return f
+
     def deferred_call(self, callback, *args, **kwargs):
         """ We have to wake up the reactor after every call because it may 
         calculate a long delay where it can sleep which causes events that 
@@ -274,6 +592,8 @@ class TwistedEventLoop(EventLoop):
         processed until after the reactor "wakes up"
         
         """
+        kwargs.pop('priority', None)
+        callback = self.monitored(callback, True)
         loop = self.loop
         r = loop.callLater(0, callback, *args, **kwargs)
         loop.wakeUp()
@@ -286,11 +606,22 @@ class TwistedEventLoop(EventLoop):
         processed until after the reactor "wakes up"
         
         """
+        kwargs.pop('coarse', None)
+        callback = self.monitored(callback)
         loop = self.loop
         r = loop.callLater(ms/1000.0, callback, *args, **kwargs)
         loop.wakeUp()
         return r
 
+    def threadsafe_call(self, callback, *args, **kwargs):
+        """ The reactor is not thread safe so calls from other threads
+        must use callFromThread.
+        
+        """
+        kwargs.pop('priority', None)
+        callback = self.monitored(callback, True)
+        return self.loop.callFromThread(callback, *args, **kwargs)
+
     def run_iteration(self):
         """ Run one iteration of the event loop """
         self.loop.doIteration(0.000001)
@@ -301,7 +632,18 @@ class BuiltinEventLoop(TornadoEventLoop):
     It's currently slightly slower than tornado at the moment so use tornado 
     if possible.
     
+    Enabling `fast` mode runs about 3x more deferred calls per second (see
+    `test_loop_throughput` in tests/benchmarks.py). The trade-off is that 
+    callbacks no longer run in the StackContext they were scheduled from, 
+    so exception handlers and context set up with `stack_context` do not 
+    follow them into the loop.
+    
     """
+    #: Run the loop in fast mode which does not capture a StackContext
+    #: for each callback. Only enable this if the app does not rely on 
+    #: StackContexts.
+    fast = Bool()
+
     @classmethod
     def available(cls):
         try:
@@ -317,9 +659,44 @@ class BuiltinEventLoop(TornadoEventLoop):
         from .eventloop.concurrent import Future
         return Future
 
+    def _default_convert_yielded(self):
+        from .eventloop.gen import convert_yielded
+        return convert_yielded
+
     def _default_loop(self):
         from .eventloop.ioloop import IOLoop
-        return IOLoop.current()
+        loop = IOLoop.current()
+        loop.fast = self.fast
+        return loop
+
+    def _observe_fast(self, change):
+        if change['type'] == 'update':
+            self.loop.fast = self.fast
+
+    def deferred_call(self, callback, *args, **kwargs):
+        """ Schedule the callback using the priority lanes of the builtin
+        loop. 
+        
+        """
+        priority = kwargs.pop('priority', self.PRIORITY_NORMAL)
+        callback = self.monitored(callback, True)
+        if priority == self.PRIORITY_NORMAL:
+            return self.loop.add_callback(callback, *args, **kwargs)
+        return self.loop.add_priority_callback(priority, callback,
+                                               *args, **kwargs)
+
+    def timed_call(self, ms, callback, *args, **kwargs):
+        """ Timers created with `coarse=True` use the timer wheel of the
+        builtin loop which may run them up to `loop.timer_resolution` late
+        but is much cheaper to add and remove timers.
+        
+        """
+        coarse = kwargs.pop('coarse', False)
+        callback = self.monitored(callback)
+        if coarse:
+            return self.loop.call_later_coarse(ms/1000.0, callback,
+                                               *args, **kwargs)
+        return self.loop.call_later(ms/1000.0, callback, *args, **kwargs)
 
     def set_error_handler(self, handler):
         self._handler = handler
@@ -0,0 +1,261 @@
+"""
+Copyright (c) 2018, Jairus Martin.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+@author jrm
+
+"""
+import bisect
+import functools
+import threading
+from time import time
+from atom.api import Atom, Bool, Float, Int, List, Tuple, Typed, Value
+
+
+def callback_name(callback):
+    """ Get a readable qualified name for a callback so it can be found
+    in the source.
+
+    Parameters
+    ----------
+    callback: callable
+        The callback to name. Partials and bound methods are unwrapped.
+
+    Returns
+    -------
+    name: str
+        The qualified name of the callback.
+
+    """
+    while isinstance(callback, functools.partial):
+        callback = callback.func
+    obj = getattr(callback, '__self__', None)
+    name = getattr(callback, '__qualname__', None)
+    if name is None:
+        name = getattr(callback, '__name__', None)
+        if name is None:
+            return repr(callback)
+        if obj is not None:
+            name = "{}.{}".format(type(obj).__name__, name)
+    module = getattr(callback, '__module__', None)
+    if module:
+        return "{}.{}".format(module, name)
+    return name
+
+
+class Histogram(Atom):
+    """ A histogram of durations in ms using fixed buckets. """
+
+    #: Upper bounds of each bucket in ms, the last bucket has no bound
+    buckets = Tuple(default=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024))
+
+    #: Number of values in each bucket
+    counts = List()
+
+    #: Number of values added
+    count = Int()
+
+    #: Sum of all values added
+    total = Float()
+
+    #: Largest value added
+    max = Float()
+
+    def _default_counts(self):
+        return [0]*(len(self.buckets)+1)
+
+    def add(self, value):
+        """ Add a value in ms to the histogram """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p):
+        """ Get the upper bound of the bucket containing the given
+        percentile. Returns the max value for the unbounded bucket.
+
+        """
+        if not self.count:
+            return 0
+        n = self.count*p/100.0
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= n:
+                return bound
+        return self.max
+
+    def reset(self):
+        self.counts = self._default_counts()
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def to_dict(self):
+        """ Get the state of the histogram as a dict """
+        return {
+            'buckets': list(self.buckets),
+            'counts': list(self.counts),
+            'count': self.count,
+            'avg': self.total/self.count if self.count else 0,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+        }
+
+
+class LoopMonitor(Atom):
+    """ Measures how responsive an EventLoop is. This works with any
+    EventLoop implementation as it only relies on `deferred_call` and
+    `timed_call`.
+
+    It records the lag of the loop using a heartbeat timer, how long each
+    callback runs, how long deferred calls wait in the queue, how many
+    deferred calls are pending, and the slowest callbacks by name.
+
+    """
+    #: EventLoop being monitored
+    loop = Value()
+
+    #: Whether the monitor is running
+    running = Bool()
+
+    #: Heartbeat interval in ms used to measure loop lag
+    interval = Int(100)
+
+    #: Callbacks taking longer than this (in ms) are considered slow
+    slow_threshold = Float(16, strict=False)
+
+    #: Print a message when a slow callback occurs
+    log_slow = Bool()
+
+    #: Number of slowest callbacks to keep
+    max_slow = Int(20)
+
+    #: How late the heartbeat fired in ms
+    lag = Typed(Histogram, ())
+
+    #: How long callbacks took to run in ms
+    callback_time = Typed(Histogram, ())
+
+    #: How long deferred calls waited in the queue in ms
+    queue_time = Typed(Histogram, ())
+
+    #: Number of deferred calls that have not run yet
+    pending = Int()
+
+    #: Largest number of deferred calls pending at once
+    max_pending = Int()
+
+    #: Slowest callbacks as a list of (ms, name) sorted slowest first
+    slowest = List()
+
+    #: When the next heartbeat should fire
+    _expected = Float()
+
+    #: Guards `pending` as deferred calls can be scheduled from any thread
+    _lock = Value(factory=threading.Lock)
+
+    def start(self):
+        """ Start monitoring the loop """
+        if self.running:
+            return
+        self.running = True
+        self._schedule_tick()
+
+    def stop(self):
+        """ Stop monitoring the loop. Callbacks already wrapped are still
+        recorded when they run.
+
+        """
+        self.running = False
+
+    def reset(self):
+        """ Clear all recorded data """
+        self.lag.reset()
+        self.callback_time.reset()
+        self.queue_time.reset()
+        self.max_pending = self.pending
+        self.slowest = []
+
+    def stats(self):
+        """ Get all of the recorded data as a dict """
+        return {
+            'lag': self.lag.to_dict(),
+            'callback_time': self.callback_time.to_dict(),
+            'queue_time': self.queue_time.to_dict(),
+            'pending': self.pending,
+            'max_pending': self.max_pending,
+            'slowest': list(self.slowest),
+        }
+
+    def wrap(self, callback, deferred=False):
+        """ Wrap a callback so it's execution time is recorded.
+
+        Parameters
+        ----------
+        callback: callable
+            The callback that will be scheduled
+        deferred: bool
+            Whether the callback is a deferred call. If True, the time it
+            waited in the queue and the number of pending calls are also
+            recorded.
+
+        Returns
+        -------
+        wrapped: callable
+            A callable to schedule instead of the callback.
+
+        """
+        if not self.running or callback == self._tick:
+            return callback
+        scheduled = time()
+        if deferred:
+            with self._lock:
+                self.pending += 1
+                if self.pending > self.max_pending:
+                    self.max_pending = self.pending
+
+        def monitored(*args, **kwargs):
+            start = time()
+            if deferred:
+                with self._lock:
+                    self.pending -= 1
+                self.queue_time.add((start-scheduled)*1000)
+            try:
+                return callback(*args, **kwargs)
+            finally:
+                self.record(callback, (time()-start)*1000)
+        return monitored
+
+    def record(self, callback, duration):
+        """ Record that the callback took the given duration in ms """
+        self.callback_time.add(duration)
+        if duration < self.slow_threshold:
+            return
+        if self.log_slow:
+            print("Slow callback {} took {} ms".format(
+                callback_name(callback), round(duration, 2)))
+        slowest = self.slowest
+        if len(slowest) >= self.max_slow and duration <= slowest[-1][0]:
+            return
+        slowest.append((duration, callback_name(callback)))
+        slowest.sort(reverse=True)
+        del slowest[self.max_slow:]
+
+    def _schedule_tick(self):
+        self._expected = time()+self.interval/1000.0
+        self.loop.timed_call(self.interval, self._tick)
+
+    def _tick(self):
+        """ Record how late the heartbeat was and schedule the next one """
+        if not self.running:
+            return
+        self.lag.add(max(0, (time()-self._expected)*1000))
+        self._schedule_tick()
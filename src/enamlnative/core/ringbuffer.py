@@ -0,0 +1,278 @@
+"""
+Copyright (c) 2018, Jairus Martin.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+@author jrm
+
+"""
+import sys
+import math
+import itertools
+from array import array
+from atom.api import Atom, Bool, Int, Value
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class RingBuffer(Atom):
+    """ A fixed size buffer of timestamped samples where new samples
+    replace the oldest ones. Samples are kept in preallocated arrays which
+    are numpy arrays when numpy is installed (and `use_numpy` is True) or
+    python arrays otherwise.
+
+    Examples
+    --------
+
+    buf = RingBuffer(capacity=512, dimensions=3)
+    buf.extend([t0, t1], [(x0, y0, z0), (x1, y1, z1)])
+    times, values = buf.get(100)  # Last 100 samples, oldest first
+    mean = buf.mean(100)  # Mean of each dimension
+
+    """
+
+    #: Max number of samples kept
+    capacity = Int(1024)
+
+    #: Number of values in each sample
+    dimensions = Int(1)
+
+    #: Use numpy arrays if it's installed
+    use_numpy = Bool(numpy is not None)
+
+    #: Timestamps of the samples (int64)
+    times = Value()
+
+    #: Values of the samples (float32). With numpy this is a 2d array of
+    #: shape (capacity, dimensions) otherwise it's a flat array.
+    values = Value()
+
+    #: Index the next sample is written to
+    index = Int()
+
+    #: Total number of samples written
+    count = Int()
+
+    def _default_times(self):
+        if self.use_numpy:
+            return numpy.zeros(self.capacity, dtype=numpy.int64)
+        return array('q', [0])*self.capacity
+
+    def _default_values(self):
+        if self.use_numpy:
+            return numpy.zeros((self.capacity, self.dimensions),
+                               dtype=numpy.float32)
+        return array('f', [0.0])*(self.capacity*self.dimensions)
+
+    def _observe_dimensions(self, change):
+        if change['type'] == 'update':
+            self.reset()
+
+    def _observe_capacity(self, change):
+        if change['type'] == 'update':
+            self.reset()
+
+    @property
+    def size(self):
+        """ Number of samples in the buffer """
+        return min(self.count, self.capacity)
+
+    def __len__(self):
+        return self.size
+
+    def reset(self):
+        """ Remove all samples and reallocate the arrays """
+        del self.times
+        del self.values
+        self.index = 0
+        self.count = 0
+
+    def clear(self):
+        """ Remove all samples """
+        self.index = 0
+        self.count = 0
+
+    def extend(self, times, values):
+        """ Add samples to the buffer
+
+        Parameters
+        ----------
+        times: sequence
+            Timestamp of each sample
+        values: sequence
+            A sequence of samples where each sample is a sequence of values
+            or a flat sequence of values.
+
+        """
+        n = total = len(times)
+        if not n:
+            return
+        capacity = self.capacity
+        dims = self.dimensions
+        if self.use_numpy:
+            times = numpy.asarray(times, dtype=numpy.int64)
+            values = numpy.asarray(values, dtype=numpy.float32)
+            values = values.reshape(n, dims)
+        else:
+            if not isinstance(times, array) or times.typecode != 'q':
+                times = array('q', times)
+            if not isinstance(values, array) or values.typecode != 'f':
+                if n and isinstance(values[0], (list, tuple, array)):
+                    values = array('f', itertools.chain.from_iterable(
+                        values))
+                else:
+                    values = array('f', values)
+            if len(values) != n*dims:
+                raise ValueError("Expected {} values for {} samples with {} "
+                                 "dimensions, got {}".format(
+                                    n*dims, n, dims, len(values)))
+        if n > capacity:
+            times = times[-capacity:]
+            values = values[-capacity:] if self.use_numpy else \
+                values[-capacity*dims:]
+            n = capacity
+
+        #: Copy in at most two slices, wrapping around to the start
+        i = self.index
+        end = min(capacity, i+n)
+        first = end-i
+        if self.use_numpy:
+            self.times[i:end] = times[:first]
+            self.values[i:end] = values[:first]
+            if first < n:
+                self.times[:n-first] = times[first:]
+                self.values[:n-first] = values[first:]
+        else:
+            self.times[i:end] = times[:first]
+            self.values[i*dims:end*dims] = values[:first*dims]
+            if first < n:
+                self.times[:n-first] = times[first:]
+                self.values[:(n-first)*dims] = values[first*dims:]
+        self.index = (i+n) % capacity
+        self.count += total
+
+    def extend_bytes(self, count, times, values):
+        """ Add samples packed as little endian int64 timestamps and float32
+        values (as sent by the native sensor listener).
+
+        """
+        if self.use_numpy:
+            self.extend(numpy.frombuffer(times, dtype='<i8'),
+                        numpy.frombuffer(values, dtype='<f4'))
+            return
+        t, v = array('q'), array('f')
+        if hasattr(t, 'frombytes'):
+            t.frombytes(times)
+            v.frombytes(values)
+        else:
+            t.fromstring(times)
+            v.fromstring(values)
+        if sys.byteorder == 'big':
+            t.byteswap()
+            v.byteswap()
+        self.extend(t, v)
+
+    def get(self, n=None):
+        """ Get the last n samples, oldest first.
+
+        Parameters
+        ----------
+        n: int or None
+            Number of samples to get, defaults to all of them.
+
+        Returns
+        -------
+        result: tuple
+            A tuple of (times, values). With numpy these are views of the
+            buffer when the samples are contiguous and copies otherwise.
+            Without numpy they are lists of timestamps and tuples.
+
+        """
+        size = self.size
+        n = size if n is None else max(0, min(n, size))
+        start = (self.index-n) % self.capacity if n else self.index
+        end = start+n
+        if self.use_numpy:
+            if end <= self.capacity:
+                return self.times[start:end], self.values[start:end]
+            end -= self.capacity
+            return (numpy.concatenate((self.times[start:],
+                                       self.times[:end])),
+                    numpy.concatenate((self.values[start:],
+                                       self.values[:end])))
+        dims = self.dimensions
+        capacity = self.capacity
+        times, values = [], []
+        for j in range(start, end):
+            i = j % capacity
+            times.append(self.times[i])
+            values.append(tuple(self.values[i*dims:(i+1)*dims]))
+        return times, values
+
+    # -------------------------------------------------------------------------
+    # Windowed stats
+    # -------------------------------------------------------------------------
+    def mean(self, n=None):
+        """ Mean of each dimension over the last n samples """
+        times, values = self.get(n)
+        if not len(times):
+            return None
+        if self.use_numpy:
+            return values.mean(axis=0)
+        return [sum(c)/len(c) for c in zip(*values)]
+
+    def std(self, n=None):
+        """ Standard deviation of each dimension over the last n samples """
+        times, values = self.get(n)
+        if not len(times):
+            return None
+        if self.use_numpy:
+            return values.std(axis=0)
+        result = []
+        for c in zip(*values):
+            m = sum(c)/len(c)
+            result.append(math.sqrt(sum((x-m)**2 for x in c)/len(c)))
+        return result
+
+    def min(self, n=None):
+        """ Min of each dimension over the last n samples """
+        times, values = self.get(n)
+        if not len(times):
+            return None
+        if self.use_numpy:
+            return values.min(axis=0)
+        return [min(c) for c in zip(*values)]
+
+    def max(self, n=None):
+        """ Max of each dimension over the last n samples """
+        times, values = self.get(n)
+        if not len(times):
+            return None
+        if self.use_numpy:
+            return values.max(axis=0)
+        return [max(c) for c in zip(*values)]
+
+    def magnitude(self, n=None):
+        """ Magnitude (euclidean norm) of each of the last n samples """
+        times, values = self.get(n)
+        if self.use_numpy:
+            return numpy.sqrt((values.astype(numpy.float64)**2).sum(axis=1))
+        return [math.sqrt(sum(x*x for x in v)) for v in values]
+
+    def rate(self, n=None, scale=1e9):
+        """ Samples per second over the last n samples. The timestamps are
+        in nanoseconds by default, use `scale` for other units.
+
+        """
+        times, values = self.get(n)
+        if len(times) < 2:
+            return 0.0
+        elapsed = times[-1]-times[0]
+        if elapsed <= 0:
+            return 0.0
+        return (len(times)-1)*scale/float(elapsed)
@@ -0,0 +1,329 @@
+"""
+Copyright (c) 2018, Jairus Martin.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+@author jrm
+
+"""
+import sys
+import math
+import json
+import struct
+from array import array
+from atom.api import Atom, Float, Instance, Int, Value
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+#: Mean radius of the earth in meters
+EARTH_RADIUS = 6371008.8
+
+
+def distance(lat1, lon1, lat2, lon2):
+    """ Get the great circle distance between two points in meters """
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2-lat1)/2)**2 +
+         math.cos(lat1)*math.cos(lat2)*math.sin((lon2-lon1)/2)**2)
+    return 2*EARTH_RADIUS*math.asin(min(1, math.sqrt(a)))
+
+
+def _from_bytes(typecode, data):
+    """ Create an array from little endian bytes """
+    a = array(typecode)
+    if hasattr(a, 'frombytes'):
+        a.frombytes(data)
+    else:
+        a.fromstring(data)
+    if sys.byteorder == 'big':
+        a.byteswap()
+    return a
+
+
+def _to_bytes(a):
+    """ Get the little endian bytes of an array """
+    if sys.byteorder == 'big':
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes() if hasattr(a, 'tobytes') else a.tostring()
+
+
+class Track(Atom):
+    """ A recorded track of location fixes stored in columns of compact
+    arrays instead of a dict per fix. Times are in ms since the epoch,
+    latitude and longitude in degrees, altitude and accuracy in meters,
+    speed in m/s, and bearing in degrees.
+
+    """
+
+    #: Value columns in the order they're packed
+    FIELDS = ('latitude', 'longitude', 'altitude', 'accuracy', 'speed',
+              'bearing')
+
+    #: Format of the header written by `to_bytes`
+    HEADER = struct.Struct('<4sBI')
+    MAGIC = b'ENTK'
+    VERSION = 1
+
+    #: Time of each fix (int64)
+    times = Instance(array, ('q',))
+
+    #: Columns of the fixes (float64)
+    latitude = Instance(array, ('d',))
+    longitude = Instance(array, ('d',))
+    altitude = Instance(array, ('d',))
+    accuracy = Instance(array, ('d',))
+    speed = Instance(array, ('d',))
+    bearing = Instance(array, ('d',))
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, i):
+        fix = {'time': self.times[i]}
+        for f in self.FIELDS:
+            fix[f] = getattr(self, f)[i]
+        return fix
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def append(self, fix):
+        """ Add a fix given as a dict with `time`, `latitude`, `longitude`
+        and optionally the other fields.
+
+        """
+        self.times.append(int(fix['time']))
+        for f in self.FIELDS:
+            getattr(self, f).append(fix.get(f, 0.0))
+
+    def extend(self, fixes):
+        """ Add a list of fixes """
+        for fix in fixes:
+            self.append(fix)
+
+    def clear(self):
+        """ Remove all fixes """
+        for f in ('times',) + self.FIELDS:
+            delattr(self, f)
+
+    @classmethod
+    def decode(cls, count, times, values):
+        """ Decode fixes packed as little endian int64 times and float64
+        values (as sent by the native location listener).
+
+        Returns
+        -------
+        fixes: list
+            A list of dicts for each fix.
+
+        """
+        times = _from_bytes('q', times)
+        values = _from_bytes('d', values)
+        n = len(cls.FIELDS)
+        fixes = []
+        for i in range(count):
+            fix = dict(zip(cls.FIELDS, values[i*n:(i+1)*n]))
+            fix['time'] = times[i]
+            fixes.append(fix)
+        return fixes
+
+    def distance(self):
+        """ Total distance of the track in meters """
+        total = 0.0
+        lat, lon = self.latitude, self.longitude
+        for i in range(1, len(lat)):
+            total += distance(lat[i-1], lon[i-1], lat[i], lon[i])
+        return total
+
+    def downsample(self, min_distance=0, min_time=0):
+        """ Get a new track that only keeps a fix if it's at least
+        `min_distance` meters or `min_time` ms from the last fix kept. The
+        first and last fixes are always kept.
+
+        """
+        track = Track()
+        n = len(self)
+        last = None
+        for i in range(n):
+            fix = self[i]
+            if (last is None or i == n-1 or
+                    (min_time and fix['time']-last['time'] >= min_time) or
+                    distance(last['latitude'], last['longitude'],
+                             fix['latitude'], fix['longitude']) >=
+                    min_distance):
+                track.append(fix)
+                last = fix
+        return track
+
+    def to_numpy(self):
+        """ Get a copy of the columns as a dict of numpy arrays """
+        if numpy is None:
+            raise ImportError("numpy is required for Track.to_numpy")
+        result = {'time': numpy.array(self.times, dtype=numpy.int64)}
+        for f in self.FIELDS:
+            result[f] = numpy.array(getattr(self, f), dtype=numpy.float64)
+        return result
+
+    # -------------------------------------------------------------------------
+    # Serialization
+    # -------------------------------------------------------------------------
+    def to_bytes(self):
+        """ Pack the track into a compact binary format """
+        data = [self.HEADER.pack(self.MAGIC, self.VERSION, len(self)),
+                _to_bytes(self.times)]
+        for f in self.FIELDS:
+            data.append(_to_bytes(getattr(self, f)))
+        return b''.join(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """ Load a track packed with `to_bytes` """
+        size = cls.HEADER.size
+        magic, version, count = cls.HEADER.unpack(data[:size])
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError("Invalid track data")
+        track = cls()
+        offset = size+8*count
+        track.times = _from_bytes('q', data[size:offset])
+        for f in cls.FIELDS:
+            setattr(track, f, _from_bytes('d', data[offset:offset+8*count]))
+            offset += 8*count
+        return track
+
+    def save(self, path):
+        """ Save the track to a file """
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        """ Load a track saved to a file """
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+    def to_geojson(self):
+        """ Get the track as a GeoJSON LineString feature string """
+        return json.dumps({
+            'type': 'Feature',
+            'geometry': {
+                'type': 'LineString',
+                'coordinates': [[lon, lat, alt] for lat, lon, alt in zip(
+                    self.latitude, self.longitude, self.altitude)]
+            },
+            'properties': {'times': list(self.times)},
+        })
+
+
+class LocationFilter(Atom):
+    """ Filters location fixes before they're delivered. Subclasses
+    implement `process`.
+
+    """
+
+    def process(self, fix):
+        """ Return the fix, a modified fix, or None to drop it """
+        raise NotImplementedError
+
+    def reset(self):
+        """ Clear any state from previous fixes """
+        pass
+
+
+class AccuracyFilter(LocationFilter):
+    """ Drops fixes less accurate than `max_accuracy` meters """
+
+    #: Max accuracy radius in meters
+    max_accuracy = Float(50)
+
+    def process(self, fix):
+        if fix.get('accuracy', 0) > self.max_accuracy:
+            return None
+        return fix
+
+
+class DistanceFilter(LocationFilter):
+    """ Downsamples fixes by only keeping a fix if it's `min_distance`
+    meters or `min_time` ms from the last fix kept.
+
+    """
+
+    #: Min distance in meters from the last fix
+    min_distance = Float(10)
+
+    #: Keep a fix this many ms after the last one even if it hasn't moved,
+    #: 0 to only filter by distance
+    min_time = Int()
+
+    #: Last fix kept
+    last = Value()
+
+    def process(self, fix):
+        last = self.last
+        if (last is None or
+                (self.min_time and fix['time']-last['time'] >= self.min_time)
+                or distance(last['latitude'], last['longitude'],
+                            fix['latitude'], fix['longitude']) >=
+                self.min_distance):
+            self.last = fix
+            return fix
+        return None
+
+    def reset(self):
+        self.last = None
+
+
+class KalmanFilter(LocationFilter):
+    """ Smooths the latitude and longitude with a Kalman filter that
+    assumes a constant position and uses the accuracy of each fix as the
+    measurement noise. The accuracy of the result is the estimated error.
+
+    """
+
+    #: Expected speed in m/s that the position can change by
+    q = Float(3)
+
+    #: Min accuracy in meters
+    min_accuracy = Float(1)
+
+    #: Current estimate
+    latitude = Float()
+    longitude = Float()
+
+    #: Variance of the estimate in meters squared, negative when there is no
+    #: estimate
+    variance = Float(-1)
+
+    #: Time of the estimate in ms
+    time = Int()
+
+    def process(self, fix):
+        accuracy = max(fix.get('accuracy', 0), self.min_accuracy)
+        if self.variance < 0:
+            self.latitude = fix['latitude']
+            self.longitude = fix['longitude']
+            self.variance = accuracy*accuracy
+            self.time = fix['time']
+        else:
+            dt = (fix['time']-self.time)/1000.0
+            if dt > 0:
+                self.variance += dt*self.q*self.q
+                self.time = fix['time']
+            k = self.variance/(self.variance+accuracy*accuracy)
+            self.latitude += k*(fix['latitude']-self.latitude)
+            self.longitude += k*(fix['longitude']-self.longitude)
+            self.variance = (1-k)*self.variance
+        fix = dict(fix)
+        fix['latitude'] = self.latitude
+        fix['longitude'] = self.longitude
+        fix['accuracy'] = math.sqrt(self.variance)
+        return fix
+
+    def reset(self):
+        self.variance = -1
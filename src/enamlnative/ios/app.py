@@ -110,6 +110,13 @@ class IPhoneApplication(BridgedApplication):
         """
         return AppDelegate(__id__=-1)
 
+    def _default_process_executor(self):
+        """ iOS apps are not allowed to start processes so 
+        `run_in_process` uses the thread pool.
+        
+        """
+        return None
+
     def _default_view_controller(self):
         """ Return a bridge object reference to the ViewController
         the bridge sets this using a special id of -2
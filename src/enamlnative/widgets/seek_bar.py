@@ -10,7 +10,7 @@ Created on June 7, 2017
 @author: jrm
 """
 from atom.api import (
-    Typed, ForwardTyped, Float, Int, Bool, observe, set_default
+    Typed, ForwardTyped, Float, Int, Bool, Enum, observe, set_default
 )
 
 from enaml.core.declarative import d_
@@ -31,6 +31,12 @@ class ProxySeekBar(ProxyProgressBar):
     def set_split_track(self, split):
         raise NotImplementedError
 
+    def set_progress_delivery(self, mode):
+        raise NotImplementedError
+
+    def set_progress_interval(self, interval):
+        raise NotImplementedError
+
 
 class SeekBar(ProgressBar):
     """ A simple control for displaying read-only text.
@@ -43,13 +49,23 @@ class SeekBar(ProgressBar):
     #: Specifies whether the track should be split by the thumb.
     split_track = d_(Bool())
 
+    #: How progress changes are sent while dragging. `all` sends every
+    #: change, `sample` sends at most one every `progress_interval` ms, and
+    #: `latest` only sends the latest progress every `progress_interval` ms
+    #: (or every frame if 0). Both modes always send the final progress.
+    progress_delivery = d_(Enum('all', 'sample', 'latest'))
+
+    #: Interval in ms used by the `progress_delivery` mode
+    progress_interval = d_(Int())
+
     #: A reference to the SeekBar object.
     proxy = Typed(ProxySeekBar)
 
     # -------------------------------------------------------------------------
     # Observers
     # -------------------------------------------------------------------------
-    @observe('key_progress_increment', 'split_track')
+    @observe('key_progress_increment', 'split_track', 'progress_delivery',
+             'progress_interval')
     def _update_proxy(self, change):
         """ An observer which sends the state change to the proxy.
 
@@ -78,6 +78,15 @@ class ProxyView(ProxyToolkitObject):
     def set_key_events(self, focusable):
         raise NotImplementedError
 
+    def set_touch_delivery(self, mode):
+        raise NotImplementedError
+
+    def set_touch_interval(self, interval):
+        raise NotImplementedError
+
+    def set_touch_blocking(self, blocking):
+        raise NotImplementedError
+
     def set_animations(self, animations):
         raise NotImplementedError
 
@@ -171,6 +180,19 @@ class View(ToolkitObject):
     #: Observe touch events
     touch_events = d_(Bool())
 
+    #: How touch move events are sent from the native view. `all` sends
+    #: every event, `sample` sends at most one every `touch_interval` ms,
+    #: and `latest` sends only the latest one every `touch_interval` ms (or
+    #: every frame if 0). Touch down, up, and cancel events are always sent.
+    touch_delivery = d_(Enum('all', 'sample', 'latest'))
+
+    #: Interval in ms used by the `touch_delivery` mode
+    touch_interval = d_(Int())
+
+    #: Whether the native view waits for the `touch_event` handler to set
+    #: the result. Set to False if the handler never consumes the event.
+    touch_blocking = d_(Bool(True))
+
     #: Called when view is clicked
     clicked = d_(Event(), writable=False)
 
@@ -256,7 +278,8 @@ class View(ToolkitObject):
     # Observers
     # -------------------------------------------------------------------------
     @observe('enabled', 'clickable', 'long_clickable', 'focusable',
-             'animate', 'animations', 'key_events', 'touch_events', 'visible',
+             'animate', 'animations', 'key_events', 'touch_events',
+             'touch_delivery', 'touch_interval', 'touch_blocking', 'visible',
              'background_color', 'alpha', 'width', 'height', 'min_height', 
              'min_width', 'max_height', 'max_width', 'x', 'y', 'z', 'gravity', 
              'top', 'bottom', 'right', 'left', 'margin', 'padding', 
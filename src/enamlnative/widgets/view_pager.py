@@ -42,6 +42,15 @@ class ProxyViewPager(ProxyViewGroup):
     def set_transition(self, transition):
         raise NotImplementedError
 
+    def set_cache_limit(self, limit):
+        raise NotImplementedError
+
+    def set_cache_budget(self, budget):
+        raise NotImplementedError
+
+    def set_prefetch(self, prefetch):
+        raise NotImplementedError
+
 
 class ProxyPagerTitleStrip(ProxyViewGroup):
     """ The abstract definition of a proxy PagerTitleStrip object.
@@ -112,6 +121,22 @@ class ViewPager(ViewGroup):
     #: Set the margin between pages.
     page_margin = d_(Int(-1))
 
+    #: Number of pages to keep alive on either side of the current page
+    #: after the adapter has released them. Pages outside of this range
+    #: are destroyed unless the fragment is `cached`.
+    cache_limit = d_(Int())
+
+    #: Approximate number of native objects that pages kept alive may hold.
+    #: Least recently used pages are destroyed first when it's exceeded.
+    #: A value of zero disables the budget.
+    cache_budget = d_(Int())
+
+    #: Build the next page when the event loop is idle after a page
+    #: is selected so it's ready before the user swipes to it. Prefetched
+    #: pages are kept alive by the page cache so this requires a 
+    #: `cache_limit` and they count against the `cache_budget`.
+    prefetch = d_(Bool())
+
     #: Read only list of pages
     pages = property(lambda self: [c for c in self._children
                                    if isinstance(c, Fragment)])
@@ -132,7 +157,8 @@ class ViewPager(ViewGroup):
     # Observers
     # -------------------------------------------------------------------------
     @observe('current_index', 'offscreen_page_limit', 'page_margin',
-             'paging_enabled', 'transition')
+             'paging_enabled', 'transition', 'cache_limit', 'cache_budget',
+             'prefetch')
     def _update_proxy(self, change):
         """ An observer which sends the state change to the proxy.
 
@@ -181,3 +181,42 @@ def parse_stats(output):
 
 
 
+
+
+@pytest.mark.parametrize("impl, fast", [
+    ('AsyncioEventLoop', False),
+    ('TornadoEventLoop', False),
+    ('BuiltinEventLoop', False),
+    ('BuiltinEventLoop', True),
+])
+def test_loop_throughput(impl, fast):
+    """ Compares how many deferred calls per second each event loop
+    can run. This does not need a device.
+    
+    """
+    from enamlnative.core import loop as loops
+    EventLoop = getattr(loops, impl)
+    if not EventLoop.available():
+        pytest.skip("{} is not available".format(impl))
+    kwargs = {'fast': fast} if impl == 'BuiltinEventLoop' else {}
+    loop = EventLoop(**kwargs)
+
+    n = 100000
+    count = [0]
+
+    def callback(i):
+        count[0] += 1
+        if count[0] == n:
+            loop.stop()
+
+    start = time.time()
+    for i in range(n):
+        loop.deferred_call(callback, i)
+    loop.start()
+    dt = time.time()-start
+    assert count[0] == n
+
+    name = "{}{}".format(impl, " (fast)" if fast else "")
+    rate = int(n/dt)
+    config['stats'][name] = {'time': dt, 'tasks': n, 'rate': rate}
+    print("{}: {} callbacks/sec".format(name, rate))
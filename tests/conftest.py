@@ -0,0 +1,110 @@
+"""
+Copyright (c) 2018, Jairus Martin.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+@author jrm
+
+"""
+import sys
+import functools
+import pytest
+from atom.api import List
+
+sys.path.append('src')
+
+from enamlnative.core import http, http_queue
+
+
+class MockFuture(object):
+    """ A future that runs callbacks as soon as the result is set """
+    def __init__(self):
+        self.callbacks = []
+        self.result = None
+
+    def then(self, callback):
+        self.callbacks.append(callback)
+        return self
+
+    def set_result(self, result):
+        self.result = result
+        for callback in self.callbacks:
+            callback(result)
+
+
+class MockApplication(object):
+    """ Stands in for the BridgedApplication. Timed and deferred calls are
+    recorded so tests can run them when needed.
+
+    """
+    #: Calls scheduled with timed_call as (ms, callback)
+    timers = []
+
+    #: Calls scheduled with deferred_call
+    deferred = []
+
+    @classmethod
+    def instance(cls):
+        return cls
+
+    @classmethod
+    def reset(cls):
+        del cls.timers[:]
+        del cls.deferred[:]
+
+    @classmethod
+    def create_future(cls):
+        return MockFuture()
+
+    @classmethod
+    def timed_call(cls, ms, callback, *args):
+        cls.timers.append((ms, functools.partial(callback, *args)))
+
+    @classmethod
+    def deferred_call(cls, callback, *args):
+        cls.deferred.append(functools.partial(callback, *args))
+
+    @classmethod
+    def send_event(cls, *args, **kwargs):
+        pass
+
+
+class MockRequest(http.HttpRequest):
+    def init_request(self):
+        pass
+
+
+class MockHttpClient(http.AbstractAsyncHttpClient):
+    """ A client that records the requests sent so tests can complete
+    them with `respond`.
+
+    """
+    #: Requests sent
+    sent = List()
+
+    def _default_request_factory(self):
+        return MockRequest
+
+    def _fetch(self, request):
+        self.sent.append(request)
+
+    def respond(self, code=200, body='', headers=None, request=None):
+        """ Complete the given request or the last one sent """
+        if request is None:
+            request = self.sent[-1]
+        response = request.response
+        response.code = code
+        response.ok = 0 < code < 400
+        response.body = body
+        response.headers = headers or {}
+        request.callback(response)
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(http, 'BridgedApplication', MockApplication)
+    monkeypatch.setattr(http_queue, 'BridgedApplication', MockApplication)
+    MockApplication.reset()
+    return MockApplication
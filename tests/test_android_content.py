@@ -0,0 +1,150 @@
+"""
+Copyright (c) 2018, Jairus Martin.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+@author jrm
+
+"""
+import sys
+import pytest
+from atom.api import Value
+
+sys.path.append('src')
+
+from conftest import MockApplication
+from enamlnative.core import bridge
+from enamlnative.core.bridge import BridgeFuture, Command
+from enamlnative.android import app as android_app
+from enamlnative.android import android_content
+from enamlnative.android.android_content import SystemService
+
+
+class MockLoop(object):
+    future = BridgeFuture
+
+
+class ServiceApplication(MockApplication):
+    """ Records the events sent and the services requested """
+    loop = MockLoop()
+
+    #: Events sent
+    events = []
+
+    #: Futures of each service requested by type
+    services = {}
+
+    @classmethod
+    def reset(cls):
+        super(ServiceApplication, cls).reset()
+        del cls.events[:]
+        cls.services.clear()
+
+    @classmethod
+    def create_future(cls):
+        return BridgeFuture()
+
+    @classmethod
+    def add_done_callback(cls, future, callback):
+        future.then(callback)
+
+    @classmethod
+    def send_event(cls, *args, **kwargs):
+        cls.events.append(args[0])
+
+    @classmethod
+    def get_system_service(cls, service):
+        f = cls.services[service] = BridgeFuture()
+        cls.send_event(service)
+        return f
+
+    @classmethod
+    def resolve(cls, service):
+        cls.services[service].set_result(None)
+
+
+class MockService(SystemService):
+    __app__ = Value(ServiceApplication)
+    SERVICE_TYPE = 'a'
+
+
+class OtherService(MockService):
+    SERVICE_TYPE = 'b'
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(android_app, 'AndroidApplication', ServiceApplication)
+    monkeypatch.setattr(bridge, 'get_app_class', lambda: ServiceApplication)
+    monkeypatch.setattr(android_content, 'SERVICES', {})
+    monkeypatch.setattr(android_content, 'RESOLVED', set())
+    for cls in (MockService, OtherService):
+        monkeypatch.setattr(cls, '_instance', None)
+    ServiceApplication.reset()
+    return ServiceApplication
+
+
+def test_service_get(app):
+    results = []
+    f = MockService.get()
+    f.then(results.append)
+
+    #: The service is only requested once
+    assert MockService.get() is f
+    assert list(app.services) == ['a']
+
+    #: And only available once acquired
+    m = MockService.reference()
+    assert MockService.instance() is None
+    app.resolve('a')
+    assert results == [m]
+    assert MockService.instance() is m
+    assert MockService.get() is f
+    assert list(app.services) == ['a']
+
+
+def test_service_ready(app):
+    #: Waiting for a service does not request it
+    results = []
+    MockService.ready().then(results.append)
+    assert not app.services
+
+    m = MockService.reference()
+    assert not results
+    app.resolve('a')
+    assert results == [m]
+
+    #: Each service has it's own future
+    assert OtherService.ready() is not MockService.ready()
+
+
+def test_service_instance_callback(app):
+    #: The instance is available in callbacks of the future
+    instances = []
+    MockService.get().then(lambda m: instances.append(MockService.instance()))
+    app.resolve('a')
+    assert instances == [MockService.instance()]
+    assert instances[0] is not None
+
+
+def test_service_prewarm(app):
+    MockService.get()
+    results = []
+    SystemService.prewarm(MockService, OtherService).then(results.append)
+
+    #: Only services not requested yet are sent in a batch
+    assert app.events[1:] == [Command.BATCH_START, 'b', Command.BATCH_END]
+    app.resolve('b')
+    assert not results
+    app.resolve('a')
+    assert results == [[MockService.instance(), OtherService.instance()]]
+    assert None not in results[0]
+
+    #: Services already acquired resolve immediately
+    results = []
+    SystemService.prewarm(OtherService).then(results.append)
+    assert results == [[OtherService.instance()]]
+    SystemService.prewarm().then(results.append)
+    assert results[-1] == []
@@ -0,0 +1,310 @@
+"""
+Copyright (c) 2018, Jairus Martin.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+@author jrm
+
+"""
+import sys
+import pytest
+from atom.api import Value
+
+sys.path.append('src')
+
+from conftest import MockApplication
+from enamlnative.core import bridge
+from enamlnative.core.bridge import (
+    BridgeFuture, BridgeObject, BridgeCallback, FUTURES, callback_slots
+)
+
+
+class MockLoop(object):
+    #: Error handler of the event loop
+    _handler = None
+
+
+def test_bridge_future_result():
+    f = BridgeFuture()
+    assert FUTURES[f.__id__] is f
+    assert not f.done()
+    with pytest.raises(RuntimeError):
+        f.result()
+
+    results = []
+    f.then(results.append)
+    f.set_result(1)
+    assert f.done()
+    assert f.result() == 1
+    assert f.exception() is None
+    assert results == [1]
+
+    #: Resolved futures are released and callbacks added later run inline
+    assert f.__id__ not in FUTURES
+    f.then(results.append)
+    assert results == [1, 1]
+
+
+def test_bridge_future_error():
+    f = BridgeFuture()
+    results, errors, done = [], [], []
+    f.then(results.append).catch(errors.append).add_done_callback(
+        done.append)
+    error = ValueError("failed")
+    f.set_exception(error)
+    assert results == []
+    assert errors == [error]
+    assert done == [f]
+    assert f.exception() is error
+    with pytest.raises(ValueError):
+        f.result()
+    assert f.__id__ not in FUTURES
+
+
+def test_bridge_future_resolved_once():
+    f = BridgeFuture()
+    f.set_result(1)
+    with pytest.raises(RuntimeError):
+        f.set_result(2)
+
+
+def test_bridge_future_callback_error():
+    loop = MockLoop()
+    errors = []
+    loop._handler = errors.append
+
+    def callback(result):
+        raise ValueError(result)
+
+    f = BridgeFuture(loop)
+    f.then(callback)
+    f.set_result(1)
+    assert errors == [callback]
+
+    #: Without a handler the error is raised
+    f = BridgeFuture()
+    f.then(callback)
+    with pytest.raises(ValueError):
+        f.set_result(1)
+
+
+def test_bridge_future_await():
+    f = BridgeFuture()
+    it = f.__await__()
+
+    #: The future is yielded to the asyncio task until it's done
+    assert next(it) is f
+    assert f._asyncio_future_blocking
+    f.set_result('done')
+    with pytest.raises(StopIteration) as e:
+        next(it)
+    assert e.value.args[0] == 'done'
+
+
+def test_bridge_future_handler():
+    f = BridgeFuture()
+    assert bridge.get_handler(f.__id__, 'set_result') == (f, f.set_result)
+    f.set_result(None)
+    with pytest.raises(bridge.BridgeReferenceError):
+        bridge.get_handler(f.__id__, 'set_result')
+
+
+class Base(BridgeObject):
+    __app__ = Value(MockApplication)
+
+    onA = BridgeCallback()
+    onB = BridgeCallback()
+
+    def _impl_onB(self):
+        return 'default'
+
+
+class Left(Base):
+    onC = BridgeCallback()
+
+
+class Right(Base):
+    onB = BridgeCallback()
+    onD = BridgeCallback()
+    onE = BridgeCallback()
+
+
+class Both(Left, Right):
+    onF = BridgeCallback()
+
+
+def create(cls):
+    return cls(__id__=bridge.generate_id())
+
+
+def check_slots(cls):
+    callbacks, defaults = callback_slots(cls)
+    for i, callback in enumerate(callbacks):
+        assert callback.__slot_index__ == i
+        assert getattr(cls, callback.name) is callback
+    return [c.name for c in callbacks]
+
+
+def test_callback_slots():
+    assert check_slots(Base) == ['onA', 'onB']
+    assert check_slots(Left) == ['onA', 'onB', 'onC']
+
+    #: Overrides reuse the index of the base
+    assert check_slots(Right) == ['onA', 'onB', 'onD', 'onE']
+    assert Right.onB is not Base.onB
+
+
+def test_callback_slots_multiple_bases():
+    #: Callbacks of every base are merged in MRO order
+    assert check_slots(Both) == ['onA', 'onB', 'onC', 'onD', 'onE', 'onF']
+    assert Both.onB is Right.onB
+    assert callback_slots(Both)[1][1] is Base._impl_onB
+
+    results = []
+    both, right = create(Both), create(Right)
+    for name in ('onA', 'onB', 'onC', 'onD', 'onE', 'onF'):
+        getattr(both, name).connect(lambda name=name: results.append(name))
+    for name in ('onA', 'onB', 'onC', 'onD', 'onE', 'onF'):
+        getattr(both, name)()
+    assert results == ['onA', 'onB', 'onC', 'onD', 'onE', 'onF']
+
+    #: The base class still uses it's own indices
+    right.onD.connect(lambda: 'right')
+    assert right.onD() == 'right'
+    assert right.onE() is None
+
+
+def test_callback_default():
+    obj = create(Left)
+    assert obj.onB() == 'default'
+    obj.onB.connect(lambda: 'connected')
+    assert obj.onB() == 'connected'
+    obj.onB.disconnect(None)
+    assert obj.onB() == 'default'
+
+
+def test_callback_weak():
+    class Handler(object):
+        def on_a(self):
+            return 'handled'
+
+    obj = create(Left)
+    handler = Handler()
+    obj.onA.connect(handler.on_a, weak=True)
+    assert obj.onA() == 'handled'
+    del handler
+    assert obj.onA() is None
+
+
+class MockMethod(object):
+    """ Stands in for a BridgeMethod with a result cache """
+    name = 'getValue'
+
+    def __init__(self, scope):
+        self.__cachescope__ = scope
+        self.__results__ = {}
+        self.calls = []
+
+    def invoke(self, obj, *args, **kwargs):
+        self.calls.append(args)
+        return BridgeFuture()
+
+
+class CacheApplication(MockApplication):
+    @classmethod
+    def create_bridge_future(cls):
+        return BridgeFuture()
+
+
+@pytest.fixture
+def results(tmpdir, monkeypatch):
+    monkeypatch.setenv('TMP', str(tmpdir))
+    monkeypatch.setattr(bridge, 'PERSISTENT_RESULTS', None)
+    monkeypatch.setattr(bridge, 'get_app_class', lambda: CacheApplication)
+    errors = []
+    monkeypatch.setattr(bridge, 'log_error', lambda cb, e: errors.append(e))
+    return errors
+
+
+def test_cached_call(results):
+    method = MockMethod('process')
+    assert not bridge.is_cached(method, None, 'Owner', (1,))
+    f = bridge.cached_call(method, None, 'Owner', (1,), {})
+    assert bridge.is_cached(method, None, 'Owner', (1,))
+    assert bridge.cached_call(method, None, 'Owner', (1,), {}) is f
+    assert method.calls == [(1,)]
+
+    #: Other args and refreshes invoke the method
+    assert bridge.cached_call(method, None, 'Owner', (2,), {}) is not f
+    g = bridge.cached_call(method, None, 'Owner', (1,), {}, refresh=True)
+    assert g is not f
+    assert method.calls == [(1,), (2,), (1,)]
+
+    #: Failed results are not kept
+    g.set_exception(ValueError())
+    assert not bridge.is_cached(method, None, 'Owner', (1,))
+
+    #: Calls with unhashable args are not cached
+    bridge.cached_call(method, None, 'Owner', ([1],), {})
+    assert not bridge.is_cached(method, None, 'Owner', ([1],))
+
+
+def test_cached_call_object(results):
+    method = MockMethod('object')
+    a, b = create(Left), create(Left)
+    f = bridge.cached_call(method, a, 'Owner', (1,), {})
+    assert bridge.is_cached(method, a, 'Owner', (1,))
+    assert not bridge.is_cached(method, b, 'Owner', (1,))
+    assert bridge.cached_call(method, b, 'Owner', (1,), {}) is not f
+    assert len(method.calls) == 2
+
+
+def test_cached_call_persistent(results):
+    method = MockMethod('persistent')
+    f = bridge.cached_call(method, None, 'Owner', (1,), {})
+    f.set_result('saved')
+    assert bridge.PERSISTENT_RESULTS == {'Owner.getValue(1,)': 'saved'}
+    with open(bridge.persistent_results_path()) as fp:
+        assert 'saved' in fp.read()
+
+    #: The next time the app runs the result is loaded from disk
+    bridge.PERSISTENT_RESULTS = None
+    method = MockMethod('persistent')
+    assert bridge.is_cached(method, None, 'Owner', (1,))
+    f = bridge.cached_call(method, None, 'Owner', (1,), {})
+    assert f.result() == 'saved'
+    assert method.calls == []
+
+    bridge.clear_persistent_results()
+    bridge.PERSISTENT_RESULTS = None
+    assert not bridge.is_cached(MockMethod('persistent'), None, 'Owner',
+                                (1,))
+
+
+def test_cached_call_persistent_error(results):
+    method = MockMethod('persistent')
+    f = bridge.cached_call(method, None, 'Owner', (1,), {})
+
+    #: Results that can't be saved are reported and not persisted
+    f.set_result(object())
+    assert len(results) == 1
+    assert bridge.PERSISTENT_RESULTS == {}
+
+
+def test_log_error(monkeypatch):
+    errors = []
+
+    class ErrorLoop(object):
+        def log_error(self, callback, error=None):
+            errors.append((callback, error))
+
+    class ErrorApplication(MockApplication):
+        loop = ErrorLoop()
+
+    #: Errors are reported to the app's event loop
+    monkeypatch.setattr(bridge, 'get_app_class', lambda: ErrorApplication)
+    error = ValueError()
+    bridge.log_error(test_log_error, error)
+    assert errors == [(test_log_error, error)]
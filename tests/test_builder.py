@@ -0,0 +1,172 @@
+"""
+Copyright (c) 2018, Jairus Martin.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+@author jrm
+
+"""
+import sys
+import pytest
+from atom.api import List
+from enaml.widgets.toolkit_object import ToolkitObject, ProxyToolkitObject
+
+sys.path.append('src')
+
+from conftest import MockFuture
+from enamlnative.core.builder import ChunkedBuilder
+
+
+#: Events in the order they occurred
+EVENTS = []
+
+
+class MockProxy(ProxyToolkitObject):
+    #: Children added after the proxy was active
+    added = List()
+
+    widget = property(lambda self: self.declaration.name)
+
+    def activate_top_down(self):
+        EVENTS.append(('top_down', self.declaration.name))
+
+    def child_added(self, child):
+        self.added.append(child.declaration.name)
+
+
+class Node(ToolkitObject):
+    def activated(self):
+        #: Record the nodes below this one that are not active yet
+        inactive = [n.name for n in self.traverse()
+                    if not n.proxy_is_active]
+        EVENTS.append(('activated', self.name, inactive))
+
+
+def make_tree(spec, name='root'):
+    """ Build a tree from nested lists of child specs """
+    node = Node(name=name)
+    node.proxy = MockProxy(declaration=node)
+    for i, child in enumerate(spec):
+        make_tree(child, '{}.{}'.format(name, i)).set_parent(node)
+    return node
+
+
+class MockApplication(object):
+    def __init__(self):
+        self.deferred = []
+        self.flushes = 0
+
+    def create_future(self):
+        return MockFuture()
+
+    def deferred_call(self, callback, *args):
+        self.deferred.append(callback)
+
+    def force_update(self):
+        self.flushes += 1
+
+    def run(self):
+        """ Run deferred calls until there are none left and return the
+        number of chunks that were run.
+
+        """
+        chunks = 0
+        while self.deferred:
+            self.deferred.pop(0)()
+            chunks += 1
+        return chunks
+
+
+@pytest.fixture
+def app():
+    del EVENTS[:]
+    return MockApplication()
+
+
+def activated(name):
+    for event in EVENTS:
+        if event[:2] == ('activated', name):
+            return event[2]
+
+
+def test_builder(app):
+    view = make_tree([[[], []], [[]], []])
+    b = ChunkedBuilder(app=app, view=view, budget=1000, depth=2)
+    assert b.start() == 'root'
+
+    #: Only the root is active until the next iteration
+    assert view.proxy_is_active
+    assert not any(n.proxy_is_active for n in view.children)
+    assert b.done.result is None
+
+    app.run()
+    assert b.done.result is view
+    assert all(n.proxy_is_active for n in view.traverse())
+    assert view.proxy.added == ['root.0', 'root.1', 'root.2']
+    assert view.children[0].proxy.added == ['root.0.0', 'root.0.1']
+
+    #: Nodes are activated depth first in order
+    order = [e[1] for e in EVENTS if e[0] == 'top_down']
+    assert order == ['root', 'root.0', 'root.0.0', 'root.0.1', 'root.1',
+                     'root.1.0', 'root.2']
+
+
+def test_builder_activated_order(app):
+    view = make_tree([[[], []], [[]]])
+    b = ChunkedBuilder(app=app, view=view, budget=0, depth=2)
+    b.start()
+    assert activated('root') is None
+    app.run()
+
+    #: Each node is activated once after every node below it is active
+    names = [n.name for n in view.traverse()]
+    for name in names:
+        assert activated(name) == []
+    order = [e[1] for e in EVENTS if e[0] == 'activated']
+    assert sorted(order) == sorted(names)
+    assert order.index('root.0') > order.index('root.0.1')
+    assert order[-1] == 'root'
+
+
+def test_builder_budget(app):
+    view = make_tree([[] for i in range(10)])
+
+    #: With no budget each chunk activates a single node and flushes
+    b = ChunkedBuilder(app=app, view=view, budget=0)
+    b.start()
+    assert app.run() == 10
+    assert app.flushes == 10
+    assert b.done.result is view
+
+    del EVENTS[:]
+    app = MockApplication()
+    view = make_tree([[] for i in range(10)])
+    b = ChunkedBuilder(app=app, view=view, budget=1000)
+    b.start()
+    assert app.run() == 1
+    assert b.done.result is view
+
+
+def test_builder_removed_child(app):
+    view = make_tree([[], [[]], []])
+    b = ChunkedBuilder(app=app, view=view, budget=0, depth=2)
+    b.start()
+
+    #: Children removed before they're built are skipped
+    removed = view.children[1]
+    removed.set_parent(None)
+    app.run()
+    assert not removed.proxy_is_active
+    assert view.proxy.added == ['root.0', 'root.2']
+    assert b.done.result is view
+    assert activated('root') == []
+
+
+def test_builder_leaf(app):
+    view = make_tree([])
+    b = ChunkedBuilder(app=app, view=view)
+    b.start()
+    assert b.done.result is view
+    assert not app.deferred
@@ -0,0 +1,199 @@
+"""
+Copyright (c) 2018, Jairus Martin.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+@author jrm
+
+"""
+import sys
+import pytest
+
+sys.path.append('src')
+
+from conftest import MockRequest, MockHttpClient
+from enamlnative.core.http import RetryPolicy
+
+
+def make_response(code, method='get', retries=0, headers=None, **kwargs):
+    request = MockRequest(url='http://x/a', method=method, retries=retries,
+                          **kwargs)
+    response = request.response
+    response.code = code
+    response.ok = 0 < code < 400
+    response.headers = headers or {}
+    return response
+
+
+def test_retry_backoff():
+    policy = RetryPolicy(backoff=0.5, max_backoff=3, jitter=0)
+    delays = [policy.get_delay(make_response(503, retries=i))
+              for i in range(3)]
+    assert delays == [0.5, 1, 2]
+    policy.max_retries = 10
+    assert policy.get_delay(make_response(503, retries=5)) == 3
+
+    #: Jitter only shortens the delay
+    policy.jitter = 1
+    for i in range(20):
+        assert 0 <= policy.get_delay(make_response(503)) <= 0.5
+
+
+def test_retry_conditions():
+    policy = RetryPolicy(jitter=0)
+    assert policy.get_delay(make_response(503, retries=3)) is None
+    assert policy.get_delay(make_response(404)) is None
+    assert policy.get_delay(make_response(200)) is None
+
+    #: Only idempotent methods are retried
+    assert policy.get_delay(make_response(503, method='post')) is None
+    assert policy.get_delay(make_response(503, method='put')) is not None
+
+    #: Connection errors
+    assert policy.get_delay(make_response(0)) is not None
+    policy.retry_errors = False
+    assert policy.get_delay(make_response(0)) is None
+
+    #: Streamed bodies may have been partially handled
+    response = make_response(503, streaming_callback=lambda chunk: None)
+    assert policy.get_delay(response) is None
+
+
+def test_retry_after():
+    policy = RetryPolicy(jitter=0)
+    response = make_response(429, headers={'Retry-After': '10'})
+    assert policy.get_delay(response) == 10
+
+
+def test_retry_deadline():
+    policy = RetryPolicy(backoff=2, jitter=0, deadline=5)
+    assert policy.get_delay(make_response(503), elapsed=2) == 2
+    assert policy.get_delay(make_response(503), elapsed=4) is None
+
+
+def test_retry_stats():
+    policy = RetryPolicy()
+    policy.record(make_response(200))
+    policy.record(make_response(200, retries=1))
+    policy.record(make_response(503, retries=3))
+    assert policy.stats() == {'retries': 0, 'recovered': 1, 'exhausted': 1}
+
+
+@pytest.fixture
+def client(app):
+    return MockHttpClient(retry_policy=RetryPolicy(jitter=0))
+
+
+def test_client_retry(app, client):
+    f = client.fetch('http://x/a')
+    first = client.sent[0]
+    client.respond(503)
+    assert f.result is None
+
+    #: The retry is scheduled after the backoff and the future moves to it
+    ms, callback = app.timers.pop()
+    assert ms == 500
+    assert f.request is not first
+    assert f.request.retries == 1
+    assert client.requests == [f.request]
+    callback()
+    assert client.sent[-1] is f.request
+
+    client.respond(200, body='ok')
+    assert f.result.body == 'ok'
+    assert client.requests == []
+    assert client.retry_policy.stats() == {
+        'retries': 1, 'recovered': 1, 'exhausted': 0}
+
+
+def test_client_retry_exhausted(app, client):
+    client.retry_policy.max_retries = 1
+    f = client.fetch('http://x/a')
+    client.respond(503)
+    app.timers.pop()[1]()
+    client.respond(503)
+    assert f.result.code == 503
+    assert not app.timers
+    assert client.retry_policy.exhausted == 1
+
+
+def test_client_no_retry_post(app, client):
+    f = client.fetch('http://x/a', method='post', body='x')
+    client.respond(503)
+    assert f.result.code == 503
+    assert not app.timers
+
+
+def test_client_retry_policy_per_fetch(app, client):
+    f = client.fetch('http://x/a', retry_policy=None)
+    client.respond(503)
+    assert f.result.code == 503
+
+
+def test_coalesce(app):
+    client = MockHttpClient()
+    a = client.fetch('http://x/a')
+    b = client.fetch('http://x/a')
+    assert len(client.sent) == 1
+    assert a.request is b.request
+    assert len(client.futures[a.request]) == 2
+
+    #: Requests that differ are sent separately
+    client.fetch('http://x/a', headers={'Accept': 'text/html'})
+    client.fetch('http://x/a', binary=True)
+    client.fetch('http://x/a', method='post', body='x')
+    assert len(client.sent) == 4
+
+    client.respond(200, body='ok', request=client.sent[0])
+    assert a.result is b.result
+    assert a.result.body == 'ok'
+
+    #: Once complete a new request is sent
+    client.fetch('http://x/a')
+    assert len(client.sent) == 5
+
+
+def test_coalesce_disabled(app):
+    client = MockHttpClient(coalesce=False)
+    client.fetch('http://x/a')
+    client.fetch('http://x/a')
+    assert len(client.sent) == 2
+
+
+def test_max_requests(app):
+    client = MockHttpClient(max_requests=2)
+    for i in range(3):
+        client.fetch('http://x/{}'.format(i))
+    client.fetch('http://x/late', priority=1)
+    client.fetch('http://x/urgent', priority=-1)
+    assert [r.url for r in client.sent] == ['http://x/0', 'http://x/1']
+    assert len(client.queue) == 3
+    assert len(client.requests) == 5
+
+    #: Queued requests are sent by priority and then in order as slots free
+    client.respond(request=client.sent[0])
+    assert client.sent[-1].url == 'http://x/urgent'
+    client.respond(request=client.sent[1])
+    assert client.sent[-1].url == 'http://x/2'
+    client.respond(request=client.sent[2])
+    assert client.sent[-1].url == 'http://x/late'
+    assert client.active == 2
+    assert not client.queue
+
+
+def test_max_requests_per_host(app):
+    client = MockHttpClient(max_requests_per_host=1)
+    client.fetch('http://x/a')
+    client.fetch('http://x/b')
+    client.fetch('http://y/a')
+    assert [r.url for r in client.sent] == ['http://x/a', 'http://y/a']
+    assert client.active_hosts == {'x': 1, 'y': 1}
+
+    client.respond(request=client.sent[0])
+    assert client.sent[-1].url == 'http://x/b'
+    client.respond(request=client.sent[1])
+    client.respond(request=client.sent[2])
+    assert client.active == 0
+    assert client.active_hosts == {}
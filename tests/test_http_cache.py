@@ -0,0 +1,188 @@
+"""
+Copyright (c) 2018, Jairus Martin.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+@author jrm
+
+"""
+import sys
+import time
+import pytest
+
+sys.path.append('src')
+
+from conftest import MockHttpClient
+from enamlnative.core.http_cache import (
+    HttpCacheEntry, MemoryHttpCache, DiskHttpCache, LayeredHttpCache,
+    parse_cache_control
+)
+
+
+@pytest.fixture
+def client(app):
+    return MockHttpClient(cache=MemoryHttpCache())
+
+
+def test_parse_cache_control():
+    cc = parse_cache_control('no-cache, Max-Age="60", ,private')
+    assert cc == {'no-cache': True, 'max-age': '60', 'private': True}
+
+
+def test_fresh_hit(client):
+    f = client.fetch('http://x/a')
+    client.respond(body='hello', headers={'Cache-Control': 'max-age=60',
+                                          'ETag': '"v1"'})
+    assert f.result.body == 'hello'
+    assert not f.result.cached
+
+    f = client.fetch('http://x/a')
+    assert len(client.sent) == 1
+    assert f.result.cached
+    assert f.result.body == 'hello'
+
+
+def test_no_store(client):
+    client.fetch('http://x/a')
+    client.respond(body='hello', headers={'Cache-Control': 'no-store'})
+    assert client.cache.get('http://x/a') is None
+    client.fetch('http://x/a')
+    assert len(client.sent) == 2
+
+
+def test_no_cache_request(client):
+    client.fetch('http://x/a')
+    client.respond(body='hello', headers={'Cache-Control': 'max-age=60'})
+    client.fetch('http://x/a', headers={'Cache-Control': 'no-cache'})
+    assert len(client.sent) == 2
+
+
+def test_revalidate_not_modified(client):
+    client.fetch('http://x/a')
+    client.respond(body='hello', headers={'Cache-Control': 'max-age=60',
+                                          'ETag': '"v1"'})
+    client.cache.get('http://x/a').expires = 0
+
+    f = client.fetch('http://x/a')
+    assert len(client.sent) == 2
+    assert client.sent[-1].headers['If-None-Match'] == '"v1"'
+    client.respond(304, headers={'Cache-Control': 'max-age=60'})
+    assert f.result.code == 200
+    assert f.result.body == 'hello'
+    assert f.result.cached
+    assert client.cache.get('http://x/a').is_fresh()
+
+
+def test_revalidate_changed(client):
+    client.fetch('http://x/a')
+    client.respond(body='hello', headers={
+        'Cache-Control': 'max-age=60', 'ETag': '"v1"'})
+    client.cache.get('http://x/a').expires = 0
+
+    f = client.fetch('http://x/a')
+    client.respond(body='changed', headers={
+        'Cache-Control': 'max-age=60', 'ETag': '"v2"'})
+    assert f.result.body == 'changed'
+    assert not f.result.cached
+
+    #: The changed response replaces the entry
+    entry = client.cache.get('http://x/a')
+    assert entry.body == 'changed'
+    assert entry.etag == '"v2"'
+    f = client.fetch('http://x/a')
+    assert len(client.sent) == 2
+    assert f.result.body == 'changed'
+
+
+def test_user_conditional_request(client):
+    client.fetch('http://x/a', headers={'If-None-Match': '"v1"'})
+    client.respond(body='hello', headers={'Cache-Control': 'max-age=60'})
+    assert client.cache.get('http://x/a') is None
+
+
+def test_unsafe_method_invalidates(client):
+    client.fetch('http://x/a')
+    client.respond(body='hello', headers={'Cache-Control': 'max-age=60'})
+    client.fetch('http://x/a', method='post', body='x')
+    client.respond()
+    assert client.cache.get('http://x/a') is None
+
+
+def test_vary(client):
+    client.fetch('http://x/a', headers={'Accept': 'text/html'})
+    client.respond(body='html', headers={'Cache-Control': 'max-age=60',
+                                         'Vary': 'Accept'})
+    f = client.fetch('http://x/a', headers={'Accept': 'text/html'})
+    assert f.result.cached
+    client.fetch('http://x/a', headers={'Accept': 'application/json'})
+    assert len(client.sent) == 2
+
+
+def test_entry_expiry():
+    now = time.time()
+    entry = HttpCacheEntry()
+    entry.update({'Cache-Control': 'max-age=60', 'Age': '10'}, now)
+    assert entry.expires == now + 50
+    assert entry.is_fresh(now)
+    assert not entry.is_fresh(now + 51)
+    entry.update({'Cache-Control': 'no-cache'}, now)
+    assert not entry.is_fresh(now)
+
+
+def test_memory_cache_lru():
+    cache = MemoryHttpCache(max_entries=2)
+    for key in 'abc':
+        cache.set(key, HttpCacheEntry(url=key, body=key))
+        cache.get('a')
+    assert cache.get('a') is not None
+    assert cache.get('b') is None
+    assert cache.get('c') is not None
+    assert cache.size == 2
+
+
+def test_disk_cache(tmpdir):
+    path = str(tmpdir)
+    cache = DiskHttpCache(path=path)
+    cache.set('a', HttpCacheEntry(url='a', body=b'\x00\x01', etag='"v1"'))
+    cache.set('b', HttpCacheEntry(url='b', body='text'))
+
+    #: Entries are loaded from the directory by a new cache
+    cache = DiskHttpCache(path=path)
+    entry = cache.get('a')
+    assert entry.body == b'\x00\x01'
+    assert entry.etag == '"v1"'
+    assert cache.get('b').body == 'text'
+    cache.remove('a')
+    assert cache.get('a') is None
+    assert DiskHttpCache(path=path).get('a') is None
+
+
+def test_layered_cache(tmpdir):
+    cache = LayeredHttpCache(disk=DiskHttpCache(path=str(tmpdir)))
+    cache.set('a', HttpCacheEntry(url='a', body='hello'))
+    cache.memory.clear()
+    assert cache.get('a').body == 'hello'
+    assert 'a' in cache.memory.entries
+
+
+def test_binary_cached_separately(client):
+    client.fetch('http://x/a')
+    client.respond(body='hello', headers={'Cache-Control': 'max-age=60'})
+
+    #: A binary request does not get the text body
+    f = client.fetch('http://x/a', binary=True)
+    assert len(client.sent) == 2
+    client.respond(body=b'hello', headers={'Cache-Control': 'max-age=60'})
+    assert f.result.body == b'hello'
+
+    assert client.fetch('http://x/a', binary=True).result.body == b'hello'
+    assert client.fetch('http://x/a').result.body == 'hello'
+    assert len(client.sent) == 2
+
+    #: Both are invalidated by an unsafe method
+    client.fetch('http://x/a', method='post', body='x')
+    client.respond()
+    assert client.cache.get(client.cache_key('http://x/a')) is None
+    assert client.cache.get(client.cache_key('http://x/a', True)) is None
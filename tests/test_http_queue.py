@@ -0,0 +1,201 @@
+"""
+Copyright (c) 2018, Jairus Martin.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+@author jrm
+
+"""
+import sys
+import pytest
+from atom.api import List
+
+sys.path.append('src')
+
+from conftest import MockFuture
+from enamlnative.core import http
+from enamlnative.core.http_queue import (
+    HttpRequestQueue, QueuedRequest, MemoryRequestStore, FileRequestStore
+)
+
+
+class MockResponse(object):
+    def __init__(self, code):
+        self.code = code
+        self.ok = 0 < code < 400
+        self.reason = ''
+
+
+class MockClient(http.AbstractAsyncHttpClient):
+    #: Requests sent as (url, kwargs, future)
+    sent = List()
+
+    def fetch(self, url, callback=None, raise_error=True, **kwargs):
+        f = MockFuture()
+        self.sent.append((url, kwargs, f))
+        return f
+
+    def respond(self, i, code):
+        self.sent[i][2].set_result(MockResponse(code))
+
+
+@pytest.fixture
+def path(tmpdir):
+    return str(tmpdir.join('requests.log'))
+
+
+def test_request_to_dict():
+    r = QueuedRequest(id='1', url='u', kwargs={'body': b'\x00\x01'},
+                      created=1.0, attempts=2, error=u'timeout')
+    state = r.to_dict()
+    r2 = QueuedRequest.from_dict(state)
+    assert r2.kwargs['body'] == b'\x00\x01'
+    assert (r2.id, r2.url, r2.created, r2.attempts, r2.error) == \
+        ('1', 'u', 1.0, 2, u'timeout')
+
+
+@pytest.mark.parametrize('store_factory', [
+    lambda path: MemoryRequestStore(),
+    lambda path: FileRequestStore(path=path)
+])
+def test_request_store(store_factory, path):
+    store = store_factory(path)
+    requests = [QueuedRequest(id=str(i), url='u{}'.format(i))
+                for i in range(3)]
+    for r in requests:
+        store.add(r)
+    requests[1].attempts = 1
+    store.update(requests[1])
+    store.remove(requests[0])
+    assert [r.id for r in store.load()] == ['1', '2']
+    assert store.load()[0].attempts == 1
+    store.clear()
+    assert store.load() == []
+
+
+def test_file_store_replay(path):
+    store = FileRequestStore(path=path)
+    requests = [QueuedRequest(id=str(i), url='u{}'.format(i),
+                              kwargs={'method': 'post'})
+                for i in range(3)]
+    for r in requests:
+        store.add(r)
+    requests[2].attempts = 3
+    store.update(requests[2])
+    store.remove(requests[1])
+
+    #: The journal is replayed by a store opened after a restart
+    store = FileRequestStore(path=path)
+    loaded = store.load()
+    assert [r.id for r in loaded] == ['0', '2']
+    assert loaded[1].attempts == 3
+    assert loaded[1].kwargs == {'method': 'post'}
+
+
+def test_file_store_partial_record(path):
+    store = FileRequestStore(path=path)
+    store.add(QueuedRequest(id='0', url='u'))
+    with open(path, 'a') as f:
+        f.write('{"op": "add", "requ')
+    assert [r.id for r in FileRequestStore(path=path).load()] == ['0']
+
+
+def test_file_store_compact(path):
+    store = FileRequestStore(path=path, compact_threshold=4)
+    requests = [QueuedRequest(id=str(i), url='u') for i in range(6)]
+    for r in requests:
+        store.add(r)
+    for r in requests[:5]:
+        store.remove(r)
+    with open(path) as f:
+        assert len(f.readlines()) < 6
+    assert [r.id for r in FileRequestStore(path=path).load()] == ['5']
+
+
+def test_queue_requires_client(app):
+    queue = HttpRequestQueue(store=MemoryRequestStore())
+    with pytest.raises(RuntimeError):
+        queue.fetch('u', method='post')
+
+
+def test_queue_send(app):
+    client = MockClient()
+    queue = HttpRequestQueue(client=client, store=MemoryRequestStore())
+    f = queue.fetch('u', method='post', data={'a': 1})
+    assert len(client.sent) == 1
+    url, kwargs, _ = client.sent[0]
+    assert kwargs['data'] == {'a': 1}
+    assert queue.idempotency_header in kwargs['headers']
+    client.respond(0, 200)
+    assert f.result.code == 200
+    assert queue.depth == 0
+    assert queue.stats()['sent'] == 1
+    assert not queue.replaying
+
+
+def test_queue_offline(app):
+    client = MockClient()
+    queue = HttpRequestQueue(client=client, store=MemoryRequestStore())
+    f1 = queue.fetch('u1', method='post')
+    client.respond(0, 0)
+    assert not queue.online
+    assert queue.depth == 1
+    assert len(app.timers) == 1
+
+    #: Requests are queued without sending them while offline
+    f2 = queue.fetch('u2', method='post')
+    assert len(client.sent) == 1
+    assert queue.depth == 2
+
+    #: The timer sends them in order when back online
+    app.timers.pop()[1]()
+    assert [s[0] for s in client.sent[1:]] == ['u1', 'u2']
+    client.respond(1, 200)
+    client.respond(2, 400)
+    assert f1.result.code == 200
+    assert f2.result.code == 400
+    assert queue.depth == 0
+    stats = queue.stats()
+    assert (stats['sent'], stats['failed'], stats['dropped']) == (1, 1, 1)
+
+
+def test_queue_max_attempts(app):
+    client = MockClient()
+    dropped = []
+    queue = HttpRequestQueue(client=client, store=MemoryRequestStore(),
+                             max_attempts=2,
+                             on_dropped=lambda r, resp: dropped.append(r))
+    queue.fetch('u', method='post')
+    client.respond(0, 503)
+    assert queue.depth == 1
+    queue.resume()
+    client.respond(1, 503)
+    assert queue.depth == 0
+    assert [r.url for r in dropped] == ['u']
+
+
+def test_queue_restart(app, path):
+    client = MockClient()
+    queue = HttpRequestQueue(client=client, store=FileRequestStore(path=path))
+    queue.fetch('u1', method='post', body=b'\x00\x01')
+    client.respond(0, 0)
+
+    #: A queue created after a restart loads the requests from the journal
+    client = MockClient()
+    queue = HttpRequestQueue(client=client, store=FileRequestStore(path=path))
+    assert queue.depth == 1
+    request = list(queue.pending.values())[0]
+    assert request.attempts == 1
+    queue.replay()
+    assert client.sent[0][1]['body'] == b'\x00\x01'
+    client.respond(0, 200)
+    assert queue.depth == 0
+    assert FileRequestStore(path=path).load() == []
+
+
+def test_queue_rejects_callables(app):
+    queue = HttpRequestQueue(client=MockClient(), store=MemoryRequestStore())
+    with pytest.raises(ValueError):
+        queue.fetch('u', streaming_callback=lambda chunk: None)
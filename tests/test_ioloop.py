@@ -0,0 +1,198 @@
+"""
+Copyright (c) 2018, Jairus Martin.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+@author jrm
+
+"""
+import sys
+import heapq
+import random
+import pytest
+import itertools
+from atom.api import Int
+
+sys.path.append('src')
+
+from enamlnative.core.eventloop.ioloop import (
+    IOLoop, _TimerWheel, _WheelTimeout
+)
+from enamlnative.core.eventloop.platforms import EPollIOLoop
+
+
+class MockLoop(object):
+    _timeout_counter = itertools.count()
+
+
+def make_timeout(deadline):
+    return _WheelTimeout(deadline, lambda: None, MockLoop)
+
+
+class CountingTimerWheel(_TimerWheel):
+    #: Number of ticks visited
+    visits = Int()
+
+    def _next_tick(self, limit):
+        self.visits += 1
+        return super(CountingTimerWheel, self)._next_tick(limit)
+
+
+def test_timer_wheel_expire():
+    wheel = _TimerWheel(resolution=1, slots=4, levels=3)
+    a, b, c = make_timeout(2.5), make_timeout(1.5), make_timeout(9)
+    for t in (a, b, c):
+        wheel.add(t)
+    assert wheel.count == 3
+    assert wheel.advance(1.9) == []
+    assert wheel.advance(3) == [b, a]
+    assert wheel.advance(8.9) == []
+    assert wheel.advance(9) == [c]
+    assert wheel.count == 0
+
+
+def test_timer_wheel_cascade():
+    #: 4 slots * 3 levels covers 64 ticks so most timeouts move down levels
+    wheel = _TimerWheel(resolution=1, slots=4, levels=3)
+    timeouts = [make_timeout(d) for d in range(1, 64)]
+    for t in timeouts:
+        wheel.add(t)
+    for now in range(1, 64):
+        assert wheel.advance(now) == [timeouts[now-1]]
+    assert wheel.count == 0
+
+
+def test_timer_wheel_cancel():
+    wheel = _TimerWheel(resolution=1, slots=4, levels=3)
+    timeouts = [make_timeout(d) for d in range(1, 40)]
+    for t in timeouts:
+        wheel.add(t)
+    cancelled = timeouts[::3]
+    for t in cancelled:
+        wheel.remove(t)
+        wheel.remove(t)
+    assert wheel.count == len(timeouts) - len(cancelled)
+    due = wheel.advance(40)
+    assert due == [t for t in timeouts if t not in cancelled]
+    assert wheel.count == 0
+
+
+def test_timer_wheel_far_future():
+    #: Deadlines past the range of the wheel are moved down once in range
+    wheel = _TimerWheel(resolution=1, slots=4, levels=2)
+    far = make_timeout(100)
+    wheel.add(far)
+    for now in range(0, 100, 3):
+        assert wheel.advance(now) == []
+    assert wheel.advance(100) == [far]
+    assert wheel.count == 0
+
+
+def test_timer_wheel_skips_empty_ticks():
+    wheel = CountingTimerWheel(resolution=0.01)
+    t = make_timeout(40000)
+    wheel.add(t)
+    assert wheel.next_deadline() > 0.01
+    assert wheel.advance(39999) == []
+    assert wheel.advance(40000) == [t]
+
+    #: Only the ticks that move the timeout down a level are visited
+    #: instead of each of the 4 million ticks
+    assert wheel.visits < 20
+
+
+def test_timer_wheel_next_deadline():
+    wheel = _TimerWheel(resolution=1, slots=4, levels=3)
+    wheel.add(make_timeout(2))
+    assert wheel.next_deadline() == 2
+    wheel.add(make_timeout(30))
+    wheel.advance(2)
+    #: The next tick moves the second timeout down a level
+    assert 2 < wheel.next_deadline() <= 30
+
+
+def test_timer_wheel_matches_heap():
+    random.seed(1)
+    wheel = _TimerWheel(resolution=1, slots=8, levels=3)
+    heap = []
+    now = 0
+    for i in range(500):
+        for j in range(random.randint(0, 5)):
+            t = make_timeout(now + random.choice((
+                random.random()*10, random.random()*1000,
+                random.random()*10000)))
+            wheel.add(t)
+            heapq.heappush(heap, t)
+
+        #: With whole ticks the wheel expires the same timeouts as the heap
+        now += random.randint(1, 50)
+        expected = []
+        while heap and heap[0].deadline <= now:
+            expected.append(heapq.heappop(heap))
+        assert wheel.advance(now) == expected
+    assert wheel.count == len(heap)
+
+
+@pytest.fixture
+def loop():
+    loop = EPollIOLoop()
+    loop.initialize(make_current=False)
+    yield loop
+    loop._waker.close()
+    loop._impl.close()
+
+
+def test_priority_order(loop):
+    order = []
+    loop.add_priority_callback(IOLoop.PRIORITY_IDLE, order.append, 'idle')
+    loop.add_callback(order.append, 'normal')
+    loop.add_priority_callback(IOLoop.PRIORITY_FLUSH, order.append, 'flush')
+    loop.add_priority_callback(IOLoop.PRIORITY_INPUT, order.append, 'input')
+    loop.add_priority_callback(IOLoop.PRIORITY_IDLE, loop.stop)
+    loop.start()
+    assert order == ['input', 'flush', 'normal', 'idle']
+
+
+def test_input_runs_before_next_callback(loop):
+    order = []
+
+    def on_normal(i):
+        order.append(i)
+        if i == 0:
+            loop.add_priority_callback(IOLoop.PRIORITY_INPUT,
+                                       order.append, 'input')
+
+    for i in range(3):
+        loop.add_callback(on_normal, i)
+    loop.add_priority_callback(IOLoop.PRIORITY_IDLE, loop.stop)
+    loop.start()
+    assert order == [0, 'input', 1, 2]
+
+
+def test_idle_not_starved(loop):
+    iterations = []
+    idle = []
+
+    def busy():
+        #: Keep the loop busy so it never becomes idle
+        iterations.append(len(idle))
+        if len(iterations) == 100:
+            loop.stop()
+        else:
+            loop.add_callback(busy)
+
+    def on_idle():
+        idle.append(len(iterations))
+        loop.add_priority_callback(IOLoop.PRIORITY_IDLE, on_idle)
+
+    loop.add_callback(busy)
+    loop.add_priority_callback(IOLoop.PRIORITY_IDLE, on_idle)
+    loop.start()
+
+    #: One idle callback runs every idle_starvation_limit iterations
+    limit = loop.idle_starvation_limit
+    assert len(idle) >= 100 // limit - 1
+    for a, b in zip(idle, idle[1:]):
+        assert b - a <= limit
@@ -0,0 +1,59 @@
+"""
+Copyright (c) 2018, Jairus Martin.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+@author jrm
+
+"""
+import sys
+import time
+import threading
+import pytest
+
+sys.path.append('src')
+
+from enamlnative.core.loop import AsyncioEventLoop
+
+
+@pytest.fixture
+def asyncio_loop():
+    if not AsyncioEventLoop.available():
+        pytest.skip("asyncio is not available")
+    loop = AsyncioEventLoop()
+    started = threading.Event()
+    loop.loop.call_soon(started.set)
+    thread = threading.Thread(target=loop.start)
+    thread.start()
+    started.wait(1)
+    yield loop
+    loop.stop()
+    thread.join(1)
+    loop.loop.close()
+
+
+def test_asyncio_timed_call_from_thread(asyncio_loop):
+    called = []
+    asyncio_loop.timed_call(10, called.append, 'kept')
+
+    #: Timers started from another thread can be cancelled before the loop
+    #: creates them
+    handle = asyncio_loop.timed_call(10, called.append, 'before')
+    handle.cancel()
+    assert handle.cancelled()
+
+    #: And after
+    handle = asyncio_loop.timed_call(100, called.append, 'after')
+    for i in range(100):
+        if handle.handle is not None:
+            break
+        time.sleep(0.001)
+    handle.cancel()
+    assert handle.handle is not None
+
+    fired = threading.Event()
+    asyncio_loop.timed_call(150, fired.set)
+    assert fired.wait(1)
+    assert called == ['kept']
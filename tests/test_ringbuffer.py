@@ -0,0 +1,113 @@
+"""
+Copyright (c) 2018, Jairus Martin.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+@author jrm
+
+"""
+import sys
+import struct
+import pytest
+
+sys.path.append('src')
+
+from enamlnative.core.ringbuffer import RingBuffer, numpy
+
+
+@pytest.fixture(params=[False, True], ids=['array', 'numpy'])
+def use_numpy(request):
+    if request.param and numpy is None:
+        pytest.skip("numpy is not installed")
+    return request.param
+
+
+def values_of(values):
+    return [tuple(float(x) for x in v) for v in values]
+
+
+def test_extend(use_numpy):
+    buf = RingBuffer(capacity=4, dimensions=2, use_numpy=use_numpy)
+    buf.extend([1, 2], [(1, 10), (2, 20)])
+    assert len(buf) == 2
+    times, values = buf.get()
+    assert list(times) == [1, 2]
+    assert values_of(values) == [(1, 10), (2, 20)]
+
+    #: Flat values are split by the number of dimensions
+    buf.extend([3], [3, 30])
+    times, values = buf.get(2)
+    assert list(times) == [2, 3]
+    assert values_of(values) == [(2, 20), (3, 30)]
+
+
+def test_extend_wrap_around(use_numpy):
+    buf = RingBuffer(capacity=4, dimensions=2, use_numpy=use_numpy)
+    buf.extend([1, 2, 3], [(i, i*10) for i in (1, 2, 3)])
+
+    #: The samples are split between the end and the start of the buffer
+    buf.extend([4, 5, 6], [(i, i*10) for i in (4, 5, 6)])
+    assert buf.index == 2
+    assert buf.count == 6
+    assert len(buf) == 4
+    times, values = buf.get()
+    assert list(times) == [3, 4, 5, 6]
+    assert values_of(values) == [(i, i*10) for i in (3, 4, 5, 6)]
+    assert list(buf.get(3)[0]) == [4, 5, 6]
+
+
+def test_extend_over_capacity(use_numpy):
+    buf = RingBuffer(capacity=4, use_numpy=use_numpy)
+    buf.extend([0], [0])
+    buf.extend(list(range(1, 11)), list(range(1, 11)))
+
+    #: Only the last samples are kept but all of them are counted
+    assert buf.count == 11
+    times, values = buf.get()
+    assert list(times) == [7, 8, 9, 10]
+    assert values_of(values) == [(7,), (8,), (9,), (10,)]
+
+
+def test_extend_invalid():
+    buf = RingBuffer(capacity=4, dimensions=3, use_numpy=False)
+    with pytest.raises(ValueError):
+        buf.extend([1, 2], [1, 2, 3])
+
+
+def test_extend_bytes(use_numpy):
+    buf = RingBuffer(capacity=4, dimensions=3, use_numpy=use_numpy)
+    times = struct.pack('<2q', 1, 2)
+    values = struct.pack('<6f', 1, 2, 3, 4, 5, 6)
+    buf.extend_bytes(2, times, values)
+    times, values = buf.get()
+    assert list(times) == [1, 2]
+    assert values_of(values) == [(1, 2, 3), (4, 5, 6)]
+
+
+def test_stats(use_numpy):
+    buf = RingBuffer(capacity=8, dimensions=2, use_numpy=use_numpy)
+    assert buf.mean() is None
+    buf.extend([0, 10**9, 2*10**9, 3*10**9],
+               [(0, 3), (2, 4), (4, 3), (6, 4)])
+    assert list(buf.mean()) == [3, 3.5]
+    assert list(buf.min()) == [0, 3]
+    assert list(buf.max()) == [6, 4]
+    assert list(buf.std(2)) == [1, 0.5]
+    assert list(buf.magnitude(2)) == [5, pytest.approx(52**0.5)]
+    assert buf.rate() == 1.0
+
+
+def test_clear_and_reset(use_numpy):
+    buf = RingBuffer(capacity=4, use_numpy=use_numpy)
+    buf.extend([1, 2], [1, 2])
+    buf.clear()
+    assert len(buf) == 0
+    assert list(buf.get()[0]) == []
+    buf.extend([1, 2], [1, 2])
+
+    #: Changing the capacity reallocates the arrays
+    buf.capacity = 8
+    assert len(buf) == 0
+    assert len(buf.times) == 8
@@ -0,0 +1,184 @@
+"""
+Copyright (c) 2018, Jairus Martin.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+@author jrm
+
+"""
+import sys
+import json
+import struct
+import pytest
+
+sys.path.append('src')
+
+from enamlnative.core.track import (
+    Track, AccuracyFilter, DistanceFilter, KalmanFilter, distance
+)
+
+
+def fix(time, latitude, longitude, **kwargs):
+    kwargs.update({'time': time, 'latitude': latitude,
+                   'longitude': longitude})
+    return kwargs
+
+
+def make_track():
+    track = Track()
+    track.extend([
+        fix(1000, 45.0, -93.0, altitude=250.5, accuracy=4, speed=1.5,
+            bearing=90),
+        fix(2000, 45.0001, -93.0, altitude=251, accuracy=5),
+        fix(3000, 45.0002, -93.0001, altitude=252, accuracy=3.5),
+    ])
+    return track
+
+
+def test_distance():
+    #: One degree of latitude is about 111km
+    assert distance(45, -93, 46, -93) == pytest.approx(111195, rel=1e-3)
+    assert distance(45, -93, 45, -93) == 0
+
+
+def test_track_append():
+    track = make_track()
+    assert len(track) == 3
+    assert track[0] == fix(1000, 45.0, -93.0, altitude=250.5, accuracy=4,
+                           speed=1.5, bearing=90)
+
+    #: Missing fields default to 0
+    assert track[1]['speed'] == 0
+    assert [f['time'] for f in track] == [1000, 2000, 3000]
+    track.clear()
+    assert len(track) == 0
+
+
+def test_track_to_bytes():
+    track = make_track()
+    data = track.to_bytes()
+    assert data[:4] == Track.MAGIC
+    assert len(data) == Track.HEADER.size + 3*8*(1+len(Track.FIELDS))
+
+    loaded = Track.from_bytes(data)
+    assert len(loaded) == 3
+    assert list(loaded) == list(track)
+    assert loaded.to_bytes() == data
+
+    #: An empty track round trips too
+    assert len(Track.from_bytes(Track().to_bytes())) == 0
+
+
+def test_track_from_bytes_invalid():
+    data = make_track().to_bytes()
+    with pytest.raises(ValueError):
+        Track.from_bytes(b'XXXX' + data[4:])
+    with pytest.raises(ValueError):
+        Track.from_bytes(Track.HEADER.pack(Track.MAGIC, 99, 0))
+
+
+def test_track_save(tmpdir):
+    path = str(tmpdir.join('track.bin'))
+    track = make_track()
+    track.save(path)
+    assert list(Track.load(path)) == list(track)
+
+
+def test_track_decode():
+    times = struct.pack('<2q', 1000, 2000)
+    values = struct.pack('<12d', 45, -93, 250, 4, 1, 90,
+                         46, -94, 251, 5, 2, 180)
+    fixes = Track.decode(2, times, values)
+    assert fixes == [
+        fix(1000, 45, -93, altitude=250, accuracy=4, speed=1, bearing=90),
+        fix(2000, 46, -94, altitude=251, accuracy=5, speed=2, bearing=180),
+    ]
+
+
+def test_track_distance():
+    track = make_track()
+    expected = (distance(45.0, -93.0, 45.0001, -93.0) +
+                distance(45.0001, -93.0, 45.0002, -93.0001))
+    assert track.distance() == pytest.approx(expected)
+    assert Track().distance() == 0
+
+
+def test_track_downsample():
+    track = Track()
+    #: A fix about every 1.1m
+    track.extend([fix(i*1000, 45+i*0.00001, -93) for i in range(20)])
+    result = track.downsample(min_distance=5)
+    times = [f['time'] for f in result]
+
+    #: The first and last are always kept
+    assert times[0] == 0
+    assert times[-1] == 19000
+    assert len(times) == 5
+    assert len(track.downsample(min_distance=100, min_time=10000)) == 3
+
+
+def test_track_to_geojson():
+    feature = json.loads(make_track().to_geojson())
+    assert feature['geometry']['coordinates'][0] == [-93.0, 45.0, 250.5]
+    assert feature['properties']['times'] == [1000, 2000, 3000]
+
+
+def test_accuracy_filter():
+    f = AccuracyFilter(max_accuracy=10)
+    assert f.process(fix(0, 45, -93, accuracy=5)) is not None
+    assert f.process(fix(0, 45, -93, accuracy=20)) is None
+
+
+def test_distance_filter():
+    f = DistanceFilter(min_distance=10)
+    assert f.process(fix(0, 45, -93)) is not None
+    assert f.process(fix(1000, 45.00001, -93)) is None
+    assert f.process(fix(2000, 45.0001, -93)) is not None
+
+    #: Distance is measured from the last fix kept
+    assert f.process(fix(3000, 45.00015, -93)) is None
+    assert f.process(fix(4000, 45.0002, -93)) is not None
+
+    f.reset()
+    assert f.process(fix(5000, 45.0002, -93)) is not None
+
+
+def test_distance_filter_min_time():
+    f = DistanceFilter(min_distance=10, min_time=5000)
+    assert f.process(fix(0, 45, -93)) is not None
+    assert f.process(fix(4000, 45, -93)) is None
+    assert f.process(fix(5000, 45, -93)) is not None
+
+
+def test_kalman_filter():
+    f = KalmanFilter()
+
+    #: The first fix is passed through
+    result = f.process(fix(0, 45, -93, accuracy=10))
+    assert (result['latitude'], result['longitude']) == (45, -93)
+    assert result['accuracy'] == 10
+
+    #: Later fixes move the estimate part way towards the fix
+    result = f.process(fix(1000, 45.001, -93, accuracy=10))
+    assert 45 < result['latitude'] < 45.001
+    assert result['longitude'] == -93
+    assert result['accuracy'] < 10
+
+    #: The estimate converges on a stationary position
+    for i in range(2, 50):
+        result = f.process(fix(i*1000, 45.001, -93, accuracy=10))
+    assert result['latitude'] == pytest.approx(45.001, abs=1e-5)
+
+    #: A more accurate fix has more weight
+    a, b = KalmanFilter(), KalmanFilter()
+    for k in (a, b):
+        k.process(fix(0, 45, -93, accuracy=10))
+    lat_a = a.process(fix(0, 45.001, -93, accuracy=5))['latitude']
+    lat_b = b.process(fix(0, 45.001, -93, accuracy=50))['latitude']
+    assert lat_a > lat_b
+
+    f.reset()
+    result = f.process(fix(0, 46, -94, accuracy=3))
+    assert (result['latitude'], result['longitude']) == (46, -94)